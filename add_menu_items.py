@@ -1,9 +1,10 @@
-from backend.database import SessionLocal
-from backend.models import MenuItem
+from backend.database import init_db
+from backend.menu_import import upsert_menu
+
+# Create any missing tables
+init_db()
 
 def add_menu_items():
-    db = SessionLocal()
-    
     new_items = [
         # Veg Starters
         {"name": "Paneer Tikka", "description": "Grilled cottage cheese with spices", "price": 240, "category": "Veg Starter"},
@@ -33,21 +34,10 @@ def add_menu_items():
     ]
 
     print("Adding new menu items...")
-    count = 0
-    for item in new_items:
-        # Check if item exists to avoid duplicates
-        exists = db.query(MenuItem).filter(MenuItem.name == item["name"]).first()
-        if not exists:
-            db_item = MenuItem(**item)
-            db.add(db_item)
-            count += 1
-            print(f"Added: {item['name']}")
-        else:
-            print(f"Skipped (already exists): {item['name']}")
-            
-    db.commit()
-    db.close()
-    print(f"\nSuccessfully added {count} new items to the menu.")
+    # Upsert: existing items are updated in place, so re-running is harmless
+    report = upsert_menu(new_items)
+    print(f"\nSuccessfully added {report['inserted']} new items to the menu. "
+          f"({report['updated']} already existed, {report['rows_per_sec']} rows/sec)")
 
 if __name__ == "__main__":
     add_menu_items()
@@ -0,0 +1,91 @@
+import inspect
+import json
+import time
+from typing import Annotated, Any, Dict, Optional
+
+from fastapi import HTTPException
+from pydantic import ConfigDict, Field, ValidationError, create_model
+
+from .agents import TOOL_REGISTRY
+from .metrics import span
+from .tools import collect_displays
+
+# --- Structured Actions ---
+# Requests that are already fully structured (a "show the menu" or "order again" button)
+# call the agents' tools directly instead of going through the router and two model
+# round trips. Arguments are validated against a schema built from each tool's
+# signature, the same one the model is given, with a few tighter rules below.
+
+Quantity = Annotated[int, Field(gt=0, le=50)]
+
+# Stricter types than the tool signatures spell out, keyed by tool then argument.
+ARGUMENT_RULES = {
+    "place_restaurant_order": {"room_number": Annotated[str, Field(min_length=1)], "items_dict": Dict[str, Quantity]},
+    "create_room_service_request": {"room_number": Annotated[str, Field(min_length=1)]},
+}
+
+
+def _arguments_model(name, tool):
+    rules = ARGUMENT_RULES.get(name, {})
+    fields = {}
+    for param in inspect.signature(tool).parameters.values():
+        annotation = rules.get(param.name, param.annotation)
+        if annotation is inspect.Parameter.empty:
+            annotation = Any
+        if param.default is inspect.Parameter.empty:
+            fields[param.name] = (annotation, ...)
+        else:
+            fields[param.name] = (Optional[annotation], param.default)
+    return create_model(f"{name}_arguments", __config__=ConfigDict(extra="forbid"), **fields)
+
+
+ARGUMENT_MODELS = {name: _arguments_model(name, tool) for name, (_, tool) in TOOL_REGISTRY.items()}
+
+
+def list_actions():
+    """Every action with its owning agent, description and JSON schema of its arguments."""
+    return [
+        {
+            "name": name,
+            "agent": agent,
+            "description": inspect.getdoc(tool).split("\n")[0],
+            "arguments": ARGUMENT_MODELS[name].model_json_schema(),
+        }
+        for name, (agent, tool) in TOOL_REGISTRY.items()
+    ]
+
+
+def run_action(name, arguments, conversation_id=None):
+    """
+    Validates `arguments` and calls the tool `name` with them.
+    Args:
+        name: Tool name, e.g. "place_restaurant_order".
+        arguments: Keyword arguments for the tool.
+        conversation_id: When given, the action and its result are added to that
+            conversation so the agents know about it on the next chat message.
+    """
+    entry = TOOL_REGISTRY.get(name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown action '{name}'.")
+    agent, tool = entry
+    try:
+        validated = ARGUMENT_MODELS[name].model_validate(arguments)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    start = time.perf_counter()
+    with span("tool", name), collect_displays() as displays:
+        result = tool(**validated.model_dump(exclude_unset=True))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if conversation_id:
+        from .agents import get_manager
+        get_manager().conversations.append(conversation_id, f"[{name}] {json.dumps(arguments)}", result)
+    return {
+        "action": name,
+        "agent": agent,
+        "ok": not result.startswith(("Error", "Failed")),
+        "result": result,
+        "displays": displays,
+        "ms": round(elapsed_ms, 3),
+    }
@@ -0,0 +1,171 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+from .metrics import CHATS_SHED, COALESCED, QUEUE_WAIT, RATE_LIMITED
+from .shared_state import hit
+
+# --- Admission Control ---
+# At check-out rush many guests ask the same thing at once, and every chat holds model
+# calls for seconds. Three things keep /chat answering quickly when more chats arrive
+# than the model can serve:
+#   * SingleFlight runs identical in-flight work once (an LLM routing call, a read-only
+#     tool call, a cacheable facility question) and hands every caller its result.
+#   * AdmissionQueue lets `max_concurrent` chats run and queues the rest. A chat that
+#     would wait longer than the latency budget is shed straight away, so admitted chats
+#     keep a bounded latency instead of all of them slowing down together.
+#   * Per-room rate limits, counted in the shared state so they hold across workers.
+
+CHAT_RATE_LIMIT = int(os.getenv("CHAT_RATE_LIMIT", "20")) # Messages per room per window; 0 turns the limit off
+CHAT_RATE_WINDOW = int(os.getenv("CHAT_RATE_WINDOW_SECONDS", "60"))
+EWMA_WEIGHT = 0.2 # Weight of the latest chat in the average chat time
+
+
+class Overloaded(Exception):
+    """Raised instead of queuing a chat that could not start within the latency budget."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Too many chats in progress ({reason}).")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time; callers arriving while it runs share its result.
+    The call is cancelled (releasing whatever it holds, e.g. a chat slot) once every
+    caller waiting on it has gone away, say after its own timeout.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> [task, callers still waiting on it]
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key, fn):
+        """
+        Awaits `fn()` (a coroutine function), or the call already running for `key`.
+        Returns (result, shared), where `shared` is True when another caller ran it.
+        Args:
+            key: Hashable tuple whose first item names the kind of work, e.g. ("router", text).
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.followers += 1
+            COALESCED.inc(key[0])
+        else:
+            task = asyncio.ensure_future(fn())
+            call = self._calls[key] = [task, 0]
+
+            def forget(_):
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+            self.leaders += 1
+        task = call[0]
+        call[1] += 1
+        try:
+            # Shielded, so a caller that goes away does not cancel the call for the others.
+            return await asyncio.shield(task), shared
+        finally:
+            call[1] -= 1
+            if call[1] == 0 and not task.done():
+                # The last caller left: nobody wants the result any more.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                task.cancel()
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.followers}
+
+
+class AdmissionQueue:
+    """
+    Concurrency limit with a bounded, latency-budgeted queue in front of it.
+    Args:
+        max_concurrent: Chats running at once.
+        max_queue: Most chats waiting for a slot; more are shed at once.
+        budget: Longest a chat may wait for a slot, in seconds. An arrival whose expected
+            wait (chats ahead of it x average chat time / max_concurrent) is longer is
+            shed at once rather than after waiting the budget out.
+    """
+
+    def __init__(self, max_concurrent, max_queue, budget):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.budget = budget
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.waiting = 0
+        self.avg_seconds = None  # Moving average of how long an admitted chat holds its slot
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "expected_wait": 0, "wait_timeout": 0}
+
+    def expected_wait(self):
+        if self.avg_seconds is None or self.running + self.waiting < self.max_concurrent:
+            return 0.0
+        return (self.waiting + 1) * self.avg_seconds / self.max_concurrent
+
+    def _shed(self, reason, retry_after):
+        self.shed[reason] += 1
+        CHATS_SHED.inc(reason)
+        raise Overloaded(reason, max(1, math.ceil(retry_after)))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one chat slot for the block; raises Overloaded when the chat is shed."""
+        if self.running + self.waiting >= self.max_concurrent and self.waiting >= self.max_queue:
+            self._shed("queue_full", self.expected_wait())
+        expected = self.expected_wait()
+        if expected > self.budget:
+            self._shed("expected_wait", expected)
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.budget)
+        except asyncio.TimeoutError:
+            self._shed("wait_timeout", self.budget)
+        finally:
+            self.waiting -= 1
+        QUEUE_WAIT.observe(time.perf_counter() - queued)
+
+        started = time.perf_counter()
+        self.running += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+            elapsed = time.perf_counter() - started
+            self.avg_seconds = elapsed if self.avg_seconds is None else (
+                (1 - EWMA_WEIGHT) * self.avg_seconds + EWMA_WEIGHT * elapsed)
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "avg_chat_ms": round(self.avg_seconds * 1000, 1) if self.avg_seconds is not None else None,
+            "expected_wait_ms": round(self.expected_wait() * 1000, 1),
+        }
+
+
+def rate_limit_wait(key):
+    """
+    Counts one chat message for `key` (a room number, or a conversation id) and returns
+    0 when it is within CHAT_RATE_LIMIT, otherwise the seconds until the window resets.
+    """
+    if not CHAT_RATE_LIMIT or not key:
+        return 0
+    if hit(f"rate:chat:{key}", CHAT_RATE_WINDOW) <= CHAT_RATE_LIMIT:
+        return 0
+    RATE_LIMITED.inc()
+    return max(1, math.ceil(CHAT_RATE_WINDOW - time.time() % CHAT_RATE_WINDOW))
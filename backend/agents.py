@@ -1,47 +1,87 @@
+import asyncio
+import json
 import os
-import google.generativeai as genai
+import threading
+import time
 from dotenv import load_dotenv
-from google.generativeai.types import FunctionDeclaration, Tool
+from .admission import AdmissionQueue, Overloaded, SingleFlight
+from .answer_cache import AnswerCache, facility_answer, normalize_question
+from .conversations import make_conversation_store
+from .intent import IntentClassifier
+from .metrics import TOOL_ERRORS, span
+from .session_pool import SessionPool
+from .shared_state import SHARED_STATE_ENABLED, shared_state
 from .tools import (
+    FACILITIES,
+    book_room,
     check_room_availability,
     get_facility_info,
-    get_menu_items,
     place_restaurant_order,
-    create_room_service_request
+    create_room_service_request,
+    search_menu,
+    show_menu,
 )
 
-load_dotenv()
+# --- Gemini SDK ---
+# Importing google.generativeai takes most of a second, so it is only done on the
+# first model call rather than whenever the backend package is imported.
 
-api_key = os.getenv("OPENAI_API_KEY") # Keeping the env var name same for simplicity, or user can change it
-if not api_key:
-    print("CRITICAL WARNING: API Key is not set!")
+_genai = None
+_genai_lock = threading.Lock()
 
-genai.configure(api_key=api_key)
+def load_genai():
+    """Imports and configures the Gemini SDK on first use and returns the module."""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                from google.generativeai import protos  # noqa: F401 (makes genai.protos available)
+
+                load_dotenv()
+                api_key = os.getenv("OPENAI_API_KEY") # Keeping the env var name same for simplicity, or user can change it
+                if not api_key and MODEL_BACKEND != "fake":
+                    print("CRITICAL WARNING: API Key is not set!")
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
 
 # --- Tool Wrappers for Gemini ---
 # Gemini SDK can accept functions directly, which is much easier!
 
-receptionist_tools_list = [check_room_availability, get_facility_info]
-restaurant_tools_list = [get_menu_items, place_restaurant_order]
+receptionist_tools_list = [check_room_availability, book_room, get_facility_info]
+restaurant_tools_list = [show_menu, search_menu, place_restaurant_order]
 room_service_tools_list = [create_room_service_request]
 
 # --- Agents ---
 
+MODEL_NAME = 'gemini-2.0-flash' # Using Flash for speed/cost
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini") # "fake": scripted offline model (backend/fake_model.py)
+
+ERROR_PREFIX = "I encountered an error" # Starts every reply produced by a failed model call
+SUMMARY_INTRO = "Summary of our conversation so far:\n" # Starts the message carrying a conversation's summary
+
 class ResortAgent:
-    def __init__(self, system_prompt, tools):
+    def __init__(self, system_prompt, tools, model=None, name="Agent", inflight=None):
+        self.name = name
+        self.inflight = inflight # SingleFlight shared by all agents, for read-only tool calls
         self.system_prompt = system_prompt
         self.tools = tools
-        self.model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash', # Using Flash for speed/cost
+        # Reuse a prebuilt model when one is handed in; building one converts the tool schemas every time.
+        self.model = model or load_genai().GenerativeModel(
+            model_name=MODEL_NAME,
             tools=self.tools,
             system_instruction=self.system_prompt
         )
         self.chat_session = self.model.start_chat(enable_automatic_function_calling=True)
+        self.tool_map = {tool.__name__: tool for tool in self.tools}
+        self.lock = threading.Lock()
+        self.async_lock = asyncio.Lock()
+        self.context_turns = None # Stored turns of the conversation the history holds; None until loaded
 
-    def process_message(self, history):
-        # History management in Gemini is stateful in the object, but our API is stateless per request.
-        # For this simple implementation, we will just send the last user message.
-        # In a real production app, we'd reconstruct the history properly.
+    def process_message(self, history, context=None):
+        # The chat session keeps its own history, so when it is pooled per conversation
+        # we only need to send the latest user message.
         
         last_user_message = next((m['content'] for m in reversed(history) if m['role'] == 'user'), None)
         
@@ -49,17 +89,191 @@ class ResortAgent:
             return "How can I help you?"
 
         try:
-            response = self.chat_session.send_message(last_user_message)
+            # The SDK runs the tool calls inside send_message, so this span covers them too.
+            with self.lock:
+                self.load_context(context)
+                with span("model_turn", self.name):
+                    response = self.chat_session.send_message(last_user_message)
+                self._turn_done()
             return response.text
         except Exception as e:
-            return f"I encountered an error: {str(e)}"
+            return f"{ERROR_PREFIX}: {str(e)}"
+
+    async def process_message_async(self, history, context=None):
+        """
+        Async version of `process_message`. Model turns use the SDK's async client and
+        the (blocking, DB-backed) tools run in worker threads, so the event loop stays free.
+        """
+        protos = load_genai().protos
+        last_user_message = next((m['content'] for m in reversed(history) if m['role'] == 'user'), None)
+        
+        if not last_user_message:
+            return "How can I help you?"
+
+        try:
+            async with self.async_lock:
+                self.load_context(context)
+                contents = list(self.chat_session.history)
+                contents.append(protos.Content(role="user", parts=[protos.Part(text=last_user_message)]))
+                with span("model_turn", self.name):
+                    response = await self.model.generate_content_async(contents)
+
+                # Same loop the SDK runs for automatic function calling, with tools off the event loop.
+                while function_calls := self._function_calls(response):
+                    contents.append(response.candidates[0].content)
+                    parts = await asyncio.gather(*(self._call_tool(fc) for fc in function_calls))
+                    contents.append(protos.Content(role="user", parts=parts))
+                    with span("model_turn", self.name):
+                        response = await self.model.generate_content_async(contents)
+
+                contents.append(response.candidates[0].content)
+                self.chat_session.history = contents
+                self._turn_done()
+            return response.text
+        except Exception as e:
+            return f"{ERROR_PREFIX}: {str(e)}"
+
+    async def stream_message_async(self, history, context=None):
+        """
+        Like `process_message_async`, but yields the reply text piece by piece as the model
+        streams it. Tool-calling turns are resolved in between and produce no output.
+        """
+        protos = load_genai().protos
+        last_user_message = next((m['content'] for m in reversed(history) if m['role'] == 'user'), None)
+        
+        if not last_user_message:
+            yield "How can I help you?"
+            return
+
+        try:
+            async with self.async_lock:
+                self.load_context(context)
+                contents = list(self.chat_session.history)
+                contents.append(protos.Content(role="user", parts=[protos.Part(text=last_user_message)]))
+                while True:
+                    with span("model_turn", self.name):
+                        response = await self.model.generate_content_async(contents, stream=True)
+                        async for chunk in response:
+                            if not chunk.candidates:
+                                continue
+                            for part in chunk.candidates[0].content.parts:
+                                if part.text:
+                                    yield part.text
+
+                    # Once iterated, the streamed response holds the merged turn.
+                    contents.append(response.candidates[0].content)
+                    function_calls = self._function_calls(response)
+                    if not function_calls:
+                        break
+                    parts = await asyncio.gather(*(self._call_tool(fc) for fc in function_calls))
+                    contents.append(protos.Content(role="user", parts=parts))
+
+                self.chat_session.history = contents
+                self._turn_done()
+        except Exception as e:
+            yield f"{ERROR_PREFIX}: {str(e)}"
+
+    @staticmethod
+    def _function_calls(response):
+        return [part.function_call for part in response.candidates[0].content.parts if "function_call" in part]
+
+    async def _call_tool(self, function_call):
+        protos = load_genai().protos
+        args = type(function_call).to_dict(function_call).get("args", {})
+        tool = self.tool_map.get(function_call.name)
+        if tool is None:
+            result = f"Error: unknown tool '{function_call.name}'."
+        elif self.inflight is not None and function_call.name in COALESCED_TOOLS:
+            key = ("tool", function_call.name, json.dumps(args, sort_keys=True, default=str))
+            with span("tool", function_call.name):
+                result, _ = await self.inflight.run(key, lambda: asyncio.to_thread(tool, **args))
+        else:
+            with span("tool", function_call.name):
+                result = await asyncio.to_thread(tool, **args)
+        if isinstance(result, str) and result.startswith("Error"):
+            TOOL_ERRORS.inc(function_call.name)
+        return protos.Part(function_response=protos.FunctionResponse(
+            name=function_call.name, response={"result": result}
+        ))
+
+    def load_context(self, context):
+        """
+        Brings the session history in line with a conversation's stored context
+        ({"summary", "messages", "turns"}). A session missing stored turns is rebuilt
+        from it. A session holding every stored turn keeps its own, fuller history (tool
+        calls and results included), trimmed to the turns the store keeps verbatim behind
+        the store's summary, so it stays as bounded as the stored context.
+        Call with the session lock held.
+        """
+        if context is None:
+            return
+        if self.context_turns is None or context["turns"] > self.context_turns:
+            contents = self._summary_contents(context["summary"])
+            protos = load_genai().protos
+            for message in context["messages"]:
+                role = "user" if message["role"] == "user" else "model"
+                contents.append(protos.Content(role=role, parts=[protos.Part(text=message["content"])]))
+            self.chat_session.history = contents
+            self.context_turns = context["turns"]
+        elif context["turns"] == self.context_turns:
+            # In step with the store (turns still being recorded would be cut too early).
+            self._trim(context["summary"], len(context["messages"]) // 2)
+
+    def _summary_contents(self, summary):
+        if not summary:
+            return []
+        protos = load_genai().protos
+        return [
+            protos.Content(role="user", parts=[protos.Part(text=f"{SUMMARY_INTRO}{summary}")]),
+            protos.Content(role="model", parts=[protos.Part(text="Noted.")]),
+        ]
+
+    def _trim(self, summary, keep_turns):
+        # A turn starts at a guest message; tool results are user turns without text.
+        history = self.chat_session.history
+        starts = [
+            i for i, content in enumerate(history)
+            if content.role == "user" and content.parts and content.parts[0].text
+            and not content.parts[0].text.startswith(SUMMARY_INTRO)
+        ]
+        if len(starts) <= keep_turns:
+            return
+        kept = list(history[starts[len(starts) - keep_turns]:]) if keep_turns else []
+        self.chat_session.history = self._summary_contents(summary) + kept
+
+    def _turn_done(self):
+        # The turn just answered is stored as one more turn of the conversation.
+        if self.context_turns is not None:
+            self.context_turns += 1
+
+    def last_turn_summary(self, user_text):
+        """
+        (tool results as (name, result) pairs in call order, model calls made) for the
+        turn that answered `user_text`, read back from the chat history. None if that
+        turn is not the latest one.
+        """
+        results, model_calls = [], 0
+        for content in reversed(self.chat_session.history):
+            if content.role == "model":
+                model_calls += 1
+            elif any(part.text for part in content.parts):
+                return (results[::-1], model_calls) if content.parts[0].text == user_text else None
+            else:
+                results.extend((part.function_response.name, part.function_response.response["result"])
+                               for part in reversed(content.parts) if "function_response" in part)
+        return None
+
+    def history_size(self):
+        """Approximate size in bytes of the chat history held by this session."""
+        return sum(type(c).pb(c).ByteSize() for c in self.chat_session.history)
 
 # System Prompts
 RECEPTIONIST_PROMPT = """You are the Resort Receptionist. 
 Your duties: 
 1. Answer FAQs (Check-in/out times, Wi-Fi, Parking).
-2. Check room availability using the `check_room_availability` tool.
-3. Provide facility info (Gym, Spa, Pool, Restaurant) using the `get_facility_info` tool.
+2. Check room availability using the `check_room_availability` tool (dates as YYYY-MM-DD).
+3. Book rooms with the `book_room` tool once the guest has confirmed the room type, dates and their name.
+4. Provide facility info (Gym, Spa, Pool, Restaurant) using the `get_facility_info` tool.
 
 Be polite, professional, and welcoming. 
 If a guest asks about check-in/out, use the `get_facility_info` tool with arguments "check-in" or "check-out".
@@ -67,9 +281,11 @@ If a guest asks for food or room service, politely direct them to the Restaurant
 
 RESTAURANT_PROMPT = """You are the Resort Restaurant Agent.
 Your duties: Show the menu, take food orders.
-1. When asked for the menu, call the `get_menu_items` tool. **You MUST display the EXACT output returned by the tool.** Do not summarize or just say "Here is the menu". Show the full list.
-2. ALWAYS ask for the Room Number before placing an order.
-3. When taking an order, confirm the items and calculate the total bill."""
+1. When asked for the menu, call the `show_menu` tool. The menu is displayed to the guest directly, so do NOT list the dishes; reply with one short sentence.
+   If the guest only wants one section (e.g., desserts or drinks) or one diet (e.g., vegetarian), pass it as `category` / `diet`.
+2. For questions about dishes (prices, what is vegetarian, suggestions within a budget), call `search_menu` with filters and answer briefly from its rows.
+3. ALWAYS ask for the Room Number before placing an order.
+4. When taking an order, confirm the items and calculate the total bill."""
 
 ROOM_SERVICE_PROMPT = """You are the Resort Room Service Agent.
 Your duties: Handle requests for cleaning, laundry, and amenities (towels, soap, etc.).
@@ -86,40 +302,335 @@ Analyze the user message.
 Return ONLY the name of the agent: 'Receptionist', 'Restaurant', or 'RoomService'.
 If unsure, default to 'Receptionist'."""
 
+AGENT_SPECS = {
+    "Receptionist": (RECEPTIONIST_PROMPT, receptionist_tools_list),
+    "Restaurant": (RESTAURANT_PROMPT, restaurant_tools_list),
+    "RoomService": (ROOM_SERVICE_PROMPT, room_service_tools_list),
+}
+
+# Every agent tool by name, with the agent that owns it. The structured /actions API
+# calls these same functions directly.
+TOOL_REGISTRY = {tool.__name__: (agent, tool) for agent, (_, tools) in AGENT_SPECS.items() for tool in tools}
+
+# Read-only tools: identical calls in flight at the same time share one result.
+# Tools that write (bookings, orders, requests) or add displays always run per call.
+COALESCED_TOOLS = {"get_facility_info", "check_room_availability", "search_menu"}
+
+# --- Model Registry ---
+
+class ModelRegistry:
+    """
+    Builds one GenerativeModel per agent type (plus the router) on first use and reuses it.
+    Models are stateless, so they are safe to share between sessions.
+    """
+    def __init__(self, model_factory=None):
+        self.model_factory = model_factory
+        self._models = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                with span("model_build", name):
+                    factory = self.model_factory or load_genai().GenerativeModel
+                    if name == "Router":
+                        self._models[name] = factory(MODEL_NAME, system_instruction=ROUTER_PROMPT)
+                    else:
+                        prompt, tools = AGENT_SPECS[name]
+                        self._models[name] = factory(
+                            model_name=MODEL_NAME, tools=tools, system_instruction=prompt
+                        )
+                self.builds += 1
+            return self._models[name]
+
 # --- Main Orchestrator ---
 
 class AgentManager:
-    def __init__(self):
-        # We create fresh agents for now to avoid state issues in this simple design
-        pass
-
-    def get_agent(self, agent_type):
-        if agent_type == "Restaurant":
-            return ResortAgent(RESTAURANT_PROMPT, restaurant_tools_list)
-        elif agent_type == "RoomService":
-            return ResortAgent(ROOM_SERVICE_PROMPT, room_service_tools_list)
-        else:
-            return ResortAgent(RECEPTIONIST_PROMPT, receptionist_tools_list)
+    def __init__(self, model_factory=None):
+        self.models = ModelRegistry(model_factory)
+        self.pool = SessionPool(
+            self.build_agent,
+            max_sessions=int(os.getenv("AGENT_POOL_MAX_SESSIONS", "256")),
+            ttl_seconds=float(os.getenv("AGENT_POOL_TTL_SECONDS", "1800")),
+            max_bytes=int(os.getenv("AGENT_POOL_MAX_BYTES", str(8 * 1024 * 1024))),
+        )
+        self.classifier = IntentClassifier()
+        self.route_threshold = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+        self.route_counts = {"local": 0, "llm": 0}
+        # Bounds how many chats hold model/tool resources at once; the rest wait their turn,
+        # unless they would wait longer than the queue budget (see admission.py).
+        self.max_concurrent = int(os.getenv("MAX_CONCURRENT_CHATS", "32"))
+        self.chat_timeout = float(os.getenv("CHAT_TIMEOUT_SECONDS", "60"))
+        self.admission = AdmissionQueue(
+            self.max_concurrent,
+            max_queue=int(os.getenv("CHAT_QUEUE_MAX", str(4 * self.max_concurrent))),
+            budget=min(float(os.getenv("CHAT_QUEUE_BUDGET_SECONDS", "5")), self.chat_timeout),
+        )
+        self.inflight = SingleFlight() if os.getenv("CHAT_COALESCE", "1") == "1" else None
+        self.answer_cache = AnswerCache(
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+            state=shared_state if SHARED_STATE_ENABLED else None,
+        )
+        self.conversations = make_conversation_store()
+
+    def build_agent(self, agent_type):
+        prompt, tools = AGENT_SPECS[agent_type]
+        model = self.models.get(agent_type)
+        with span("agent_build", agent_type):
+            return ResortAgent(prompt, tools, model=model, name=agent_type, inflight=self.inflight)
+
+    def get_agent(self, agent_type, conversation_id=None):
+        if agent_type not in AGENT_SPECS:
+            agent_type = "Receptionist"
+        # Without a conversation id there is nothing to continue, so hand out a one-off session.
+        if conversation_id is None:
+            return self.build_agent(agent_type)
+        return self.pool.acquire(agent_type, conversation_id)
+
+    def route(self, text):
+        """
+        Picks the agent for a message. Confident local predictions skip the LLM router.
+        Returns (agent_name, path) where path is "local" or "llm".
+        """
+        with span("router", "local"):
+            label, path = self._route_locally(text)
+        if path == "llm":
+            with span("router", "llm"):
+                label = self.route_request(text)
+        return label, path
+
+    def _route_locally(self, text):
+        label, confidence = self.classifier.predict(text)
+        path = "local" if confidence >= self.route_threshold else "llm"
+        self.route_counts[path] += 1
+        return label, path
 
     def route_request(self, text):
-        model = genai.GenerativeModel('gemini-2.0-flash', system_instruction=ROUTER_PROMPT)
+        model = self.models.get("Router")
         response = model.generate_content(text)
-        intent = response.text.strip()
+        return self._parse_intent(response.text)
+
+    @staticmethod
+    def _parse_intent(text):
+        intent = text.strip()
         # Clean up any extra chars
         if "Restaurant" in intent: return "Restaurant"
         if "RoomService" in intent: return "RoomService"
         return "Receptionist"
 
-    def chat(self, history):
+    def _remember_answer(self, user_text, agent_name, path, agent, reply, started):
+        # Only receptionist turns answered purely from facility info are cached, and what is
+        # cached is that info, never the model's reply: the reply can depend on the rest of
+        # the conversation (the guest's name, "tomorrow") and must not reach other guests.
+        if agent_name != "Receptionist" or reply.startswith(ERROR_PREFIX):
+            return
+        summary = agent.last_turn_summary(user_text)
+        if not summary:
+            return
+        results, model_calls = summary
+        facts = list(dict.fromkeys(result for _, result in results))
+        if results and all(name == "get_facility_info" for name, _ in results) and set(facts) <= set(FACILITIES.values()):
+            router_calls = 1 if path == "llm" else 0
+            self.answer_cache.put(user_text, " ".join(facts), model_calls + router_calls,
+                                  time.perf_counter() - started)
+
+    def _stored_context(self, conversation_id, history):
+        """
+        The conversation so far, for the agent to load if its session does not hold it
+        yet: the server-side context when this conversation has one, otherwise any
+        earlier turns the client sent itself.
+        """
+        context = self.conversations.context(conversation_id) if conversation_id is not None else None
+        if context and context["turns"]:
+            return context
+        return {"summary": "", "messages": history[:-1][-self.conversations.max_messages:], "turns": 0}
+
+    def _record_turn(self, conversation_id, user_text, reply):
+        if conversation_id is not None and not reply.startswith(ERROR_PREFIX):
+            self.conversations.append(conversation_id, user_text, reply)
+
+    def chat(self, history, conversation_id=None):
         # Get the latest message
         user_text = next((m['content'] for m in reversed(history) if m['role'] == 'user'), "")
+        started = time.perf_counter()
+
+        cached = self.answer_cache.get(user_text)
+        if cached is not None:
+            print(f"Answering '{user_text}' from the answer cache")
+            self._record_turn(conversation_id, user_text, cached)
+            return cached
         
         # 1. Route
-        agent_name = self.route_request(user_text)
-        print(f"Routing '{user_text}' to: {agent_name}")
+        agent_name, path = self.route(user_text)
+        print(f"Routing '{user_text}' to: {agent_name} (via {path})")
         
         # 2. Delegate
-        agent = self.get_agent(agent_name)
-        return agent.process_message(history)
+        agent = self.get_agent(agent_name, conversation_id)
+        context = self._stored_context(conversation_id, history)
+        reply = agent.process_message(history, context)
+        self._remember_answer(user_text, agent_name, path, agent, reply, started)
+        self._record_turn(conversation_id, user_text, reply)
+        if conversation_id is not None:
+            self.pool.release(agent_name, conversation_id, agent.history_size())
+        return reply
+
+    async def route_async(self, text):
+        with span("router", "local"):
+            label, path = self._route_locally(text)
+        if path == "llm":
+            with span("router", "llm"):
+                if self.inflight is None:
+                    label = await self.route_request_async(text)
+                else:
+                    label, _ = await self.inflight.run(("router", text), lambda: self.route_request_async(text))
+        return label, path
+
+    async def route_request_async(self, text):
+        model = self.models.get("Router")
+        response = await model.generate_content_async(text)
+        return self._parse_intent(response.text)
+
+    async def chat_async(self, history, conversation_id=None):
+        """
+        Async version of `chat` used by the API. At most `max_concurrent` chats run at once
+        and each one is cancelled after `chat_timeout` seconds (raises asyncio.TimeoutError).
+        A chat that cannot start within the queue budget raises Overloaded, unless it is a
+        facility question, which then gets the facility info as a canned answer.
+        """
+        user_text = next((m['content'] for m in reversed(history) if m['role'] == 'user'), "")
+        cached = self.answer_cache.get(user_text)
+        if cached is not None:
+            print(f"Answering '{user_text}' from the answer cache")
+            await asyncio.to_thread(self._record_turn, conversation_id, user_text, cached)
+            return cached
+
+        try:
+            # The timeout covers time spent waiting for a slot as well as the chat itself.
+            return await asyncio.wait_for(self._chat_async(history, conversation_id, user_text), self.chat_timeout)
+        except Overloaded:
+            canned = facility_answer(user_text)
+            if canned is None:
+                raise
+            print(f"Answering '{user_text}' with the canned facility answer (overloaded)")
+            await asyncio.to_thread(self._record_turn, conversation_id, user_text, canned)
+            return canned
+
+    async def _chat_async(self, history, conversation_id, user_text):
+        question = normalize_question(user_text) if self.inflight is not None else None
+        if question is not None:
+            # The same facility question already in flight: wait for it, then answer from
+            # the cache it fills (or on our own if its answer was not cacheable).
+            reply, shared = await self.inflight.run(
+                ("answer", question), lambda: self._admitted_chat(history, conversation_id)
+            )
+            if not shared:
+                return reply
+            cached = self.answer_cache.get(user_text)
+            if cached is not None:
+                await asyncio.to_thread(self._record_turn, conversation_id, user_text, cached)
+                return cached
+        return await self._admitted_chat(history, conversation_id)
+
+    async def _admitted_chat(self, history, conversation_id):
+        async with self.admission.slot():
+            return await self._run_chat_async(history, conversation_id)
+
+    async def _run_chat_async(self, history, conversation_id):
+        user_text = next((m['content'] for m in reversed(history) if m['role'] == 'user'), "")
+        started = time.perf_counter()
+
+        agent_name, path = await self.route_async(user_text)
+        print(f"Routing '{user_text}' to: {agent_name} (via {path})")
+
+        agent = self.get_agent(agent_name, conversation_id)
+        context = await asyncio.to_thread(self._stored_context, conversation_id, history)
+        reply = await agent.process_message_async(history, context)
+        self._remember_answer(user_text, agent_name, path, agent, reply, started)
+        await asyncio.to_thread(self._record_turn, conversation_id, user_text, reply)
+        if conversation_id is not None:
+            self.pool.release(agent_name, conversation_id, agent.history_size())
+        return reply
+
+    async def chat_stream(self, history, conversation_id=None):
+        """
+        Streaming version of `chat_async`: an async generator of reply text pieces.
+        The same admission control, canned answers and overall timeout apply
+        (raises Overloaded or asyncio.TimeoutError).
+        """
+        user_text = next((m['content'] for m in reversed(history) if m['role'] == 'user'), "")
+        cached = self.answer_cache.get(user_text)
+        if cached is not None:
+            print(f"Answering '{user_text}' from the answer cache")
+            await asyncio.to_thread(self._record_turn, conversation_id, user_text, cached)
+            yield cached
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.chat_timeout
+        try:
+            async with self.admission.slot():
+                async for piece in self._run_chat_stream(history, conversation_id, user_text, deadline):
+                    yield piece
+        except Overloaded:
+            canned = facility_answer(user_text)
+            if canned is None:
+                raise
+            print(f"Answering '{user_text}' with the canned facility answer (overloaded)")
+            await asyncio.to_thread(self._record_turn, conversation_id, user_text, canned)
+            yield canned
+
+    async def _run_chat_stream(self, history, conversation_id, user_text, deadline):
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        agent_name, path = await asyncio.wait_for(self.route_async(user_text), deadline - loop.time())
+        print(f"Routing '{user_text}' to: {agent_name} (via {path})")
+
+        agent = self.get_agent(agent_name, conversation_id)
+        context = await asyncio.to_thread(self._stored_context, conversation_id, history)
+        pieces = agent.stream_message_async(history, context)
+        reply = []
+        try:
+            while True:
+                try:
+                    piece = await asyncio.wait_for(pieces.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                reply.append(piece)
+                yield piece
+        finally:
+            await pieces.aclose()
+
+        reply = "".join(reply)
+        self._remember_answer(user_text, agent_name, path, agent, reply, started)
+        await asyncio.to_thread(self._record_turn, conversation_id, user_text, reply)
+
+        if conversation_id is not None:
+            self.pool.release(agent_name, conversation_id, agent.history_size())
+
+    def stats(self):
+        return {"model_builds": self.models.builds, **self.pool.stats()}
+
+    def routing_stats(self):
+        return dict(self.route_counts, threshold=self.route_threshold)
+
+# Built on first use (see get_manager) so importing the backend stays cheap.
+manager = None
+_manager_lock = threading.Lock()
 
-manager = AgentManager()
+def get_manager():
+    """The process-wide AgentManager, created on first call."""
+    global manager
+    if manager is None:
+        with _manager_lock:
+            if manager is None:
+                model_factory = None
+                if MODEL_BACKEND == "fake":
+                    from .fake_model import ScriptedFakeModel
+                    model_factory = ScriptedFakeModel
+                manager = AgentManager(model_factory=model_factory)
+    return manager
@@ -0,0 +1,162 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .tools import FACILITIES, FACILITIES_VERSION
+
+# --- Receptionist Answer Cache ---
+# Facility questions ("what time is check-in?", "wifi password?") get the same answer every
+# time, yet each one costs a router call plus an agent call with a tool turn. When a turn
+# was answered only from `get_facility_info`, the facility info it returned is cached under
+# a normalised form of the question, so "When is check in?" and "check-in time please"
+# share one entry. The model's own reply is never cached: it may mention the guest or
+# earlier turns, or answer "open tomorrow?" in a way that is wrong for "open now?".
+
+# Folds different ways of naming a facility onto one topic word.
+TOPIC_SYNONYMS = {
+    "gym": "gym", "fitness": "gym", "workout": "gym",
+    "spa": "spa", "massage": "spa",
+    "pool": "pool", "swimming": "pool", "swim": "pool",
+    "restaurant": "restaurant", "breakfast": "restaurant", "lunch": "restaurant", "dinner": "restaurant",
+    "checkin": "checkin", "checkout": "checkout",
+    "wifi": "wifi", "internet": "wifi", "password": "wifi",
+    "parking": "parking", "park": "parking", "valet": "parking",
+}
+
+# Words that don't change which facility answer applies.
+FILLER = {
+    "a", "an", "the", "i", "me", "my", "we", "our", "you", "your", "is", "are", "do", "does", "can",
+    "could", "what", "whats", "when", "where", "which", "how", "to", "for", "of", "in", "at", "on",
+    "it", "please", "pls", "tell", "about", "info", "information", "time", "times", "timing",
+    "timings", "hour", "hours", "open", "opening", "close", "closing", "there", "this", "resort",
+    "hotel", "and", "any", "have", "get", "know", "like", "would", "need", "want", "be", "will",
+    "serve", "served", "available", "located", "location", "today", "tomorrow", "still", "now",
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def normalize_question(text):
+    """
+    Canonical cache key for a facility question, or None when the question does not
+    name a facility (e.g. "what time does it close?" depends on earlier context).
+    """
+    text = text.lower().replace("wi-fi", "wifi")
+    text = re.sub(r"check[\s-]*(in|out)\b", r"check\1", text)
+    words = set()
+    has_topic = False
+    for word in _WORD_RE.findall(text):
+        if word in FILLER:
+            continue
+        topic = TOPIC_SYNONYMS.get(word)
+        has_topic = has_topic or topic is not None
+        words.add(topic or word)
+    return " ".join(sorted(words)) if has_topic else None
+
+
+def facility_answer(question):
+    """
+    The facility info for every facility a question names, straight from FACILITIES with
+    no model call (the degraded answer given when a chat is shed), or None.
+    """
+    normalized = normalize_question(question)
+    if normalized is None:
+        return None
+    topics = [word for word in normalized.split() if word in FACILITIES]
+    return " ".join(FACILITIES[topic] for topic in topics) or None
+
+
+class AnswerCache:
+    """
+    LRU/TTL cache of facility answers keyed by normalised question.
+    Each entry remembers how many model calls and how much time producing it took,
+    so hits can be reported as calls and latency saved.
+    Args:
+        state: Optional shared state (see shared_state.py). Entries are then kept there,
+            shared by every worker and expired by the store, instead of in this process.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, version=FACILITIES_VERSION, state=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.state = state
+        self._entries = OrderedDict()  # key -> (answer, stored_at, model_calls, seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.model_calls_saved = 0
+        self.seconds_saved = 0.0
+
+    def _key(self, question):
+        normalized = normalize_question(question)
+        return (self.version, normalized) if normalized else None
+
+    def get(self, question):
+        key = self._key(question)
+        if key is None:
+            return None
+        if self.state is not None:
+            return self._get_shared(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.model_calls_saved += entry[2]
+                self.seconds_saved += entry[3]
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, question, answer, model_calls, seconds):
+        key = self._key(question)
+        if key is None:
+            return
+        if self.state is not None:
+            self.state.set(self._shared_name(key), json.dumps([answer, model_calls, seconds]),
+                           ex=int(self.ttl_seconds) or None)
+            return
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic(), model_calls, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared_name(self, key):
+        # The generation is bumped by `invalidate`, which orphans every older entry at once.
+        return f"answer:{self.state.get('answer:generation') or 0}:{key[0]}:{key[1]}"
+
+    def _get_shared(self, key):
+        value = self.state.get(self._shared_name(key))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            answer, model_calls, seconds = json.loads(value)
+            self.hits += 1
+            self.model_calls_saved += model_calls
+            self.seconds_saved += seconds
+            return answer
+
+    def invalidate(self):
+        if self.state is not None:
+            self.state.incr("answer:generation")
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries) if self.state is None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "model_calls_saved": self.model_calls_saved,
+                "latency_saved_ms": round(self.seconds_saved * 1000, 1),
+            }
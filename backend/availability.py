@@ -0,0 +1,310 @@
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+
+from .database import SessionLocal
+from .models import Booking, CacheVersion, ChangeLog, Room, RoomNight
+
+# --- Availability Index ---
+# Each room's booked nights are kept as a bitmap (a Python int; bit i is the night of
+# `origin + i` days), grouped by room type, so "how many Deluxe rooms are free from X
+# to Y" is one AND per room against a mask of the requested nights.
+# A booking is stored as one `room_nights` row per night under a (room_id, night)
+# primary key, so writers in other processes cannot overbook a room either: the one
+# that loses the race rolls back and moves on to the next free room. Bookings made or
+# cancelled elsewhere show up in `change_log`, and only those rooms are reloaded; a
+# change to the rooms themselves (the `rooms` cache version) reloads everything.
+
+MAX_NIGHTS = 60 # Longest stay accepted
+CHANGE_HISTORY = 1000 # Recent bitmap changes kept for incremental consumers (pricing)
+
+
+def parse_stay(check_in=None, check_out=None):
+    """
+    Stay dates from ISO strings (or dates). Check-in defaults to today and
+    check-out to the day after check-in.
+    """
+    if isinstance(check_in, str):
+        check_in = date.fromisoformat(check_in.strip())
+    check_in = check_in or date.today()
+    if isinstance(check_out, str):
+        check_out = date.fromisoformat(check_out.strip())
+    check_out = check_out or check_in + timedelta(days=1)
+    nights = (check_out - check_in).days
+    if check_in < date.today():
+        raise ValueError("Check-in date is in the past.")
+    if nights < 1:
+        raise ValueError("Check-out must be after check-in.")
+    if nights > MAX_NIGHTS:
+        raise ValueError(f"Stays are limited to {MAX_NIGHTS} nights.")
+    return check_in, check_out
+
+
+def booking_to_dict(booking, room):
+    return {
+        "id": booking.id,
+        "room_number": room.number,
+        "room_type": room.room_type,
+        "guest_name": booking.guest_name,
+        "check_in": booking.check_in.isoformat(),
+        "check_out": booking.check_out.isoformat(),
+        "nights": (booking.check_out - booking.check_in).days,
+        "total_amount": booking.total_amount,
+        "status": booking.status,
+    }
+
+
+def _current_version(db):
+    row = db.get(CacheVersion, "rooms")
+    return row.version if row else None
+
+
+class AvailabilityIndex:
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self.origin = None
+        self.version = None
+        self.cursor = 0  # Last change_log seq of a booking already reflected in the index
+        self.rooms = {}  # room_id -> Room attributes (number, room_type, base_rate)
+        self._booked = {}  # room type -> {room_id: bitmap of booked nights}
+        self._type_locks = {}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        # Every change to the bitmaps bumps `revision` and records which nights of which
+        # room type it touched, so dependent caches can update just those.
+        self.revision = 0
+        self._load_revision = 0
+        self._changes = deque(maxlen=CHANGE_HISTORY)  # (revision, room type, first night, end night or None)
+        self.loads = 0
+        self.last_load_ms = 0.0
+        self.catch_ups = 0
+        self.conflicts = 0
+
+    # --- Loading ---
+
+    def refresh(self):
+        """Picks up bookings and room changes made since the last check (at most every `check_interval` seconds)."""
+        if self.origin is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            db = SessionLocal()
+            try:
+                version = _current_version(db)
+                if self.origin is None or version != self.version or self.origin != date.today():
+                    self._load(db, version)
+                else:
+                    self._catch_up(db)
+                self._checked_at = time.monotonic()
+            finally:
+                db.close()
+
+    def _load(self, db, version):
+        start = time.perf_counter()
+        origin = date.today()
+        cursor = db.query(func.max(ChangeLog.seq)).filter(ChangeLog.entity == "booking").scalar() or 0
+        rooms = {row.id: row for row in db.query(Room.id, Room.number, Room.room_type, Room.base_rate).order_by(Room.number)}
+        booked = {}
+        for room in rooms.values():
+            booked.setdefault(room.room_type, {})[room.id] = 0
+            self._type_locks.setdefault(room.room_type, threading.Lock())
+
+        offsets = {}
+        for room_id, night in db.query(RoomNight.room_id, RoomNight.night).filter(RoomNight.night >= origin):
+            offsets.setdefault(room_id, []).append((night - origin).days)
+        for room_id, nights in offsets.items():
+            if room_id in rooms:
+                booked[rooms[room_id].room_type][room_id] = sum(1 << offset for offset in nights)
+
+        self.origin, self.version, self.cursor, self.rooms, self._booked = origin, version, cursor, rooms, booked
+        self.revision += 1
+        self._load_revision = self.revision
+        self._changes.clear()
+        self.loads += 1
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+
+    def _catch_up(self, db):
+        entries = (
+            db.query(ChangeLog.seq, ChangeLog.entity_id)
+            .filter(ChangeLog.seq > self.cursor, ChangeLog.entity == "booking")
+            .order_by(ChangeLog.seq)
+            .all()
+        )
+        if not entries:
+            return
+        oldest = db.query(func.min(ChangeLog.seq)).scalar()
+        if oldest > self.cursor + 1:
+            # Entries we never saw were pruned from the log; start over.
+            self._load(db, self.version)
+            return
+        booking_ids = {entry.entity_id for entry in entries}
+        room_ids = {room_id for room_id, in db.query(Booking.room_id).filter(Booking.id.in_(booking_ids)).distinct()}
+        self._reload_rooms(db, room_ids)
+        self.cursor = entries[-1].seq
+        self.catch_ups += 1
+
+    def _mask(self, check_in, check_out):
+        offset = (check_in - self.origin).days
+        return ((1 << (check_out - check_in).days) - 1) << offset
+
+    # --- Queries ---
+
+    def room_types(self):
+        self.refresh()
+        return list(self._booked)
+
+    def match_type(self, room_type):
+        """Room type named by `room_type` (case-insensitive, e.g. "deluxe room"), or None."""
+        wanted = room_type.strip().lower()
+        for name in self.room_types():
+            if name.lower() in wanted or wanted in name.lower():
+                return name
+        return None
+
+    def base_rate(self, room_type):
+        """Nightly base rate of a room type (the lowest among its rooms)."""
+        return min(room.base_rate for room in self.rooms.values() if room.room_type == room_type)
+
+    def free_rooms(self, room_type, check_in, check_out):
+        """Ids of the `room_type` rooms with none of the nights from check_in to check_out booked."""
+        self.refresh()
+        mask = self._mask(check_in, check_out)
+        return [room_id for room_id, booked in self._booked.get(room_type, {}).items() if not booked & mask]
+
+    def count_free(self, room_type, check_in, check_out):
+        self.refresh()
+        mask = self._mask(check_in, check_out)
+        return sum(1 for booked in self._booked.get(room_type, {}).values() if not booked & mask)
+
+    def summary(self, check_in, check_out):
+        """Free rooms per room type for the stay."""
+        return {room_type: self.count_free(room_type, check_in, check_out) for room_type in self.room_types()}
+
+    # --- Bookings ---
+
+    def book(self, room_type, check_in, check_out, guest_name="", total_amount=None):
+        """
+        Books the first free room of `room_type` for the stay at the quoted `total_amount`.
+        Returns the booking as a dict, or None when that type is sold out for those dates.
+        """
+        self.refresh()
+        lock = self._type_locks.get(room_type)
+        if lock is None:
+            return None
+        # Bookings of one type in this process take turns; other processes are kept
+        # out by the room_nights primary key.
+        with lock:
+            for room_id in self.free_rooms(room_type, check_in, check_out):
+                booking = self._insert(room_id, check_in, check_out, guest_name, total_amount)
+                if booking is not None:
+                    return booking
+                self.conflicts += 1
+        return None
+
+    def _insert(self, room_id, check_in, check_out, guest_name, total_amount):
+        db = SessionLocal()
+        try:
+            booking = Booking(room_id=room_id, guest_name=guest_name, check_in=check_in,
+                              check_out=check_out, status="Confirmed", total_amount=total_amount)
+            db.add(booking)
+            db.flush()
+            nights = (check_out - check_in).days
+            db.execute(insert(RoomNight.__table__), [
+                {"room_id": room_id, "night": check_in + timedelta(days=i), "booking_id": booking.id}
+                for i in range(nights)
+            ])
+            result = booking_to_dict(booking, self.rooms[room_id])
+            db.commit()
+        except IntegrityError:
+            # Another process booked one of these nights first; pick up its bookings.
+            db.rollback()
+            with self._lock:
+                self._reload_rooms(db, {room_id})
+            return None
+        finally:
+            db.close()
+        self._apply(room_id, check_in, check_out, True)
+        return result
+
+    def cancel(self, booking_id):
+        """Cancels a booking and frees its nights. Returns the booking, or None if there is none to cancel."""
+        self.refresh()
+        db = SessionLocal()
+        try:
+            booking = db.get(Booking, booking_id)
+            if booking is None or booking.status == "Cancelled":
+                return None
+            booking.status = "Cancelled"
+            db.query(RoomNight).filter(RoomNight.booking_id == booking_id).delete(synchronize_session=False)
+            result = booking_to_dict(booking, db.get(Room, booking.room_id))
+            room_id, check_in, check_out = booking.room_id, booking.check_in, booking.check_out
+            db.commit()
+        finally:
+            db.close()
+        self._apply(room_id, check_in, check_out, False)
+        return result
+
+    def _apply(self, room_id, check_in, check_out, booked):
+        """Sets or clears a stay's nights in one room's bitmap after this process changed them."""
+        with self._lock:
+            room = self.rooms.get(room_id)
+            if room is None:
+                return
+            bitmaps = self._booked[room.room_type]
+            start, end = max(check_in, self.origin), max(check_out, self.origin)
+            mask = self._mask(start, end)
+            bitmaps[room_id] = bitmaps[room_id] | mask if booked else bitmaps[room_id] & ~mask
+            self._record_change(room.room_type, (start - self.origin).days, (end - self.origin).days)
+
+    def _record_change(self, room_type, first, end):
+        self.revision += 1
+        self._changes.append((self.revision, room_type, first, end))
+
+    def changes_since(self, revision):
+        """
+        (room type, first night, end night) ranges changed after `revision`, as offsets
+        from `origin`; `end` is None for "every night". Returns None when the index was
+        reloaded (or too much changed) since then and everything should be recomputed.
+        """
+        with self._lock:
+            if revision < self._load_revision:
+                return None
+            changes = [change[1:] for change in self._changes if change[0] > revision]
+            if len(changes) < self.revision - revision:
+                return None
+            return changes
+
+    def bitmaps(self, room_type):
+        """Booked-night bitmaps of every room of `room_type`."""
+        return list(self._booked.get(room_type, {}).values())
+
+    def _reload_rooms(self, db, room_ids):
+        """Rebuilds the bitmaps of `room_ids` from the database. Call with `_lock` held."""
+        offsets = {room_id: [] for room_id in room_ids if room_id in self.rooms}
+        if not offsets:
+            return
+        nights = db.query(RoomNight.room_id, RoomNight.night).filter(
+            RoomNight.room_id.in_(list(offsets)), RoomNight.night >= self.origin
+        )
+        for room_id, night in nights:
+            offsets[room_id].append((night - self.origin).days)
+        for room_id, room_offsets in offsets.items():
+            room_type = self.rooms[room_id].room_type
+            self._booked[room_type][room_id] = sum(1 << offset for offset in room_offsets)
+            self._record_change(room_type, 0, None)
+
+    def stats(self):
+        return {
+            "rooms": len(self.rooms),
+            "room_types": {room_type: len(rooms) for room_type, rooms in self._booked.items()},
+            "loads": self.loads,
+            "last_load_ms": round(self.last_load_ms, 3),
+            "catch_ups": self.catch_ups,
+            "conflicts": self.conflicts,
+        }
+
+
+availability = AvailabilityIndex()
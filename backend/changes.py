@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from .models import Booking, ChangeLog, Order, ServiceRequest
+
+# --- Change Feed ---
+# Every insert/update of an order, service request or booking appends a row to `change_log`
+# (database triggers, see models.SQLITE_TRIGGERS / POSTGRES_TRIGGERS). Clients keep the last `seq` they saw
+# as a cursor and ask only for what changed after it.
+
+ENTITIES = {"order": Order, "request": ServiceRequest, "booking": Booking}
+
+
+def row_to_dict(row):
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+
+def current_cursor(db):
+    return db.query(func.max(ChangeLog.seq)).scalar() or 0
+
+
+def changes_since(db, cursor, limit=500):
+    """
+    Returns the latest state of every order, request and booking changed after `cursor`.
+    `reset` is True when the cursor predates the retained log, in which case the
+    client should reload its lists before following the feed again.
+    """
+    oldest = db.query(func.min(ChangeLog.seq)).scalar()
+    reset = oldest is not None and cursor < oldest - 1
+
+    entries = (
+        db.query(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id)
+        .filter(ChangeLog.seq > cursor)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changed = {name: set() for name in ENTITIES}
+    for entry in entries:
+        if entry.entity in changed:
+            changed[entry.entity].add(entry.entity_id)
+
+    result = {"cursor": entries[-1].seq if entries else cursor, "has_more": has_more, "reset": reset}
+    for name, model in ENTITIES.items():
+        ids = changed[name]
+        rows = db.query(model).filter(model.id.in_(ids)).order_by(model.id).all() if ids else []
+        result[f"{name}s"] = [row_to_dict(row) for row in rows]
+    return result
+
+
+def prune_change_log(db, retention_days):
+    """Drops change log entries older than `retention_days`."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = db.query(ChangeLog).filter(ChangeLog.changed_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
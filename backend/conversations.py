@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .database import SessionLocal
+from .models import Conversation, ConversationMessage
+from .shared_state import SHARED_STATE_ENABLED, shared_state
+
+# --- Conversation Store ---
+# The server keeps every conversation so clients only send the new message.
+# The last `max_messages` messages are kept verbatim and older ones are folded
+# into a short running summary, so the context handed to the agents stays
+# bounded however long the conversation runs.
+
+SUMMARY_LINE_CHARS = 160 # Each folded message is clipped to this length
+
+
+def summarize(summary, messages, max_chars):
+    """
+    Appends one clipped line per message to `summary`, keeping at most the
+    last `max_chars` characters (whole lines only).
+    """
+    lines = [summary] if summary else []
+    for message in messages:
+        speaker = "Guest" if message["role"] == "user" else "Assistant"
+        text = " ".join(message["content"].split())
+        if len(text) > SUMMARY_LINE_CHARS:
+            text = text[:SUMMARY_LINE_CHARS - 3] + "..."
+        lines.append(f"{speaker}: {text}")
+    summary = "\n".join(lines)
+    if len(summary) > max_chars:
+        summary = summary[-max_chars:]
+        summary = summary[summary.find("\n") + 1:]
+    return summary
+
+
+def add_turn(entry, user_text, reply, max_messages, summary_chars):
+    """Adds a guest message and its reply to a {"summary", "messages", "turns"} entry, folding overflow."""
+    entry["turns"] += 1
+    entry["messages"] += [{"role": "user", "content": user_text}, {"role": "assistant", "content": reply}]
+    overflow = len(entry["messages"]) - max_messages
+    if overflow > 0:
+        entry["summary"] = summarize(entry["summary"], entry["messages"][:overflow], summary_chars)
+        del entry["messages"][:overflow]
+
+
+class MemoryConversationStore:
+    """
+    In-process store, LRU/TTL evicted.
+    Args:
+        max_conversations: Upper bound on stored conversations.
+        ttl_seconds: Idle time after which a conversation is dropped.
+        max_messages: Messages kept verbatim per conversation.
+        summary_chars: Length cap of the summary of older messages.
+    """
+
+    def __init__(self, max_conversations=1000, ttl_seconds=86400, max_messages=20, summary_chars=1500):
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.summary_chars = summary_chars
+        self._conversations = OrderedDict()  # id -> {"summary", "messages", "turns", "last_used"}
+        self._lock = threading.Lock()
+        self.evictions = {"lru": 0, "ttl": 0}
+
+    def context(self, conversation_id):
+        """{"summary": ..., "messages": [...], "turns": n} for a conversation (empty if unknown)."""
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._conversations.get(conversation_id)
+            if entry is None:
+                return {"summary": "", "messages": [], "turns": 0}
+            return {"summary": entry["summary"], "messages": list(entry["messages"]), "turns": entry["turns"]}
+
+    def append(self, conversation_id, user_text, reply):
+        """Records one guest message and the reply to it."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._conversations.get(conversation_id)
+            if entry is None:
+                entry = self._conversations[conversation_id] = {"summary": "", "messages": [], "turns": 0}
+            self._conversations.move_to_end(conversation_id)
+            entry["last_used"] = now
+            add_turn(entry, user_text, reply, self.max_messages, self.summary_chars)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+                self.evictions["lru"] += 1
+
+    def delete(self, conversation_id):
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+
+    def prune(self):
+        """Drops conversations idle for longer than `ttl_seconds`. Returns how many were removed."""
+        with self._lock:
+            before = len(self._conversations)
+            self._expire(time.monotonic())
+            return before - len(self._conversations)
+
+    def _expire(self, now):
+        if not self.ttl_seconds:
+            return
+        # Kept in LRU order, so expired conversations are always at the front.
+        while self._conversations:
+            entry = next(iter(self._conversations.values()))
+            if now - entry["last_used"] < self.ttl_seconds:
+                break
+            self._conversations.popitem(last=False)
+            self.evictions["ttl"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "conversations": len(self._conversations), "evictions": dict(self.evictions)}
+
+
+class DatabaseConversationStore:
+    """
+    Same interface as MemoryConversationStore, kept in the application database
+    (`conversations` / `conversation_messages`) so conversations survive restarts
+    and are shared between worker processes.
+    """
+
+    def __init__(self, ttl_seconds=86400, max_messages=20, summary_chars=1500):
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.summary_chars = summary_chars
+
+    def context(self, conversation_id):
+        db = SessionLocal()
+        try:
+            conversation = db.get(Conversation, conversation_id)
+            if conversation is None:
+                return {"summary": "", "messages": [], "turns": 0}
+            rows = (
+                db.query(ConversationMessage.role, ConversationMessage.content)
+                .filter(ConversationMessage.conversation_id == conversation_id)
+                .order_by(ConversationMessage.id)
+                .all()
+            )
+            messages = [{"role": row.role, "content": row.content} for row in rows]
+            return {"summary": conversation.summary or "", "messages": messages, "turns": conversation.turns}
+        finally:
+            db.close()
+
+    def append(self, conversation_id, user_text, reply):
+        db = SessionLocal()
+        try:
+            conversation = db.get(Conversation, conversation_id)
+            if conversation is None:
+                conversation = Conversation(id=conversation_id, summary="", turns=0)
+                db.add(conversation)
+            conversation.turns += 1
+            conversation.updated_at = datetime.utcnow()
+            db.add_all([
+                ConversationMessage(conversation_id=conversation_id, role="user", content=user_text),
+                ConversationMessage(conversation_id=conversation_id, role="assistant", content=reply),
+            ])
+            db.flush()
+
+            count = db.query(ConversationMessage).filter(ConversationMessage.conversation_id == conversation_id).count()
+            overflow = count - self.max_messages
+            if overflow > 0:
+                oldest = (
+                    db.query(ConversationMessage)
+                    .filter(ConversationMessage.conversation_id == conversation_id)
+                    .order_by(ConversationMessage.id)
+                    .limit(overflow)
+                    .all()
+                )
+                folded = [{"role": row.role, "content": row.content} for row in oldest]
+                conversation.summary = summarize(conversation.summary, folded, self.summary_chars)
+                for row in oldest:
+                    db.delete(row)
+            db.commit()
+        finally:
+            db.close()
+
+    def delete(self, conversation_id):
+        db = SessionLocal()
+        try:
+            db.query(ConversationMessage).filter(ConversationMessage.conversation_id == conversation_id).delete()
+            db.query(Conversation).filter(Conversation.id == conversation_id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def prune(self):
+        """Drops conversations idle for longer than `ttl_seconds`. Returns how many were removed."""
+        if not self.ttl_seconds:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        db = SessionLocal()
+        try:
+            stale = db.query(Conversation.id).filter(Conversation.updated_at < cutoff)
+            db.query(ConversationMessage).filter(
+                ConversationMessage.conversation_id.in_(stale.scalar_subquery())
+            ).delete(synchronize_session=False)
+            deleted = db.query(Conversation).filter(Conversation.updated_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self):
+        db = SessionLocal()
+        try:
+            return {"backend": "database", "conversations": db.query(Conversation).count()}
+        finally:
+            db.close()
+
+
+class SharedConversationStore:
+    """
+    Same interface as MemoryConversationStore, kept in the shared state (SHARED_STATE_URL)
+    as one JSON value per conversation, so any worker can pick up the next message.
+    The value expires after `ttl_seconds` without a new turn.
+    """
+
+    def __init__(self, state, ttl_seconds=86400, max_messages=20, summary_chars=1500):
+        self.state = state
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.summary_chars = summary_chars
+
+    def context(self, conversation_id):
+        value = self.state.get(f"conversation:{conversation_id}")
+        if value is None:
+            return {"summary": "", "messages": [], "turns": 0}
+        return json.loads(value)
+
+    def append(self, conversation_id, user_text, reply):
+        # Read-modify-write: a guest's messages arrive one at a time, so turns of one
+        # conversation don't race each other.
+        entry = self.context(conversation_id)
+        add_turn(entry, user_text, reply, self.max_messages, self.summary_chars)
+        self.state.set(f"conversation:{conversation_id}", json.dumps(entry), ex=int(self.ttl_seconds) or None)
+
+    def delete(self, conversation_id):
+        self.state.delete(f"conversation:{conversation_id}")
+
+    def prune(self):
+        """Idle conversations expire in the shared state itself."""
+        return 0
+
+    def stats(self):
+        return {"backend": "shared"}
+
+
+def make_conversation_store():
+    """
+    Builds the store selected by CONVERSATION_STORE: "memory", "database" or "shared".
+    Defaults to "shared" when SHARED_STATE_URL is set and to "memory" otherwise.
+    """
+    ttl_seconds = float(os.getenv("CONVERSATION_TTL_SECONDS", "86400"))
+    max_messages = int(os.getenv("CONVERSATION_MAX_MESSAGES", "20"))
+    summary_chars = int(os.getenv("CONVERSATION_SUMMARY_CHARS", "1500"))
+    kind = os.getenv("CONVERSATION_STORE", "shared" if SHARED_STATE_ENABLED else "memory")
+    if kind == "database":
+        return DatabaseConversationStore(ttl_seconds, max_messages, summary_chars)
+    if kind == "shared":
+        return SharedConversationStore(shared_state, ttl_seconds, max_messages, summary_chars)
+    return MemoryConversationStore(
+        max_conversations=int(os.getenv("CONVERSATION_MAX_COUNT", "1000")),
+        ttl_seconds=ttl_seconds,
+        max_messages=max_messages,
+        summary_chars=summary_chars,
+    )
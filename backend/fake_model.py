@@ -0,0 +1,169 @@
+"""
+Deterministic stand-in for `genai.GenerativeModel`, so the agents can run without a
+Gemini key or network access (benchmarks, load tests in CI). Enable it for the API with
+MODEL_BACKEND=fake, or pass `model_factory=FakeModel` to AgentManager.
+
+Every call waits `latency` seconds (FAKE_MODEL_LATENCY_MS) and answers with `reply`.
+With a `script` (ScriptedFakeModel uses DEFAULT_SCRIPT), a user message matching one of
+its rules is routed to the rule's agent, which calls the rule's tool before replying
+(async, non-streaming path). With `stream=True` the reply is emitted
+word by word, `chunk_latency` apart. Setting `tool_call` to (name, args) makes every
+non-router turn that follows a user message call that tool, whatever the message.
+`calls` counts every model request made.
+"""
+import asyncio
+import os
+import re
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from google.generativeai import protos
+
+from .agents import ROUTER_PROMPT
+
+# (keywords, agent, tool, arguments): the first rule with a keyword in the message applies.
+# "{room}" is replaced by the room number mentioned in the message ("room 204"), or "101".
+DEFAULT_SCRIPT = [
+    (("order", "dosa", "biryani", "hungry"), "Restaurant", "place_restaurant_order",
+     {"room_number": "{room}", "items_dict": {"Masala Dosa": 1, "Masala Chai": 1}}),
+    (("menu",), "Restaurant", "show_menu", {}),
+    (("towel", "clean", "pillow", "ac ", "broken"), "RoomService", "create_room_service_request",
+     {"room_number": "{room}", "request_type": "Housekeeping", "details": "Requested via chat"}),
+    (("book",), "Receptionist", "book_room",
+     {"room_type": "Standard", "check_in": "{check_in}", "check_out": "{check_out}", "guest_name": "Load Test"}),
+    (("available", "vacancy"), "Receptionist", "check_room_availability", {}),
+    (("wifi", "wi-fi", "pool", "spa", "gym", "check-out", "checkout"), "Receptionist", "get_facility_info",
+     {"facility_name": "{keyword}"}),
+]
+
+ROOM_PATTERN = re.compile(r"room\s*(\d+)", re.IGNORECASE)
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _response(text):
+    content = protos.Content(role="model", parts=[protos.Part(text=text)])
+    return SimpleNamespace(candidates=[protos.Candidate(content=content)], text=text)
+
+
+def _tool_response(name, args):
+    call = protos.FunctionCall(name=name, args=args)
+    content = protos.Content(role="model", parts=[protos.Part(function_call=call)])
+    return SimpleNamespace(candidates=[protos.Candidate(content=content)], text="")
+
+
+def _fill(value, fields):
+    if isinstance(value, str):
+        return value.format(**fields)
+    if isinstance(value, dict):
+        return {key: _fill(item, fields) for key, item in value.items()}
+    return value
+
+
+def match_script(script, text):
+    """The (agent, tool, arguments) the script picks for `text`, or None."""
+    lowered = text.lower()
+    for keywords, agent, tool, arguments in script:
+        keyword = next((k for k in keywords if k in lowered), None)
+        if keyword is None:
+            continue
+        room = ROOM_PATTERN.search(text)
+        # Stays without dates in the message start a month from now and last two nights.
+        dates = DATE_PATTERN.findall(text) or [(date.today() + timedelta(days=days)).isoformat() for days in (30, 32)]
+        fields = {
+            "room": room.group(1) if room else "101",
+            "keyword": keyword.strip(),
+            "check_in": dates[0],
+            "check_out": dates[-1],
+        }
+        return agent, tool, _fill(arguments, fields)
+    return None
+
+
+class FakeStream:
+    def __init__(self, model, text):
+        self.model = model
+        self.pieces = [word + " " for word in text.split(" ")]
+        self.candidates = []
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.model.latency)
+        for piece in self.pieces:
+            yield _response(piece)
+            await asyncio.sleep(self.model.chunk_latency)
+        self.candidates = _response("".join(self.pieces)).candidates
+
+
+class FakeChat:
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, text):
+        self.history.append(protos.Content(role="user", parts=[protos.Part(text=text)]))
+        response = self.model.generate_content(self.history)
+        self.history.append(response.candidates[0].content)
+        return response
+
+
+class FakeModel:
+    latency = float(os.getenv("FAKE_MODEL_LATENCY_MS", "100")) / 1000
+    chunk_latency = 0.0
+    reply = "Happy to help with that!"
+    script = ()
+    tool_call = None
+    calls = 0
+
+    def __init__(self, model_name=None, tools=None, system_instruction=None):
+        self.is_router = system_instruction == ROUTER_PROMPT
+        self.tool_names = {tool.__name__ for tool in tools or []}
+
+    def _user_text(self, contents):
+        if isinstance(contents, str):
+            return contents
+        if isinstance(contents, list):
+            return " ".join(part.text for part in contents[-1].parts if part.text)
+        return ""
+
+    def _text(self, contents=None):
+        if not self.is_router:
+            return self.reply
+        matched = match_script(self.script, self._user_text(contents))
+        return matched[0] if matched else "Receptionist"
+
+    def start_chat(self, history=None, enable_automatic_function_calling=False):
+        return FakeChat(self, history)
+
+    def _full_latency(self):
+        return self.latency + self.chunk_latency * len(self.reply.split(" "))
+
+    def _tool_for(self, contents):
+        # Only a turn that follows a user message (not a tool result) calls a tool.
+        if self.is_router or not isinstance(contents, list) or not any(part.text for part in contents[-1].parts):
+            return None
+        if self.tool_call is not None:
+            return self.tool_call
+        matched = match_script(self.script, self._user_text(contents))
+        if matched and matched[1] in self.tool_names:
+            return matched[1], matched[2]
+        return None
+
+    def generate_content(self, contents):
+        FakeModel.calls += 1
+        time.sleep(self._full_latency())
+        return _response(self._text(contents))
+
+    async def generate_content_async(self, contents, stream=False):
+        FakeModel.calls += 1
+        if stream:
+            return FakeStream(self, self._text(contents))
+        await asyncio.sleep(self._full_latency())
+        tool = self._tool_for(contents)
+        if tool is not None:
+            return _tool_response(*tool)
+        return _response(self._text(contents))
+
+
+class ScriptedFakeModel(FakeModel):
+    """FakeModel that routes and calls tools per DEFAULT_SCRIPT; what MODEL_BACKEND=fake uses."""
+    script = DEFAULT_SCRIPT
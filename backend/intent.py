@@ -0,0 +1,74 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from .intent_examples import EXAMPLES
+
+# --- Local Intent Classifier ---
+# A small multinomial Naive Bayes model over word unigrams and bigrams.
+# It answers the obvious routing cases locally; anything below the confidence
+# threshold still goes to the LLM router.
+
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "you", "your", "to", "for", "of", "in", "on",
+    "is", "are", "do", "does", "can", "could", "would", "please", "some", "and", "it", "this",
+    "that", "there", "be", "what", "what's", "how", "when", "where", "get", "want", "like",
+    "i'd", "i'm", "have", "any", "at", "with", "room",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    words = []
+    for word in _TOKEN_RE.findall(text.lower().replace("-", "")):
+        # Crude plural folding so "towels"/"towel" share a feature.
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word in STOPWORDS or word.isdigit():
+            continue
+        words.append(word)
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    def __init__(self, examples=EXAMPLES, alpha=0.5):
+        self.alpha = alpha
+        self.labels = sorted({label for _, label in examples})
+        doc_counts = Counter(label for _, label in examples)
+        self.log_priors = {label: math.log(doc_counts[label] / len(examples)) for label in self.labels}
+
+        word_counts = defaultdict(Counter)
+        for text, label in examples:
+            word_counts[label].update(tokenize(text))
+        self.vocab = set().union(*word_counts.values())
+
+        # Precompute log-likelihoods so prediction is a handful of dict lookups.
+        self.log_likelihoods = {}
+        self.unseen = {}
+        for label in self.labels:
+            denom = sum(word_counts[label].values()) + alpha * len(self.vocab)
+            self.log_likelihoods[label] = {
+                w: math.log((c + alpha) / denom) for w, c in word_counts[label].items()
+            }
+            self.unseen[label] = math.log(alpha / denom)
+
+    def predict(self, text):
+        """
+        Returns (label, confidence) where confidence is the posterior of the best label.
+        Text with no known words gets a confidence of 0.
+        """
+        tokens = [t for t in tokenize(text) if t in self.vocab]
+        if not tokens:
+            return "Receptionist", 0.0
+
+        scores = {}
+        for label in self.labels:
+            likelihoods = self.log_likelihoods[label]
+            unseen = self.unseen[label]
+            scores[label] = self.log_priors[label] + sum(likelihoods.get(t, unseen) for t in tokens)
+
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        total = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / total
@@ -0,0 +1,100 @@
+# Labelled guest utterances used to train the local intent classifier in `intent.py`.
+# Labels match the agent names returned by the LLM router.
+
+EXAMPLES = [
+    # Receptionist
+    ("What time is check-in?", "Receptionist"),
+    ("When is check out?", "Receptionist"),
+    ("What is the checkout time", "Receptionist"),
+    ("Can I check in early?", "Receptionist"),
+    ("Is late check-out possible?", "Receptionist"),
+    ("What's the wifi password?", "Receptionist"),
+    ("How do I connect to the wifi", "Receptionist"),
+    ("Is there free wi-fi in the rooms?", "Receptionist"),
+    ("Where can I park my car?", "Receptionist"),
+    ("Is parking free?", "Receptionist"),
+    ("Do you have valet parking", "Receptionist"),
+    ("What are the gym hours?", "Receptionist"),
+    ("When does the gym open", "Receptionist"),
+    ("Where is the fitness center?", "Receptionist"),
+    ("Is the pool open now?", "Receptionist"),
+    ("What time does the swimming pool close", "Receptionist"),
+    ("How do I book a spa massage?", "Receptionist"),
+    ("What are the spa timings", "Receptionist"),
+    ("Do you have any deluxe rooms available?", "Receptionist"),
+    ("Is a suite available for this weekend?", "Receptionist"),
+    ("I want to book a room", "Receptionist"),
+    ("How much is a standard room per night?", "Receptionist"),
+    ("Check room availability for tomorrow", "Receptionist"),
+    ("Are there rooms free next week?", "Receptionist"),
+    ("What are the restaurant opening hours?", "Receptionist"),
+    ("When is breakfast served?", "Receptionist"),
+    ("What facilities does the resort have?", "Receptionist"),
+    ("Can I extend my stay by one night?", "Receptionist"),
+    ("Where is the reception desk?", "Receptionist"),
+    ("Do you offer airport pickup?", "Receptionist"),
+    ("What is the room rate for a suite", "Receptionist"),
+    ("I'd like to reserve a deluxe room", "Receptionist"),
+
+    # Restaurant
+    ("Show me the menu", "Restaurant"),
+    ("Can I see the food menu?", "Restaurant"),
+    ("What's on the menu today?", "Restaurant"),
+    ("What do you have for dinner?", "Restaurant"),
+    ("I'm hungry, what can I eat?", "Restaurant"),
+    ("I want to order food", "Restaurant"),
+    ("Order 2 masala dosa to room 204", "Restaurant"),
+    ("Can I get a butter chicken and garlic naan", "Restaurant"),
+    ("I'd like to order a paneer tikka", "Restaurant"),
+    ("Please send one chicken biryani", "Restaurant"),
+    ("Do you have vegetarian dishes?", "Restaurant"),
+    ("What desserts do you have?", "Restaurant"),
+    ("How much is the gulab jamun?", "Restaurant"),
+    ("Get me a cold coffee", "Restaurant"),
+    ("One masala chai please", "Restaurant"),
+    ("What drinks are available?", "Restaurant"),
+    ("Add a sweet lassi to my order", "Restaurant"),
+    ("I want breakfast in my room", "Restaurant"),
+    ("Can I order dal makhani and roti", "Restaurant"),
+    ("What starters do you recommend?", "Restaurant"),
+    ("Is the fish fry spicy?", "Restaurant"),
+    ("What is the price of the veg biryani", "Restaurant"),
+    ("I'd like to place a food order", "Restaurant"),
+    ("Send some ice cream to my room", "Restaurant"),
+    ("Any non-veg main course options?", "Restaurant"),
+    ("Bring me two mineral water bottles and a soft drink", "Restaurant"),
+    ("Can I get something to eat", "Restaurant"),
+    ("What breads do you serve?", "Restaurant"),
+    ("How much does the butter chicken cost?", "Restaurant"),
+    ("What is the price of a plate of idli", "Restaurant"),
+
+    # RoomService
+    ("I need fresh towels", "RoomService"),
+    ("Please send extra towels to room 310", "RoomService"),
+    ("Can someone clean my room?", "RoomService"),
+    ("My room needs cleaning", "RoomService"),
+    ("Please make up the room", "RoomService"),
+    ("I need my laundry picked up", "RoomService"),
+    ("Can you do laundry for me?", "RoomService"),
+    ("We ran out of soap", "RoomService"),
+    ("Need more shampoo and toiletries", "RoomService"),
+    ("Please bring an extra pillow", "RoomService"),
+    ("Can I get another blanket", "RoomService"),
+    ("The AC is not working", "RoomService"),
+    ("The shower is broken, please fix it", "RoomService"),
+    ("The TV remote doesn't work", "RoomService"),
+    ("Please change the bed sheets", "RoomService"),
+    ("Housekeeping please", "RoomService"),
+    ("Send housekeeping to room 112", "RoomService"),
+    ("I need an iron and ironing board", "RoomService"),
+    ("Can I get a toothbrush kit", "RoomService"),
+    ("There is no toilet paper", "RoomService"),
+    ("Please replace the bath towels", "RoomService"),
+    ("The light bulb in my room is out", "RoomService"),
+    ("Need dry cleaning for my suit", "RoomService"),
+    ("Can someone take out the trash", "RoomService"),
+    ("Request turndown service", "RoomService"),
+    ("We need an extra bed in the room", "RoomService"),
+    ("Please refill the minibar water", "RoomService"),
+    ("Could you send a hair dryer", "RoomService"),
+]
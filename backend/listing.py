@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+# --- Keyset Pagination ---
+# Lists are returned newest first, ordered by (created_at, id). The cursor encodes the
+# last row of a page, so every page is an index range scan no matter how deep it is.
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def parse_fields(model, fields):
+    """Columns to return for a comma-separated `fields` list (all columns when empty)."""
+    columns = model.__table__.columns
+    if not fields:
+        return list(columns.keys())
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+def list_page(db, model, filters, cursor=None, limit=50, fields=None):
+    """
+    Returns {"items": [...], "next_cursor": ...} for one page of `model` rows.
+    Args:
+        filters: SQLAlchemy conditions to apply (status, room, date range...).
+        cursor: `next_cursor` from the previous page, if any.
+        limit: Page size, capped at MAX_PAGE_SIZE.
+        fields: Comma-separated column names to project.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    names = parse_fields(model, fields)
+    # created_at and id are always fetched so the next cursor can be built.
+    selected = list(dict.fromkeys(names + ["created_at", "id"]))
+
+    query = db.query(*(getattr(model, name) for name in selected)).filter(*filters)
+    if cursor:
+        query = query.filter(tuple_(model.created_at, model.id) < decode_cursor(cursor))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [{name: getattr(row, name) for name in names} for row in rows]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
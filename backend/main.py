@@ -1,13 +1,62 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Optional
 from sqlalchemy.orm import Session
-from .database import get_db
+from .changes import changes_since, current_cursor, prune_change_log
+from .database import SessionLocal, get_db, init_db
+from .listing import list_page
 from .models import Order, ServiceRequest
-from .agents import manager
+from .agents import AGENT_SPECS, get_manager, load_genai
+from .availability import availability, parse_stay
+from .pricing import pricing
+from .sales import sales_report
+from .tools import DIET_FILTERS, collect_displays, menu_display
+from . import actions, work_queue
+from .admission import Overloaded, rate_limit_wait
+from .menu_cache import menu_cache
+from .metrics import TimingMiddleware, render_metrics, span
+from .shared_state import shared_state
+from .write_queue import WRITE_BEHIND_ENABLED, write_queue
 
-app = FastAPI(title="Resort Agent System")
+def warm_up():
+    # Runs after the server is already accepting requests, so a new worker starts
+    # fast and the first chat usually finds the agent layer ready.
+    get_manager().conversations.prune()
+    if os.getenv("PRELOAD_GENAI", "1") == "1":
+        load_genai()
+
+@asynccontextmanager
+async def lifespan(app):
+    init_db()
+    db = SessionLocal()
+    try:
+        prune_change_log(db, float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7")))
+    finally:
+        db.close()
+    if WRITE_BEHIND_ENABLED:
+        write_queue.start() # Replays anything a previous run journaled but did not commit
+    app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    if WRITE_BEHIND_ENABLED:
+        write_queue.stop()
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose encoding is recorded as the `serialize` stage."""
+
+    def render(self, content):
+        with span("serialize", "json"):
+            return super().render(content)
+
+app = FastAPI(title="Resort Agent System", lifespan=lifespan, default_response_class=TimedJSONResponse)
+app.add_middleware(TimingMiddleware) # Per-stage histograms for /metrics, Server-Timing on request
 
 # CORS
 app.add_middleware(
@@ -20,33 +69,356 @@ app.add_middleware(
 
 # --- Schemas ---
 class ChatRequest(BaseModel):
-    history: List[Dict[str, str]] # List of {"role": "user", "content": "..."}
+    message: Optional[str] = None # The new guest message; earlier turns are kept server-side
+    conversation_id: Optional[str] = None # Identifies the conversation the message belongs to
+    room_number: Optional[str] = None # Guest's room, for the per-room rate limit (else per conversation)
+    history: Optional[List[Dict[str, str]]] = None # Legacy: full list of {"role": "user", "content": "..."}
+
+    def to_history(self):
+        if self.message is not None:
+            return [{"role": "user", "content": self.message}]
+        if self.history:
+            return self.history
+        raise HTTPException(status_code=422, detail="Send either `message` or `history`.")
 
 class ChatResponse(BaseModel):
     response: str
+    displays: List[Dict[str, Any]] = [] # Shown to the guest as is, e.g. {"type": "menu", "categories": [...]}
+
+BUSY_MESSAGE = "We're helping a lot of guests right now. Please try again in a moment."
+
+async def check_rate_limit(request: ChatRequest):
+    """Raises 429 when the guest's room (or conversation) has sent too many messages this window."""
+    retry_after = await asyncio.to_thread(rate_limit_wait, request.room_number or request.conversation_id)
+    if retry_after:
+        raise HTTPException(status_code=429, headers={"Retry-After": str(retry_after)},
+                            detail="You're sending messages very quickly. Please wait a moment and try again.")
 
 # --- Endpoints ---
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
+    history = request.to_history()
+    await check_rate_limit(request)
     try:
-        response_text = manager.chat(request.history)
-        return {"response": response_text}
+        with collect_displays() as displays:
+            response_text = await get_manager().chat_async(history, request.conversation_id)
+        return {"response": response_text, "displays": displays}
+    except Overloaded as e:
+        # Shed before any model call, so the guest hears back at once instead of after a long queue.
+        raise HTTPException(status_code=503, detail=BUSY_MESSAGE, headers={"Retry-After": str(e.retry_after)})
+    except asyncio.TimeoutError:
+        print("Chat request timed out")
+        raise HTTPException(status_code=504, detail="The assistant took too long to respond. Please try again.")
     except Exception as e:
         import traceback
         traceback.print_exc()
         print(f"Error processing chat request: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Server-Sent Events version of /chat. Emits {"type": "delta", "text": ...} events as the
+    reply is generated, then a final {"type": "done", "response": <full text>, "displays": [...]} event.
+    When the chat is shed under load, a single {"type": "busy", "detail": ..., "retry_after": s} event.
+    """
+    history = request.to_history()
+    await check_rate_limit(request)
+
+    async def events():
+        reply = []
+        try:
+            with collect_displays() as displays:
+                async for piece in get_manager().chat_stream(history, request.conversation_id):
+                    reply.append(piece)
+                    yield sse_event({"type": "delta", "text": piece})
+            yield sse_event({"type": "done", "response": "".join(reply), "displays": displays})
+        except Overloaded as e:
+            yield sse_event({"type": "busy", "detail": BUSY_MESSAGE, "retry_after": e.retry_after})
+        except asyncio.TimeoutError:
+            print("Chat stream timed out")
+            yield sse_event({"type": "error", "detail": "The assistant took too long to respond. Please try again."})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            print(f"Error processing chat stream: {e}")
+            yield sse_event({"type": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --- Structured Actions ---
+
+class ActionRequest(BaseModel):
+    arguments: Dict[str, Any] = {}
+    conversation_id: Optional[str] = None # Record the action in this conversation
+
+@app.get("/actions")
+def get_actions():
+    """Tools that can be called directly, with their argument schemas."""
+    return actions.list_actions()
+
+@app.post("/actions/{action_name}")
+def run_action(action_name: str, request: ActionRequest):
+    """Calls an agent tool directly with validated arguments, without the model."""
+    return actions.run_action(action_name, request.arguments, request.conversation_id)
+
+@app.get("/conversations/{conversation_id}")
+async def get_conversation(conversation_id: str):
+    """The context kept for a conversation: a summary of older turns plus the latest messages."""
+    return await asyncio.to_thread(get_manager().conversations.context, conversation_id)
+
+@app.delete("/conversations/{conversation_id}")
+async def delete_conversation(conversation_id: str):
+    manager = get_manager()
+    await asyncio.to_thread(manager.conversations.delete, conversation_id)
+    for agent_type in AGENT_SPECS:
+        manager.pool.discard(agent_type, conversation_id)
+    return {"deleted": conversation_id}
+
+def list_filters(model, status, room_number, created_from, created_to):
+    filters = []
+    if status:
+        filters.append(model.status == status)
+    if room_number:
+        filters.append(model.room_number == room_number)
+    if created_from:
+        filters.append(model.created_at >= created_from)
+    if created_to:
+        filters.append(model.created_at < created_to)
+    return filters
+
 @app.get("/orders")
-def get_orders(db: Session = Depends(get_db)):
-    orders = db.query(Order).all()
-    return orders
+def get_orders(
+    status: Optional[str] = None,
+    room_number: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Newest orders first, one page at a time. Pass `next_cursor` back as `cursor` for the next page."""
+    filters = list_filters(Order, status, room_number, created_from, created_to)
+    return list_page(db, Order, filters, cursor, limit, fields)
 
 @app.get("/requests")
-def get_requests(db: Session = Depends(get_db)):
-    requests = db.query(ServiceRequest).all()
-    return requests
+def get_requests(
+    status: Optional[str] = None,
+    room_number: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Newest service requests first, paginated the same way as /orders."""
+    filters = list_filters(ServiceRequest, status, room_number, created_from, created_to)
+    return list_page(db, ServiceRequest, filters, cursor, limit, fields)
+
+@app.get("/menu")
+def get_menu(category: Optional[str] = None, diet: Optional[str] = None):
+    """The menu as structured data for the frontend to render, optionally one category or diet."""
+    diets = None
+    if diet:
+        diets = DIET_FILTERS.get(diet.strip().lower().replace(" ", "-"))
+        if diets is None:
+            raise HTTPException(status_code=422, detail=f"Unknown diet '{diet}'. Use veg, egg or non-veg.")
+    return menu_display(menu_cache.snapshot().select(category, diets))
+
+@app.get("/reports/sales")
+def get_sales_report(
+    dimension: Literal["item", "category", "room"] = "item",
+    period: Literal["hour", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+):
+    """Top dishes, categories or rooms by revenue between `start` and `end` (default: the last 7 days), with totals per hour or day."""
+    return sales_report(db, dimension, period, start, end, limit)
+
+class JobUpdate(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[int] = None
+    expected_status: Optional[str] = None # Fail with 409 if the job is no longer in this status
+
+@app.put("/orders/{order_id}")
+def update_order(order_id: int, update: JobUpdate, db: Session = Depends(get_db)):
+    """Moves an order along Pending -> Preparing -> Delivered and/or changes its priority."""
+    return work_queue.update_job(db, "orders", order_id, update.status, update.priority, update.expected_status)
+
+@app.put("/requests/{request_id}")
+def update_request(request_id: int, update: JobUpdate, db: Session = Depends(get_db)):
+    """Moves a service request along Pending -> In Progress -> Completed and/or changes its priority."""
+    return work_queue.update_job(db, "requests", request_id, update.status, update.priority, update.expected_status)
+
+# --- Staff Work Queue ---
+
+@app.post("/queue/{queue_name}/claim")
+def claim_job(queue_name: str, worker: str, db: Session = Depends(get_db)):
+    """Assigns the most urgent pending job to `worker`. Returns {"job": null} when there is none."""
+    return {"job": work_queue.claim_next(db, queue_name, worker)}
+
+@app.post("/queue/{queue_name}/{job_id}/ack")
+def ack_job(queue_name: str, job_id: int, worker: str, db: Session = Depends(get_db)):
+    """Marks a job claimed by `worker` as done."""
+    return work_queue.ack(db, queue_name, job_id, worker)
+
+@app.post("/queue/{queue_name}/{job_id}/release")
+def release_job(queue_name: str, job_id: int, worker: str, db: Session = Depends(get_db)):
+    """Puts a job claimed by `worker` back in the queue."""
+    return work_queue.release(db, queue_name, job_id, worker)
+
+@app.get("/queue/stats")
+def get_queue_stats(db: Session = Depends(get_db)):
+    return work_queue.queue_stats(db)
+
+# --- Rooms & Bookings ---
+
+class BookingRequest(BaseModel):
+    room_type: str
+    check_in: str # YYYY-MM-DD
+    check_out: str # YYYY-MM-DD, morning of departure
+    guest_name: str = ""
+
+def stay_dates(check_in, check_out):
+    try:
+        return parse_stay(check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/rooms/availability")
+def get_availability(check_in: Optional[str] = None, check_out: Optional[str] = None, room_type: Optional[str] = None):
+    """Free rooms per room type (or for one `room_type`) for the stay."""
+    check_in, check_out = stay_dates(check_in, check_out)
+    if room_type:
+        key = availability.match_type(room_type)
+        if key is None:
+            raise HTTPException(status_code=404, detail=f"Unknown room type '{room_type}'.")
+        free = {key: availability.count_free(key, check_in, check_out)}
+    else:
+        free = availability.summary(check_in, check_out)
+    return {"check_in": check_in.isoformat(), "check_out": check_out.isoformat(), "free": free}
+
+@app.post("/bookings")
+def create_booking(request: BookingRequest):
+    check_in, check_out = stay_dates(request.check_in, request.check_out)
+    key = availability.match_type(request.room_type)
+    if key is None:
+        raise HTTPException(status_code=404, detail=f"Unknown room type '{request.room_type}'.")
+    try:
+        total = pricing.quote(key, check_in, check_out)["total"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    booking = availability.book(key, check_in, check_out, request.guest_name, total)
+    if booking is None:
+        raise HTTPException(status_code=409, detail=f"No {key} rooms are free for those dates.")
+    return booking
+
+@app.get("/rooms/quote")
+def get_quote(room_type: str, check_in: str, check_out: Optional[str] = None):
+    """Nightly rates and total for a stay."""
+    check_in, check_out = stay_dates(check_in, check_out)
+    key = availability.match_type(room_type)
+    if key is None:
+        raise HTTPException(status_code=404, detail=f"Unknown room type '{room_type}'.")
+    try:
+        return pricing.quote(key, check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/pricing/rates")
+def get_rates():
+    """The whole rate table: one list of nightly rates per room type, starting today."""
+    pricing.refresh()
+    return {
+        "start": pricing.origin.isoformat(),
+        "rates": {room_type: pricing.rates[row].tolist() for row, room_type in enumerate(pricing.room_types)},
+    }
+
+@app.post("/pricing/reprice")
+def reprice():
+    """Recomputes every rate of the horizon, e.g. after base rates or pricing factors change."""
+    return pricing.reprice()
+
+@app.delete("/bookings/{booking_id}")
+def cancel_booking(booking_id: int):
+    booking = availability.cancel(booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail=f"No active booking {booking_id}.")
+    return booking
+
+@app.get("/changes")
+def get_changes(cursor: Optional[int] = None, limit: int = 500, db: Session = Depends(get_db)):
+    """
+    Orders and requests created or updated after `cursor`, plus the cursor to use next time.
+    Without a cursor, only the current cursor is returned (call this before loading the lists).
+    """
+    if cursor is None:
+        return {"cursor": current_cursor(db), "has_more": False, "reset": False, "orders": [], "requests": []}
+    return changes_since(db, cursor, max(1, min(limit, 1000)))
+
+@app.get("/changes/stream")
+async def stream_changes(cursor: Optional[int] = None, poll_seconds: float = 1.0):
+    """Server-Sent Events push of the /changes feed: one event per batch of changes."""
+    def poll(cursor):
+        db = SessionLocal()
+        try:
+            if cursor is None:
+                return {"cursor": current_cursor(db), "orders": [], "requests": []}
+            return changes_since(db, cursor)
+        finally:
+            db.close()
+
+    async def events(cursor):
+        while True:
+            batch = await asyncio.to_thread(poll, cursor)
+            if cursor is None or batch["orders"] or batch["requests"]:
+                yield f"data: {json.dumps(jsonable_encoder(batch))}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            cursor = batch["cursor"]
+            if not batch.get("has_more"):
+                await asyncio.sleep(max(poll_seconds, 0.2))
+
+    return StreamingResponse(
+        events(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/stats")
+def get_stats():
+    manager = get_manager()
+    return {
+        "agent_pool": manager.stats(),
+        "routing": manager.routing_stats(),
+        "menu_cache": menu_cache.stats(),
+        "answer_cache": manager.answer_cache.stats(),
+        "admission": dict(manager.admission.stats(),
+                          single_flight=manager.inflight.stats() if manager.inflight is not None else None),
+        "conversations": manager.conversations.stats(),
+        "write_queue": write_queue.stats(),
+        "availability": availability.stats(),
+        "pricing": pricing.stats(),
+        # Other numbers are per worker; the pid says which worker answered.
+        "worker": {"pid": os.getpid(), "shared_state": type(shared_state).__name__},
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Latency histograms per HTTP route and per stage, in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,189 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .database import SessionLocal
+from .menu_index import MenuIndex, normalize_name
+from .models import CacheVersion, MenuItem
+from .shared_state import SHARED_STATE_ENABLED, shared_state
+
+# --- Menu Cache ---
+# The menu changes maybe once a day, so it is grouped and rendered once and kept in memory.
+# Writes through the ORM in this process invalidate it on commit; writes from other
+# processes bump the `menu` row in `cache_versions` (via database triggers), which is
+# checked at most every `check_interval` seconds. With SHARED_STATE_URL set, an
+# invalidation also bumps a counter in the shared state that is part of that check, so
+# workers on other nodes (or on databases without the triggers) rebuild too.
+
+# Preferred order for categories; anything else follows alphabetically.
+CATEGORY_ORDER = ["Vegetarian Starter", "Non-Vegetarian Starter", "Veg Starter", "Non-Veg Starter",
+                  "Vegetarian Main Course", "Non-Vegetarian Main Course", "Veg Main Course", "Non-Veg Main Course",
+                  "Breads", "Desserts", "Drinks", "Miscellaneous"]
+CATEGORY_RANK = {cat: i for i, cat in enumerate(CATEGORY_ORDER)}
+
+MENU_HEADER = "🍽️ **Resort Menu** 🍽️\n\n"
+
+# Diet of a dish, from its category ("Non-Veg Starter") or, failing that, its name.
+DIETS = ("veg", "egg", "non-veg")
+# Whole words, matched after normalize_name, so "Eggplant" or "Veggie" are not egg dishes.
+NON_VEG_WORDS = {"chicken", "mutton", "lamb", "fish", "prawn", "keema", "meat", "crab", "beef", "pork"}
+EGG_WORDS = {"egg", "omelette"}
+# Words guests (and the model) use for each diet filter -> the diets it allows.
+DIET_FILTERS = {
+    "veg": ("veg",), "vegetarian": ("veg",), "veggie": ("veg",),
+    "egg": ("veg", "egg"), "eggetarian": ("veg", "egg"),
+    "non-veg": ("non-veg",), "nonveg": ("non-veg",), "non-vegetarian": ("non-veg",), "meat": ("non-veg",),
+}
+
+
+def _diet_words(text):
+    # Words of a dish name, minus those it says it is free of ("Chicken-free Veg Kebab").
+    words = normalize_name(text).split()
+    return {word for word, after in zip(words, words[1:] + [""]) if after != "free"}
+
+
+def dish_diet(name, category):
+    if " non veg " in f" {normalize_name(category or '')} ":
+        return "non-veg"
+    words = _diet_words(name)
+    if words & NON_VEG_WORDS:
+        return "non-veg"
+    if words & EGG_WORDS:
+        return "egg"
+    return "veg"
+
+
+class MenuSnapshot:
+    """Immutable, pre-rendered view of the menu at one cache version."""
+
+    def __init__(self, items, version):
+        self.version = version
+        grouped = {}
+        for item in items:
+            grouped.setdefault(item.category or "Others", []).append(
+                (item.id, item.name, item.price, item.description)
+            )
+        self.categories = sorted(grouped, key=lambda cat: (CATEGORY_RANK.get(cat, 999), cat))
+        self.by_name = {row[1]: (row[0], cat) for cat, rows in grouped.items() for row in rows} # name -> (id, category)
+        self.diets = {row[0]: dish_diet(row[1], cat) for cat, rows in grouped.items() for row in rows} # id -> diet
+        self.items = {cat: tuple(grouped[cat]) for cat in self.categories}
+        self.sections = {cat: self._render_section(cat) for cat in self.categories}
+        self.text = MENU_HEADER + "".join(self.sections[cat] for cat in self.categories) if items else ""
+        self.index = MenuIndex(row for cat in self.categories for row in self.items[cat])
+
+    def _render_section(self, cat):
+        lines = [f"### {cat}\n"]
+        lines.extend(f"- **{name}** (₹{price}): {description}\n" for _, name, price, description in self.items[cat])
+        lines.append("\n")
+        return "".join(lines)
+
+    def match_categories(self, category):
+        """Categories whose name contains `category` (case-insensitive)."""
+        wanted = category.strip().lower()
+        return [cat for cat in self.categories if wanted in cat.lower()]
+
+    def select(self, category=None, diets=None, query=None, max_price=None):
+        """
+        [(category, rows), ...] of the dishes matching every filter given, in menu order.
+        Args:
+            category: Part of a category name, e.g. "dessert".
+            diets: Diets to keep (see DIET_FILTERS), e.g. ("veg", "egg").
+            query: Part of a dish name or description.
+            max_price: Highest price to include.
+        """
+        cats = self.match_categories(category) if category else self.categories
+        query = query.strip().lower() if query else None
+        selected = []
+        for cat in cats:
+            rows = [
+                row for row in self.items[cat]
+                if (diets is None or self.diets[row[0]] in diets)
+                and (max_price is None or row[2] <= max_price)
+                and (query is None or query in row[1].lower() or query in (row[3] or "").lower())
+            ]
+            if rows:
+                selected.append((cat, rows))
+        return selected
+
+
+class MenuCache:
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+        self.last_build_ms = 0.0
+        self._hit_seconds = 0.0
+
+    def snapshot(self):
+        start = time.perf_counter()
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            self.hits += 1
+            self._hit_seconds += time.perf_counter() - start
+            return snapshot
+
+        with self._lock:
+            db = SessionLocal()
+            try:
+                version = self._current_version(db)
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    build_start = time.perf_counter()
+                    snapshot = MenuSnapshot(db.query(MenuItem).order_by(MenuItem.id).all(), version)
+                    self.last_build_ms = (time.perf_counter() - build_start) * 1000
+                    self.builds += 1
+                    self._snapshot = snapshot
+                else:
+                    self.hits += 1
+                    self._hit_seconds += time.perf_counter() - start
+                self._checked_at = time.monotonic()
+            finally:
+                db.close()
+        return snapshot
+
+    @staticmethod
+    def _current_version(db):
+        row = db.get(CacheVersion, "menu")
+        version = row.version if row else None
+        if SHARED_STATE_ENABLED:
+            return version, shared_state.get("menu:generation")
+        return version
+
+    def invalidate(self):
+        self._snapshot = None
+        if SHARED_STATE_ENABLED:
+            shared_state.incr("menu:generation")
+
+    def stats(self):
+        return {
+            "builds": self.builds,
+            "hits": self.hits,
+            "last_build_ms": round(self.last_build_ms, 3),
+            "avg_hit_us": round(self._hit_seconds / self.hits * 1e6, 3) if self.hits else 0.0,
+        }
+
+
+menu_cache = MenuCache()
+
+
+# --- Invalidation on ORM writes ---
+
+def _mark_menu_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["menu_dirty"] = True
+
+
+for _op in ("after_insert", "after_update", "after_delete"):
+    event.listen(MenuItem, _op, _mark_menu_dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("menu_dirty", False):
+        menu_cache.invalidate()
@@ -0,0 +1,140 @@
+import csv
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import bindparam, text
+
+from .database import SessionLocal, dialect_insert
+from .menu_cache import menu_cache
+from .menu_index import normalize_name
+from .models import MenuItem
+
+# --- Bulk Menu Import ---
+# Menu files are read row by row and upserted in batches of `INSERT ... ON CONFLICT`
+# on the normalised item name, all in one transaction. Re-running an import updates
+# prices and descriptions in place instead of adding duplicates.
+
+UPSERT_COLUMNS = ("name", "description", "price", "category")
+
+logger = logging.getLogger(__name__)
+
+
+def read_menu_file(path):
+    """
+    Yields raw rows from a menu file: CSV with a header row, JSON Lines (.jsonl)
+    or a JSON array of objects. CSV and JSON Lines are read one row at a time.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            yield from csv.DictReader(f)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == ".json":
+            yield from json.load(f)
+        else:
+            raise ValueError(f"Unsupported menu file type: {path}")
+
+
+def clean_row(raw):
+    """Menu row ready for insert, or None when it has no name or no valid price."""
+    name = " ".join(str(raw.get("name") or "").split())
+    try:
+        price = float(raw.get("price"))
+    except (TypeError, ValueError):
+        return None
+    name_key = normalize_name(name)
+    if not name_key:
+        return None
+    return {
+        "name": name,
+        "name_key": name_key,
+        "description": (raw.get("description") or "").strip(),
+        "price": price,
+        "category": (raw.get("category") or "").strip() or "Miscellaneous",
+    }
+
+
+def upsert_menu(rows, batch_size=1000):
+    """
+    Inserts or updates menu items keyed by normalised name.
+    Args:
+        rows: Iterable of dicts with name, description, price and category.
+        batch_size: Rows sent to the database per executemany call.
+    Returns a report: rows, inserted, updated, skipped, seconds and rows_per_sec.
+    """
+    insert = dialect_insert()
+    start = time.perf_counter()
+    report = {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0}
+    db = SessionLocal()
+    try:
+        before = db.query(MenuItem).count()
+        batch = {}
+        # One statement, executed with a list of rows per batch (executemany), so it is
+        # compiled once rather than once per batch.
+        statement = insert(MenuItem.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["name_key"],
+            set_={column: statement.excluded[column] for column in UPSERT_COLUMNS},
+        )
+
+        def flush():
+            db.execute(statement, list(batch.values()))
+            batch.clear()
+
+        for raw in rows:
+            row = clean_row(raw)
+            if row is None:
+                report["skipped"] += 1
+                continue
+            report["rows"] += 1
+            # Keep one row per dish within a batch; a later row for the same dish wins.
+            batch.pop(row["name_key"], None)
+            batch[row["name_key"]] = row
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        report["inserted"] = db.query(MenuItem).count() - before
+        report["updated"] = report["rows"] - report["inserted"]
+        db.commit()
+    finally:
+        db.close()
+
+    # Core inserts bypass the ORM events that normally invalidate the cache.
+    menu_cache.invalidate()
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    report["rows_per_sec"] = round(report["rows"] / report["seconds"]) if report["seconds"] else report["rows"]
+    return report
+
+
+def import_menu_files(paths, batch_size=1000):
+    """Upserts every row of the given menu files in a single transaction."""
+    def rows():
+        for path in paths:
+            yield from read_menu_file(path)
+    return upsert_menu(rows(), batch_size)
+
+
+def remove_duplicate_menu_items(conn):
+    """
+    Deletes menu rows whose normalised name repeats an earlier row's, keeping the
+    oldest row of each dish. Returns the ids removed.
+    """
+    rows = conn.execute(text("SELECT id, name FROM menu_items ORDER BY id")).all()
+    seen, duplicates = set(), []
+    for row_id, name in rows:
+        key = normalize_name(name)
+        if key in seen:
+            duplicates.append(row_id)
+        seen.add(key)
+    if duplicates:
+        conn.execute(text("DELETE FROM menu_items WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                     {"ids": duplicates})
+        logger.info("Removed %d duplicate menu items: ids %s", len(duplicates), duplicates)
+    return duplicates
@@ -0,0 +1,94 @@
+import difflib
+import heapq
+import re
+from collections import Counter, defaultdict
+
+# --- Menu Name Index ---
+# Resolves the item names the LLM produces ("Garlic Naans", "masala dosa") to menu rows
+# entirely in memory, so an order needs no per-item queries. Only a name that is the
+# dish's name (up to case, punctuation and plurals) is accepted; a near miss such as
+# "chocolate ice cream" or "chai" comes back with suggestions for the guest to pick from,
+# never as a different dish.
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold(word):
+    # Plural folding so "naans" / "samosas" find "naan" / "samosa".
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_name(name):
+    """Lower-cased, punctuation-free, plural-folded form of a dish name."""
+    return " ".join(_fold(w) for w in _WORD_RE.findall(str(name).lower()))
+
+
+class MenuIndex:
+    """
+    Lookup tables over (id, name, price, description) menu rows.
+    Args:
+        rows: Iterable of menu rows as stored in a MenuSnapshot.
+    """
+
+    def __init__(self, rows):
+        self.by_key = {}
+        self.by_token = defaultdict(set)
+        self.sizes = {}
+        for row in rows:
+            key = normalize_name(row[1])
+            self.by_key.setdefault(key, row)
+            self.sizes[key] = len(set(key.split()))
+            for token in key.split():
+                self.by_token[token].add(key)
+        # Candidates for typo correction, bucketed by first letter to keep difflib cheap.
+        self.vocab = defaultdict(list)
+        for token in self.by_token:
+            if not token.isdigit():
+                self.vocab[token[0]].append(token)
+
+    def lookup(self, name):
+        """
+        Returns (row, suggestions). `row` is set only when `name` normalizes to a dish's
+        name; otherwise it is None and `suggestions` lists up to three close dish names.
+        """
+        key = normalize_name(name)
+        row = self.by_key.get(key)
+        if row is not None:
+            return row, []
+
+        # Fix typos word by word ("panner tika") before ranking dishes by shared words.
+        tokens = set()
+        for token in key.split():
+            if token not in self.by_token and not token.isdigit():
+                close = difflib.get_close_matches(token, self.vocab.get(token[0], []), n=1, cutoff=0.7)
+                token = close[0] if close else token
+            tokens.add(token)
+        return None, [self.by_key[k][1] for _, k in self._rank(tokens)]
+
+    def _rank(self, tokens, limit=3):
+        overlaps = Counter()
+        for token in tokens:
+            overlaps.update(self.by_token.get(token, ()))
+        scored = (
+            (overlap / (len(tokens) + self.sizes[key] - overlap), key)
+            for key, overlap in overlaps.items()
+        )
+        # Highest overlap first; shorter names win ties so "paneer tikka" beats "paneer tikka roll".
+        return heapq.nsmallest(limit, scored, key=lambda s: (-s[0], len(s[1]), s[1]))
+
+    def resolve(self, names):
+        """
+        Resolves a whole order at once.
+        Returns (rows, unknown) where `rows` maps each requested name to its menu row and
+        `unknown` maps names that could not be matched to a list of suggestions.
+        """
+        rows, unknown = {}, {}
+        for name in names:
+            row, suggestions = self.lookup(name)
+            if row is None:
+                unknown[name] = suggestions
+            else:
+                rows[name] = row
+        return rows, unknown
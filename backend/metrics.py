@@ -0,0 +1,178 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Metrics & Tracing ---
+# `span(stage, name)` times one stage of a request (router call, model turn, tool, DB
+# query, ...) into a latency histogram, served in Prometheus text format at /metrics.
+# Requests sent with `X-Timing: 1` (or every request, with SERVER_TIMING=1) also get the
+# time spent per stage summed into a `Server-Timing` response header.
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SERVER_TIMING_ALWAYS = os.getenv("SERVER_TIMING", "0") == "1"
+
+_trace = contextvars.ContextVar("trace", default=None)  # stage -> seconds for the current request
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 3)
+            series[index] += 1  # Index len(buckets) is the +Inf bucket
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(labels + [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(labels)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_label_text(labels)} {values[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_text(list(zip(self.label_names, label_values)))} {value}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "resort_stage_seconds",
+    "Time spent per request stage (router, model_build, agent_build, model_turn, tool, db, serialize).",
+    ("stage", "name"),
+)
+HTTP_SECONDS = Histogram("resort_http_request_seconds", "HTTP request latency until the response starts.",
+                         ("method", "route", "status"))
+TOOL_ERRORS = Counter("resort_tool_errors_total", "Tool calls that returned an error message.", ("tool",))
+QUEUE_WAIT = Histogram("resort_chat_queue_wait_seconds", "Time admitted chats waited for a chat slot.", ())
+CHATS_SHED = Counter("resort_chats_shed_total", "Chats turned away by admission control.", ("reason",))
+COALESCED = Counter("resort_coalesced_total", "Calls served by an identical call already in flight.", ("kind",))
+RATE_LIMITED = Counter("resort_rate_limited_total", "Chat messages refused by the per-room rate limit.", ())
+METRICS = [HTTP_SECONDS, STAGE_SECONDS, TOOL_ERRORS, QUEUE_WAIT, CHATS_SHED, COALESCED, RATE_LIMITED]
+
+
+def record(stage, name, seconds):
+    STAGE_SECONDS.observe(seconds, stage, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage, name=""):
+    """Times the enclosed block as one `stage` (e.g. "tool") of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, name, time.perf_counter() - start)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Database ---
+
+def instrument_engine(engine):
+    """Records every SQL statement run on `engine` as a `db` stage, named by its verb."""
+    from sqlalchemy import event
+
+    # The start time lives on the statement's execution context, so a statement that
+    # raises (and never reaches after_cursor_execute) leaves nothing behind on the connection.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start", None)
+        if started is not None:
+            record("db", statement.lstrip().split(None, 1)[0].upper(), time.perf_counter() - started)
+
+
+# --- HTTP ---
+
+class TimingMiddleware:
+    """
+    Times each HTTP request by route and, when asked for, adds a Server-Timing header
+    with the request's time per stage. For streamed responses it covers the time until
+    the headers go out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        wants_header = SERVER_TIMING_ALWAYS or (b"x-timing", b"1") in scope.get("headers", [])
+        trace = {}
+        token = _trace.set(trace)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = scope.get("route")
+                HTTP_SECONDS.observe(elapsed, scope["method"], getattr(route, "path", "unmatched"), str(message["status"]))
+                if wants_header:
+                    entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in trace.items()]
+                    entries.append(f"total;dur={elapsed * 1000:.3f}")
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", ", ".join(entries).encode())
+                    ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
@@ -1,17 +1,29 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, JSON, Index, text
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from .database import Base
+from .menu_index import normalize_name
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    name_key = Column(String) # normalize_name(name), kept in step by _set_name_key; one row per dish
     description = Column(String)
     price = Column(Float)
     category = Column(String) # e.g., "Main Course", "Breakfast"
 
+    __table_args__ = (
+        Index("ux_menu_items_name_key", "name_key", unique=True),
+    )
+
+    @validates("name")
+    def _set_name_key(self, key, name):
+        # On the attribute rather than a column default, so an UPDATE that leaves the name alone still works.
+        self.name_key = normalize_name(name)
+        return name
+
 class Order(Base):
     __tablename__ = "orders"
 
@@ -21,6 +33,22 @@ class Order(Base):
     total_amount = Column(Float)
     status = Column(String, default="Pending") # Pending, Preparing, Delivered
     created_at = Column(DateTime, default=datetime.utcnow)
+    priority = Column(Integer, default=0, server_default="0") # Higher is served first; raised when the SLA is missed
+    claimed_by = Column(String, nullable=True) # Staff member working on it
+    claimed_at = Column(DateTime, nullable=True) # Start of the current claim; the claim lapses after the lease
+    ticket = Column(String, nullable=True) # Reference given to the guest when the order was queued (write-behind)
+
+    __table_args__ = (
+        # Back the newest-first keyset pagination in /orders, with and without filters.
+        Index("ix_orders_created_id", "created_at", "id"),
+        Index("ix_orders_status_created_id", "status", "created_at", "id"),
+        Index("ix_orders_room_created_id", "room_number", "created_at", "id"),
+        Index("ix_orders_room_status_created_id", "room_number", "status", "created_at", "id"),
+        Index("ux_orders_ticket", "ticket", unique=True),
+        # Work queue: next job by priority then age, and lapsed claims.
+        Index("ix_orders_queue", "status", priority.desc(), "created_at", "id"),
+        Index("ix_orders_status_claimed", "status", "claimed_at"),
+    )
 
 class ServiceRequest(Base):
     __tablename__ = "service_requests"
@@ -31,3 +59,200 @@ class ServiceRequest(Base):
     details = Column(String, nullable=True)
     status = Column(String, default="Pending") # Pending, In Progress, Completed
     created_at = Column(DateTime, default=datetime.utcnow)
+    priority = Column(Integer, default=0, server_default="0") # Higher is served first; raised when the SLA is missed
+    claimed_by = Column(String, nullable=True) # Staff member working on it
+    claimed_at = Column(DateTime, nullable=True) # Start of the current claim; the claim lapses after the lease
+    ticket = Column(String, nullable=True) # Reference given to the guest when the request was queued (write-behind)
+
+    __table_args__ = (
+        Index("ix_service_requests_created_id", "created_at", "id"),
+        Index("ix_service_requests_status_created_id", "status", "created_at", "id"),
+        Index("ix_service_requests_room_created_id", "room_number", "created_at", "id"),
+        Index("ix_service_requests_room_status_created_id", "room_number", "status", "created_at", "id"),
+        Index("ux_service_requests_ticket", "ticket", unique=True),
+        # Work queue: next job by priority then age, and lapsed claims.
+        Index("ix_service_requests_queue", "status", priority.desc(), "created_at", "id"),
+        Index("ix_service_requests_status_claimed", "status", "claimed_at"),
+    )
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    # One row per dish in an order, written in the same transaction as the order itself.
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    menu_item_id = Column(Integer, nullable=True) # None when the dish has since left the menu
+    name = Column(String)
+    category = Column(String)
+    quantity = Column(Integer)
+    price = Column(Float) # Unit price when ordered
+    room_number = Column(String)
+    created_at = Column(DateTime) # Copied from the order
+
+    __table_args__ = (
+        Index("ix_order_items_created", "created_at"),
+        Index("ix_order_items_name_created", "name", "created_at"),
+        Index("ix_order_items_category_created", "category", "created_at"),
+    )
+
+class SalesRollup(Base):
+    __tablename__ = "sales_rollups"
+
+    # Running totals per hour and per day, kept up to date as orders are placed.
+    period = Column(String, primary_key=True) # "hour" or "day"
+    dimension = Column(String, primary_key=True) # "item", "category" or "room"
+    bucket = Column(DateTime, primary_key=True) # Start of the hour/day (UTC)
+    key = Column(String, primary_key=True) # Dish name, category or room number
+    quantity = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+    orders = Column(Integer, default=0) # Orders that contributed
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True) # e.g., "menu"
+    version = Column(Integer, default=0) # Bumped by triggers whenever the named data changes
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True) # Cursor for the /changes feed; never reused
+    entity = Column(String) # "order", "request" or "booking"
+    entity_id = Column(Integer)
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    id = Column(String, primary_key=True) # Client-generated conversation id
+    summary = Column(String, default="") # Older messages, folded into a few lines
+    turns = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ConversationMessage(Base):
+    __tablename__ = "conversation_messages"
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(String)
+    role = Column(String) # "user" or "assistant"
+    content = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_conversation_messages_conversation_id", "conversation_id", "id"),
+    )
+
+class Room(Base):
+    __tablename__ = "rooms"
+
+    id = Column(Integer, primary_key=True)
+    number = Column(String, unique=True) # e.g., "204"
+    room_type = Column(String, index=True) # Standard, Deluxe, Suite
+    base_rate = Column(Float) # Nightly rate before dynamic pricing
+
+class Booking(Base):
+    __tablename__ = "bookings"
+
+    id = Column(Integer, primary_key=True)
+    room_id = Column(Integer, ForeignKey("rooms.id"))
+    guest_name = Column(String, default="")
+    check_in = Column(Date)
+    check_out = Column(Date) # Morning of departure; that night is not booked
+    status = Column(String, default="Confirmed") # Confirmed, Cancelled
+    total_amount = Column(Float, nullable=True) # Price quoted for the whole stay
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_bookings_room_check_in", "room_id", "check_in"),
+    )
+
+class RoomNight(Base):
+    __tablename__ = "room_nights"
+
+    # One row per booked night. The primary key is what makes double-booking a room
+    # impossible, whichever process (or server) writes the booking.
+    room_id = Column(Integer, ForeignKey("rooms.id"), primary_key=True)
+    night = Column(Date, primary_key=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), index=True)
+
+def fill_menu_name_keys(conn):
+    """
+    Fills `name_key` for menu rows written before the column existed. Raises instead
+    when two dishes would get the same key, as the unique index could not be built;
+    `dedupe_menu.py` removes the duplicates.
+    """
+    if conn.execute(text("SELECT 1 FROM menu_items WHERE name_key IS NULL LIMIT 1")).first() is None:
+        return
+    rows = conn.execute(text("SELECT id, name, name_key FROM menu_items ORDER BY id")).all()
+    first_id, duplicates = {}, []
+    for row_id, name, name_key in rows:
+        key = name_key or normalize_name(name)
+        if key in first_id:
+            duplicates.append((row_id, first_id[key]))
+        first_id.setdefault(key, row_id)
+    if duplicates:
+        shown = ", ".join(f"{row_id} (same dish as {kept})" for row_id, kept in duplicates[:10])
+        raise RuntimeError(f"{len(duplicates)} menu items duplicate another dish's name: ids {shown}. "
+                           "Run `python dedupe_menu.py` to remove them, then start again.")
+    for row_id, name, name_key in rows:
+        if name_key is None:
+            conn.execute(text("UPDATE menu_items SET name_key = :key WHERE id = :id"),
+                         {"key": normalize_name(name), "id": row_id})
+
+# Keep cache versions in step with the data even when another process (e.g. a seed script) writes it.
+SQLITE_TRIGGERS = [
+    "INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('menu', 0)",
+    "INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('rooms', 0)",
+] + [
+    f"""CREATE TRIGGER IF NOT EXISTS menu_items_{op.lower()}_version AFTER {op} ON menu_items
+    BEGIN UPDATE cache_versions SET version = version + 1 WHERE name = 'menu'; END"""
+    for op in ("INSERT", "UPDATE", "DELETE")
+] + [
+    f"""CREATE TRIGGER IF NOT EXISTS rooms_{op.lower()}_version AFTER {op} ON rooms
+    BEGIN UPDATE cache_versions SET version = version + 1 WHERE name = 'rooms'; END"""
+    for op in ("INSERT", "UPDATE", "DELETE")
+]
+
+# Record every order/request/booking insert or update in the change log, whichever process writes it.
+SQLITE_TRIGGERS += [
+    f"""CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_change AFTER {op} ON {table}
+    BEGIN INSERT INTO change_log (entity, entity_id, changed_at) VALUES ('{entity}', NEW.id, CURRENT_TIMESTAMP); END"""
+    for table, entity in (("orders", "order"), ("service_requests", "request"), ("bookings", "booking"))
+    for op in ("INSERT", "UPDATE")
+]
+
+# The same on PostgreSQL: one function per job, with the cache name or entity as the trigger argument.
+POSTGRES_TRIGGERS = [
+    "INSERT INTO cache_versions (name, version) VALUES ('menu', 0), ('rooms', 0) ON CONFLICT (name) DO NOTHING",
+    """CREATE OR REPLACE FUNCTION bump_cache_version() RETURNS trigger AS $$
+    BEGIN UPDATE cache_versions SET version = version + 1 WHERE name = TG_ARGV[0]; RETURN NULL; END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO change_log (entity, entity_id, changed_at) VALUES (TG_ARGV[0], NEW.id, now() AT TIME ZONE 'utc');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+] + [
+    ddl
+    for table, name in (("menu_items", "menu"), ("rooms", "rooms"))
+    for ddl in (
+        f"DROP TRIGGER IF EXISTS {table}_version ON {table}",
+        f"""CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version('{name}')""",
+    )
+] + [
+    ddl
+    for table, entity in (("orders", "order"), ("service_requests", "request"), ("bookings", "booking"))
+    for ddl in (
+        f"DROP TRIGGER IF EXISTS {table}_change ON {table}",
+        f"""CREATE TRIGGER {table}_change AFTER INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION record_change('{entity}')""",
+    )
+]
+
+# Databases init_db can install the triggers on. The change feed and cross-process cache
+# invalidation depend on them, so other databases are refused at startup.
+DIALECT_TRIGGERS = {"sqlite": SQLITE_TRIGGERS, "postgresql": POSTGRES_TRIGGERS}
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from .availability import availability
+
+# --- Dynamic Room Pricing ---
+# Nightly rate = base rate x season x day of week x occupancy x lead time.
+# Rates for every room type and every night of the horizon are computed together as
+# one NumPy (room types x nights) matrix and kept until bookings change; a booking
+# only recomputes the nights it touched, for its own room type.
+
+HORIZON_DAYS = int(os.getenv("PRICING_HORIZON_DAYS", "365"))
+
+# Month -> multiplier: peak season is winter, the monsoon is quiet.
+SEASON = {1: 1.25, 2: 1.15, 3: 1.0, 4: 0.95, 5: 0.9, 6: 0.8, 7: 0.8, 8: 0.85, 9: 0.9, 10: 1.05, 11: 1.15, 12: 1.35}
+# Monday=0 .. Sunday=6: Friday and Saturday nights are in demand.
+DAY_OF_WEEK = (0.95, 0.95, 0.95, 1.0, 1.15, 1.2, 1.0)
+# Share of the room type booked that night -> multiplier (interpolated between points).
+OCCUPANCY_CURVE = ((0.0, 0.9), (0.5, 1.0), (0.8, 1.2), (1.0, 1.5))
+# Days until the night -> multiplier: a small premium for last-minute stays, a discount far ahead.
+LEAD_TIME_CURVE = ((0, 1.1), (3, 1.0), (60, 1.0), (180, 0.95))
+
+
+def booked_counts(bitmaps, first, end):
+    """Rooms booked on each night from `first` to `end` (offsets), from the rooms' bitmaps."""
+    import numpy as np
+
+    nights = end - first
+    width = (nights + 7) // 8
+    window = (1 << nights) - 1
+    raw = b"".join(((bitmap >> first) & window).to_bytes(width, "little") for bitmap in bitmaps)
+    if not raw:
+        return np.zeros(nights, dtype=np.int64)
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(len(bitmaps), width), axis=1, bitorder="little")
+    return bits[:, :nights].sum(axis=0)
+
+
+class PricingEngine:
+    def __init__(self, horizon_days=HORIZON_DAYS):
+        self.horizon_days = horizon_days
+        self.origin = None
+        self.room_types = []
+        self.rates = None  # (room types x nights) matrix of nightly rates
+        self.occupancy = None  # Same shape: share of rooms booked
+        self._revision = -1
+        self._lock = threading.Lock()
+        self.full_reprices = 0
+        self.partial_reprices = 0
+        self.last_reprice_ms = 0.0
+
+    def refresh(self):
+        """Brings the rate matrix up to date with the availability index."""
+        availability.refresh()
+        if self.rates is not None and availability.revision == self._revision and self.origin == availability.origin:
+            return
+        with self._lock:
+            revision = availability.revision
+            changes = None
+            if self.rates is not None and self.origin == availability.origin:
+                changes = availability.changes_since(self._revision)
+            if changes is None:
+                self._reprice_all()
+            else:
+                self._reprice_changes(changes)
+            self._revision = revision
+
+    def reprice(self):
+        """Recomputes every room type's rate for every night of the horizon (e.g. after a pricing change)."""
+        availability.refresh()
+        with self._lock:
+            self._revision = availability.revision
+            self._reprice_all()
+        return self.stats()
+
+    def _reprice_all(self):
+        import numpy as np
+
+        start = time.perf_counter()
+        origin = availability.origin
+        room_types = availability.room_types()
+        occupancy = np.zeros((len(room_types), self.horizon_days))
+        for row, room_type in enumerate(room_types):
+            bitmaps = availability.bitmaps(room_type)
+            if bitmaps:
+                occupancy[row] = booked_counts(bitmaps, 0, self.horizon_days) / len(bitmaps)
+        self.origin, self.room_types, self.occupancy = origin, room_types, occupancy
+        self.rates = self._rates(room_types, occupancy, 0, self.horizon_days)
+        self.full_reprices += 1
+        self.last_reprice_ms = (time.perf_counter() - start) * 1000
+
+    def _reprice_changes(self, changes):
+        ranges = {}
+        for room_type, first, end in changes:
+            if room_type not in self.room_types:
+                self._reprice_all()
+                return
+            end = self.horizon_days if end is None else min(end, self.horizon_days)
+            if first < end:
+                low, high = ranges.get(room_type, (first, end))
+                ranges[room_type] = (min(low, first), max(high, end))
+        for room_type, (first, end) in ranges.items():
+            row = self.room_types.index(room_type)
+            bitmaps = availability.bitmaps(room_type)
+            self.occupancy[row, first:end] = booked_counts(bitmaps, first, end) / len(bitmaps)
+            self.rates[row, first:end] = self._rates([room_type], self.occupancy[row:row + 1, first:end], first, end)[0]
+        self.partial_reprices += 1
+
+    def _rates(self, room_types, occupancy, first, end):
+        """Rate matrix for `room_types` over nights `first`..`end`, given their occupancy."""
+        import numpy as np
+
+        nights = [self.origin + timedelta(days=offset) for offset in range(first, end)]
+        season = np.array([SEASON[night.month] for night in nights])
+        day_of_week = np.array(DAY_OF_WEEK)[[night.weekday() for night in nights]]
+        lead_days = np.arange(first, end) + (self.origin - date.today()).days
+        lead_time = np.interp(lead_days, *zip(*LEAD_TIME_CURVE))
+        demand = np.interp(occupancy, *zip(*OCCUPANCY_CURVE))
+        base = np.array([availability.base_rate(room_type) for room_type in room_types])[:, None]
+        return np.round(base * (season * day_of_week * lead_time) * demand)
+
+    def nightly_rates(self, room_type, check_in, check_out):
+        """[(night, rate), ...] for each night of the stay."""
+        self.refresh()
+        with self._lock:
+            first = (check_in - self.origin).days
+            end = (check_out - self.origin).days
+            if end > self.horizon_days:
+                raise ValueError(f"Rates are only available up to {self.horizon_days} days ahead.")
+            row = self.rates[self.room_types.index(room_type), first:end].tolist()
+        return [(check_in + timedelta(days=i), rate) for i, rate in enumerate(row)]
+
+    def quote(self, room_type, check_in, check_out):
+        """Price of a stay: per-night rates, total and average nightly rate."""
+        rates = self.nightly_rates(room_type, check_in, check_out)
+        total = sum(rate for _, rate in rates)
+        return {
+            "room_type": room_type,
+            "check_in": check_in.isoformat(),
+            "check_out": check_out.isoformat(),
+            "nights": [{"date": night.isoformat(), "rate": rate} for night, rate in rates],
+            "total": total,
+            "average": round(total / len(rates), 2),
+        }
+
+    def stats(self):
+        return {
+            "room_types": len(self.room_types),
+            "horizon_days": self.horizon_days,
+            "full_reprices": self.full_reprices,
+            "partial_reprices": self.partial_reprices,
+            "last_reprice_ms": round(self.last_reprice_ms, 3),
+        }
+
+
+pricing = PricingEngine()
@@ -0,0 +1,183 @@
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists, func, insert, select
+
+from .database import dialect_insert
+from .models import MenuItem, Order, OrderItem, SalesRollup
+
+# --- Sales Reporting ---
+# Every order's dishes are also stored as rows of `order_items`, and per-hour and per-day
+# totals by dish, category and room are kept in `sales_rollups`. Both are written in the
+# same transaction as the order, so reports ("top dishes this week", "revenue per category
+# per day") read a few rollup rows instead of loading and parsing every order's JSON.
+
+PERIODS = ("hour", "day")
+DIMENSIONS = ("item", "category", "room")
+UNCATEGORISED = "Others" # Same label the menu uses for dishes without a category
+BACKFILL_BATCH = 5000 # Orders per batch when backfilling
+
+logger = logging.getLogger(__name__)
+
+
+def bucket_start(moment, period):
+    """Start of the hour or day `moment` falls in."""
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def menu_lookup(conn):
+    """Dish name -> (menu item id, category), read from the database."""
+    rows = conn.execute(select(MenuItem.id, MenuItem.name, MenuItem.category))
+    return {name: (item_id, category or UNCATEGORISED) for item_id, name, category in rows}
+
+
+def order_lines(order_id, room_number, created_at, items, menu):
+    """
+    OrderItem rows for one order.
+    Args:
+        items: The order's items, [{"name", "quantity", "price"}, ...] (or that list as JSON).
+        menu: Dish name -> (menu item id, category), e.g. from `menu_lookup`.
+    """
+    if isinstance(items, str):
+        items = json.loads(items)
+    lines = []
+    for item in items or []:
+        menu_item_id, category = menu.get(item["name"], (None, UNCATEGORISED))
+        lines.append({
+            "order_id": order_id,
+            "menu_item_id": menu_item_id,
+            "name": item["name"],
+            "category": category,
+            "quantity": int(item["quantity"]),
+            "price": float(item["price"]),
+            "room_number": room_number,
+            "created_at": created_at,
+        })
+    return lines
+
+
+def record_order_lines(conn, lines):
+    """
+    Inserts order lines and adds them to the hourly and daily rollups, inside the
+    caller's transaction (`conn` is a Session or Connection).
+    """
+    if not lines:
+        return
+    conn.execute(insert(OrderItem.__table__), lines)
+    write_rollups(conn, add_to_rollups({}, lines))
+
+
+def add_to_rollups(totals, lines):
+    """Adds `lines` to `totals`: (period, dimension, bucket, key) -> [quantity, revenue, order ids]."""
+    for line in lines:
+        revenue = line["quantity"] * line["price"]
+        for period in PERIODS:
+            bucket = bucket_start(line["created_at"], period)
+            for dimension, key in (("item", line["name"]), ("category", line["category"]), ("room", line["room_number"])):
+                total = totals.setdefault((period, dimension, bucket, key), [0, 0.0, set()])
+                total[0] += line["quantity"]
+                total[1] += revenue
+                total[2].add(line["order_id"])
+    return totals
+
+
+def write_rollups(conn, totals):
+    """Adds `totals` (from `add_to_rollups`) to the rollup rows, creating missing ones."""
+    if not totals:
+        return
+    table = SalesRollup.__table__
+    statement = dialect_insert()(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["period", "dimension", "bucket", "key"],
+        set_={
+            "quantity": table.c.quantity + statement.excluded.quantity,
+            "revenue": table.c.revenue + statement.excluded.revenue,
+            "orders": table.c.orders + statement.excluded.orders,
+        },
+    )
+    conn.execute(statement, [
+        {"period": period, "dimension": dimension, "bucket": bucket, "key": key,
+         "quantity": quantity, "revenue": revenue, "orders": len(order_ids)}
+        for (period, dimension, bucket, key), (quantity, revenue, order_ids) in totals.items()
+    ])
+
+
+def backfill_order_items(conn, batch_size=BACKFILL_BATCH):
+    """
+    Writes order lines and rollups for orders placed before `order_items` existed, in
+    one pass over the orders that have no lines yet (new orders get theirs as they are
+    placed, so this can run while the API is up). The rollups are summed in memory and
+    written once at the end. Run it once, from backfill_sales.py, after upgrading.
+    Returns the number of orders processed.
+    """
+    has_lines = exists().where(OrderItem.order_id == Order.id)
+    last = 0
+    menu = None
+    totals = {}
+    done = 0
+    while True:
+        orders = conn.execute(
+            select(Order.id, Order.room_number, Order.created_at, Order.items)
+            .where(Order.id > last, ~has_lines).order_by(Order.id).limit(batch_size)
+        ).all()
+        if not orders:
+            break
+        menu = menu or menu_lookup(conn)
+        lines = [
+            line for order in orders
+            for line in order_lines(order.id, order.room_number, order.created_at or datetime.utcnow(), order.items, menu)
+        ]
+        if lines:
+            conn.execute(insert(OrderItem.__table__), lines)
+            add_to_rollups(totals, lines)
+        last = orders[-1].id
+        done += len(orders)
+    write_rollups(conn, totals)
+    logger.info("Backfilled order lines and sales rollups for %d orders", done)
+    return done
+
+
+def sales_report(db, dimension="item", period="day", start=None, end=None, limit=10):
+    """
+    Best sellers over [start, end) from the rollups, plus each one's totals per hour or day.
+    Args:
+        dimension: "item", "category" or "room".
+        period: "hour" or "day"; `start` is rounded down to it.
+        start / end: Defaults to the last 7 days.
+        limit: Most keys returned, highest revenue first.
+    """
+    if dimension not in DIMENSIONS or period not in PERIODS:
+        raise ValueError(f"Unknown dimension '{dimension}' or period '{period}'.")
+    end = end or datetime.utcnow()
+    start = bucket_start(start or end - timedelta(days=7), period)
+    limit = max(1, min(limit, 100))
+
+    in_range = [
+        SalesRollup.period == period,
+        SalesRollup.dimension == dimension,
+        SalesRollup.bucket >= start,
+        SalesRollup.bucket < end,
+    ]
+    revenue = func.sum(SalesRollup.revenue)
+    totals = db.execute(
+        select(SalesRollup.key, func.sum(SalesRollup.quantity), revenue, func.sum(SalesRollup.orders))
+        .where(*in_range).group_by(SalesRollup.key).order_by(revenue.desc()).limit(limit)
+    ).all()
+    keys = [row[0] for row in totals]
+    series = db.execute(
+        select(SalesRollup.bucket, SalesRollup.key, SalesRollup.quantity, SalesRollup.revenue, SalesRollup.orders)
+        .where(*in_range, SalesRollup.key.in_(keys)).order_by(SalesRollup.bucket, SalesRollup.key)
+    ).all() if keys else []
+    return {
+        "dimension": dimension,
+        "period": period,
+        "start": start,
+        "end": end,
+        "totals": [{"key": key, "quantity": quantity, "revenue": round(revenue, 2), "orders": orders}
+                   for key, quantity, revenue, orders in totals],
+        "series": [{"bucket": bucket, "key": key, "quantity": quantity, "revenue": round(revenue, 2), "orders": orders}
+                   for bucket, key, quantity, revenue, orders in series],
+    }
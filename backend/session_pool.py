@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+# --- Session Pool ---
+# Keeps live agent chat sessions around between requests so a conversation
+# does not pay for model construction and `start_chat` on every message.
+
+
+class SessionPool:
+    """
+    LRU/TTL pool of agent sessions keyed by (agent_type, conversation_id).
+    Args:
+        factory: Callable taking an agent type and returning a new agent.
+        max_sessions: Upper bound on pooled sessions.
+        ttl_seconds: Idle time after which a session is dropped.
+        max_bytes: Approximate memory budget for all pooled chat histories.
+    """
+
+    def __init__(self, factory, max_sessions=256, ttl_seconds=1800, max_bytes=8 * 1024 * 1024):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()  # key -> [agent, last_used, size]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "ttl": 0, "memory": 0}
+
+    def acquire(self, agent_type, conversation_id):
+        key = (agent_type, conversation_id)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(key)
+            if entry is not None:
+                self._sessions.move_to_end(key)
+                entry[1] = now
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock; a racing request for the same key keeps the first one stored.
+        agent = self.factory(agent_type)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is not None:
+                return entry[0]
+            self._sessions[key] = [agent, now, 0]
+            self._evict_over_budget()
+        return agent
+
+    def release(self, agent_type, conversation_id, size):
+        """Records the current history size of a session after it has been used."""
+        key = (agent_type, conversation_id)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return
+            self._bytes += size - entry[2]
+            entry[2] = size
+            self._evict_over_budget()
+
+    def discard(self, agent_type, conversation_id):
+        with self._lock:
+            entry = self._sessions.pop((agent_type, conversation_id), None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._bytes = 0
+
+    def _expire(self, now):
+        if not self.ttl_seconds:
+            return
+        # Entries are kept in LRU order, so expired ones are always at the front.
+        while self._sessions:
+            key, entry = next(iter(self._sessions.items()))
+            if now - entry[1] < self.ttl_seconds:
+                break
+            self._drop(key, "ttl")
+
+    def _evict_over_budget(self):
+        while len(self._sessions) > self.max_sessions:
+            self._drop(next(iter(self._sessions)), "lru")
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._drop(next(iter(self._sessions)), "memory")
+
+    def _drop(self, key, reason):
+        entry = self._sessions.pop(key)
+        self._bytes -= entry[2]
+        self.evictions[reason] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": dict(self.evictions),
+            }
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+
+# --- Shared State ---
+# State that has to look the same from every API worker (and every node): conversation
+# context, cached answers, rate counters and short leases. Each backend implements the
+# few Redis commands used here with redis-py's signatures, so a `redis.Redis` client
+# can be dropped in as is:
+#
+#     get(name)                            -> str or None
+#     set(name, value, ex=None, nx=False)  -> True, or None when `nx` and the key exists
+#     delete(*names)                       -> number of keys removed
+#     incr(name, amount=1)                 -> the new value
+#     expire(name, time)                   -> whether the key exists
+#
+# `ex` and `time` are whole seconds. SHARED_STATE_URL selects the backend:
+#   memory://                  this process only (the default; one worker)
+#   sqlite:///path/state.db    every worker on this host
+#   redis://host:6379/0        every worker on every node (needs the `redis` package)
+
+PRUNE_EVERY = 1000 # Writes between sweeps of expired keys
+
+
+class MemoryState:
+    """In-process backend: a dict of name -> (value, expiry as time.time() or None)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self, name, now):
+        entry = self._data.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[name]
+            return None
+        return entry
+
+    def get(self, name):
+        with self._lock:
+            entry = self._live(name, time.time())
+            return entry[0] if entry else None
+
+    def set(self, name, value, ex=None, nx=False):
+        now = time.time()
+        with self._lock:
+            if nx and self._live(name, now) is not None:
+                return None
+            self._data[name] = (str(value), now + ex if ex else None)
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                for key in [key for key, (_, expiry) in self._data.items() if expiry is not None and expiry <= now]:
+                    del self._data[key]
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            entry = self._live(name, time.time())
+            value = int(entry[0]) + amount if entry else amount
+            self._data[name] = (str(value), entry[1] if entry else None)
+            return value
+
+    def expire(self, name, time_):
+        now = time.time()
+        with self._lock:
+            entry = self._live(name, now)
+            if entry is None:
+                return False
+            self._data[name] = (entry[0], now + time_)
+            return True
+
+
+class SQLiteState:
+    """
+    Host-wide backend: one SQLite file (WAL) that every worker process opens.
+    Args:
+        path: The state file, created on first use. Keep it off network filesystems.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS shared_state "
+            "(name TEXT PRIMARY KEY, value TEXT, expires_at REAL) WITHOUT ROWID"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; commands that read and write take the write lock with BEGIN IMMEDIATE.
+            conn = self._local.conn = sqlite3.connect(self.path, isolation_level=None, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _write(self, conn):
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM shared_state WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, name):
+        row = self._conn().execute(
+            "SELECT value FROM shared_state WHERE name = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (name, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, name, value, ex=None, nx=False):
+        now = time.time()
+        conn = self._conn()
+        expires_at = now + ex if ex else None
+        if not nx:
+            conn.execute("INSERT OR REPLACE INTO shared_state VALUES (?, ?, ?)", (name, str(value), expires_at))
+            self._write(conn)
+            return True
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM shared_state WHERE name = ? AND expires_at <= ?", (name, now))
+            added = conn.execute("INSERT OR IGNORE INTO shared_state VALUES (?, ?, ?)",
+                                 (name, str(value), expires_at)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._write(conn)
+        return True if added else None
+
+    def delete(self, *names):
+        if not names:
+            return 0
+        conn = self._conn()
+        marks = ",".join("?" * len(names))
+        return conn.execute(f"DELETE FROM shared_state WHERE name IN ({marks})", names).rowcount
+
+    def incr(self, name, amount=1):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM shared_state WHERE name = ? AND expires_at <= ?", (name, time.time()))
+            # Like Redis, INCR keeps the key's expiry.
+            value = conn.execute(
+                "INSERT INTO shared_state VALUES (?, ?, NULL) ON CONFLICT (name) "
+                "DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value RETURNING value",
+                (name, amount),
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._write(conn)
+        return int(value)
+
+    def expire(self, name, time_):
+        now = time.time()
+        return self._conn().execute(
+            "UPDATE shared_state SET expires_at = ? WHERE name = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (now + time_, name, now),
+        ).rowcount > 0
+
+
+def make_shared_state(url):
+    """The backend for a SHARED_STATE_URL (see above)."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_URL points at Redis but the 'redis' package is not installed.")
+        return redis.Redis.from_url(url, decode_responses=True)
+    if url.startswith("sqlite:///"):
+        return SQLiteState(url[len("sqlite:///"):])
+    if url in ("", "memory://"):
+        return MemoryState()
+    raise ValueError(f"Unsupported SHARED_STATE_URL '{url}'. Use memory://, sqlite:///<path> or redis://...")
+
+
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "")
+# When set, conversations, cached answers and menu invalidations move out of the process too.
+SHARED_STATE_ENABLED = SHARED_STATE_URL not in ("", "memory://")
+shared_state = make_shared_state(SHARED_STATE_URL)
+
+
+# --- Helpers ---
+
+def hit(name, window, state=None):
+    """
+    Counts one event in the current `window`-second window of the counter `name` and
+    returns the count so far. Every window has its own key, which expires with it.
+    """
+    state = state or shared_state
+    key = f"{name}:{int(time.time() // window)}"
+    count = state.incr(key)
+    if count == 1:
+        state.expire(key, window)
+    return count
+
+
+def take_lease(name, seconds, state=None):
+    """True for the one caller (in any process) that takes `name` until it lapses after `seconds`."""
+    state = state or shared_state
+    return bool(state.set(name, "1", ex=seconds, nx=True))
@@ -1,110 +1,224 @@
-from sqlalchemy.orm import Session
-from .models import MenuItem, Order, ServiceRequest
+from .models import Order, ServiceRequest
 from .database import SessionLocal
+from .availability import availability, parse_stay
+from .pricing import pricing
+from .menu_cache import DIET_FILTERS, menu_cache, MENU_HEADER
+from .sales import order_lines, record_order_lines
+from .write_queue import WRITE_BEHIND_ENABLED, write_queue
+import contextvars
+import hashlib
 import json
-from datetime import datetime
+from contextlib import contextmanager
 
 # --- Database Helper ---
 def get_db_session():
     return SessionLocal()
 
+# --- Guest Displays ---
+# Content the API hands to the frontend to show as is (e.g. the full menu), so the model
+# never has to read or repeat it. Tools add displays to the current request's list.
+_displays = contextvars.ContextVar("displays", default=None)
+
+@contextmanager
+def collect_displays():
+    """Collects the displays added by tools run inside the block into the yielded list."""
+    displays = []
+    token = _displays.set(displays)
+    try:
+        yield displays
+    finally:
+        _displays.reset(token)
+
+def _add_display(display):
+    displays = _displays.get()
+    if displays is not None:
+        displays.append(display)
+
 # --- Receptionist Tools ---
-def check_room_availability(room_type: str = None):
+def check_room_availability(room_type: str = None, check_in: str = None, check_out: str = None):
     """
-    Checks room availability.
+    Checks room availability for a stay.
     Args:
-        room_type: Optional type of room (e.g., "Deluxe", "Suite").
+        room_type: Optional type of room (e.g., "Deluxe", "Suite"). Leave empty to list every type.
+        check_in: Arrival date as YYYY-MM-DD (defaults to today).
+        check_out: Departure date as YYYY-MM-DD (defaults to the day after check-in).
     """
-    # Mock logic with dynamic elements
-    import random
-    
-    room_data = {
-        "deluxe": {"base_price": 200, "count": 5},
-        "suite": {"base_price": 500, "count": 2},
-        "standard": {"base_price": 100, "count": 10}
-    }
-    
-    req_type = room_type.lower() if room_type else "standard"
-    # Mapping simple terms to keys
-    if "suite" in req_type: key = "suite"
-    elif "deluxe" in req_type: key = "deluxe"
-    else: key = "standard"
-    
-    data = room_data[key]
-    
-    # Simulate availability randomly
-    is_available = random.choice([True, True, False]) # Higher chance of availability
-    
-    if is_available:
-        price = data["base_price"] + random.randint(-20, 50) # Dynamic pricing
-        return f"Yes, we have {key.capitalize()} rooms available. The current rate is ${price} per night."
-    else:
-        return f"I'm sorry, but our {key.capitalize()} rooms are currently fully booked. Would you like to check another room type?"
+    try:
+        check_in, check_out = parse_stay(check_in, check_out)
+    except ValueError as e:
+        return f"Error: {e}"
+    if not availability.room_types():
+        return "Room inventory has not been set up yet. Please contact the front desk."
+
+    nights = (check_out - check_in).days
+    stay = f"from {check_in.isoformat()} to {check_out.isoformat()}"
+    try:
+        if not room_type:
+            lines = []
+            for name, free in availability.summary(check_in, check_out).items():
+                quote = pricing.quote(name, check_in, check_out)
+                lines.append(f"- {name}: {free} available, ${quote['average']:g} per night (${quote['total']:g} total)")
+            return f"Room availability {stay} ({nights} night(s)):\n" + "\n".join(lines)
+
+        key = availability.match_type(room_type)
+        if key is None:
+            return f"We don't have '{room_type}' rooms. Room types: {', '.join(availability.room_types())}."
+        free = availability.count_free(key, check_in, check_out)
+        if not free:
+            return f"I'm sorry, but our {key} rooms are fully booked {stay}. Would you like to check another room type?"
+        quote = pricing.quote(key, check_in, check_out)
+    except ValueError as e:
+        return f"Error: {e}"
+    return (f"Yes, we have {free} {key} room(s) available {stay}. The rate is ${quote['average']:g} per night "
+            f"on average, ${quote['total']:g} in total for {nights} night(s).")
+
+def book_room(room_type: str, check_in: str, check_out: str, guest_name: str = ""):
+    """
+    Books a room for a stay.
+    Args:
+        room_type: Type of room (e.g., "Deluxe", "Suite").
+        check_in: Arrival date as YYYY-MM-DD.
+        check_out: Departure date as YYYY-MM-DD.
+        guest_name: Name the booking is under.
+    """
+    try:
+        check_in, check_out = parse_stay(check_in, check_out)
+    except ValueError as e:
+        return f"Error: {e}"
+    key = availability.match_type(room_type or "")
+    if key is None:
+        return f"We don't have '{room_type}' rooms. Room types: {', '.join(availability.room_types())}."
+    try:
+        total = pricing.quote(key, check_in, check_out)["total"]
+    except ValueError as e:
+        return f"Error: {e}"
+    booking = availability.book(key, check_in, check_out, guest_name, total)
+    if booking is None:
+        return f"I'm sorry, but no {key} rooms are free from {check_in.isoformat()} to {check_out.isoformat()}."
+    return (f"Booking confirmed! Booking ID: {booking['id']}. Room {booking['room_number']} ({key}), "
+            f"{booking['check_in']} to {booking['check_out']}, {booking['nights']} night(s). Total: ${total:g}.")
+
+FACILITIES = {
+    "gym": "The Gym is open from 6 AM to 10 PM. It is located on the 2nd floor.",
+    "spa": "The Spa offers massages and treatments from 10 AM to 8 PM. Booking is required at extension 101.",
+    "pool": "The Swimming Pool is open from 7 AM to 9 PM. Please wear appropriate swimwear.",
+    "restaurant": "The Restaurant serves breakfast (7-10 AM), lunch (12-3 PM), and dinner (7-11 PM).",
+    "checkin": "Check-in time is 2:00 PM.",
+    "checkout": "Check-out time is 11:00 AM.",
+    "wifi": "Free high-speed Wi-Fi is available throughout the resort. Network: 'ResortGuest', Password: 'relaxandenjoy'.",
+    "parking": "Valet parking is complimentary for all guests."
+}
+
+# Changes whenever the facility data does, so cached answers built from it are dropped.
+FACILITIES_VERSION = hashlib.sha1(json.dumps(FACILITIES, sort_keys=True).encode()).hexdigest()[:12]
 
 def get_facility_info(facility_name: str):
     """
     Returns information about resort facilities.
     """
-    facilities = {
-        "gym": "The Gym is open from 6 AM to 10 PM. It is located on the 2nd floor.",
-        "spa": "The Spa offers massages and treatments from 10 AM to 8 PM. Booking is required at extension 101.",
-        "pool": "The Swimming Pool is open from 7 AM to 9 PM. Please wear appropriate swimwear.",
-        "restaurant": "The Restaurant serves breakfast (7-10 AM), lunch (12-3 PM), and dinner (7-11 PM).",
-        "checkin": "Check-in time is 2:00 PM.",
-        "checkout": "Check-out time is 11:00 AM.",
-        "wifi": "Free high-speed Wi-Fi is available throughout the resort. Network: 'ResortGuest', Password: 'relaxandenjoy'.",
-        "parking": "Valet parking is complimentary for all guests."
-    }
-    
     # Simple fuzzy matching or direct lookup
     key = facility_name.lower()
-    if "check" in key and "in" in key: return facilities["checkin"]
-    if "check" in key and "out" in key: return facilities["checkout"]
-    if "wifi" in key: return facilities["wifi"]
-    if "park" in key: return facilities["parking"]
+    if "check" in key and "in" in key: return FACILITIES["checkin"]
+    if "check" in key and "out" in key: return FACILITIES["checkout"]
+    if "wifi" in key: return FACILITIES["wifi"]
+    if "park" in key: return FACILITIES["parking"]
     
-    return facilities.get(key, "I can answer questions about the Gym, Spa, Pool, Restaurant, Check-in/out times, Wi-Fi, and Parking.")
+    return FACILITIES.get(key, "I can answer questions about the Gym, Spa, Pool, Restaurant, Check-in/out times, Wi-Fi, and Parking.")
 
 # --- Restaurant Tools ---
 
-def get_menu_items():
+SEARCH_MENU_LIMIT = 40 # Most dishes search_menu returns to the model
+
+def get_menu_items(category: str = None):
     """
-    Retrieves the menu from the database and returns it formatted by category.
+    Retrieves the menu and returns it formatted by category.
+    Args:
+        category: Optional category to show (e.g., "Desserts", "Drinks", "Main Course").
     """
-    db = get_db_session()
-    try:
-        items = db.query(MenuItem).all()
-        if not items:
-            return "The menu is currently empty."
-            
-        # Group by category
-        menu_dict = {}
-        for item in items:
-            cat = item.category or "Others"
-            if cat not in menu_dict:
-                menu_dict[cat] = []
-            menu_dict[cat].append(item)
-            
-        # Build formatted string
-        menu_str = "🍽️ **Resort Menu** 🍽️\n\n"
-        
-        # Define a preferred order for categories
-        order = ["Vegetarian Starter", "Non-Vegetarian Starter", "Veg Starter", "Non-Veg Starter", 
-                 "Vegetarian Main Course", "Non-Vegetarian Main Course", "Veg Main Course", "Non-Veg Main Course", 
-                 "Breads", "Desserts", "Drinks", "Miscellaneous"]
-        
-        # Sort categories: specific ones first, then others alphabetically
-        sorted_cats = sorted(menu_dict.keys(), key=lambda x: (order.index(x) if x in order else 999, x))
-        
-        for cat in sorted_cats:
-            menu_str += f"### {cat}\n"
-            for item in menu_dict[cat]:
-                menu_str += f"- **{item.name}** (₹{item.price}): {item.description}\n"
-            menu_str += "\n"
-            
-        return menu_str
-    finally:
-        db.close()
+    snapshot = menu_cache.snapshot()
+    if not snapshot.categories:
+        return "The menu is currently empty."
+    if not category:
+        return snapshot.text
+
+    cats = snapshot.match_categories(category)
+    if not cats:
+        return f"There is no '{category}' section on the menu. Available categories: {', '.join(snapshot.categories)}."
+    return MENU_HEADER + "".join(snapshot.sections[cat] for cat in cats)
+
+def _menu_filters(diet):
+    """The diets a `diet` filter allows, or an error message."""
+    if not diet:
+        return None, None
+    diets = DIET_FILTERS.get(diet.strip().lower().replace(" ", "-"))
+    if diets is None:
+        return None, f"Error: unknown diet '{diet}'. Use veg, egg or non-veg."
+    return diets, None
+
+def menu_display(selected):
+    """The `menu` display for [(category, rows), ...] from MenuSnapshot.select."""
+    diets = menu_cache.snapshot().diets
+    return {
+        "type": "menu",
+        "categories": [
+            {"name": cat, "items": [
+                {"id": item_id, "name": name, "price": price, "description": description, "diet": diets.get(item_id)}
+                for item_id, name, price, description in rows
+            ]}
+            for cat, rows in selected
+        ],
+    }
+
+def show_menu(category: str = None, diet: str = None):
+    """
+    Shows the menu to the guest in the chat window. The guest sees every dish directly,
+    so do not list the dishes yourself.
+    Args:
+        category: Optional part of a category name (e.g., "Desserts", "Drinks", "Main Course").
+        diet: Optional "veg", "egg" (vegetarian plus egg dishes) or "non-veg".
+    """
+    diets, error = _menu_filters(diet)
+    if error:
+        return error
+    snapshot = menu_cache.snapshot()
+    if not snapshot.categories:
+        return "The menu is currently empty."
+    selected = snapshot.select(category, diets)
+    if not selected:
+        return f"No dishes match. Available categories: {', '.join(snapshot.categories)}."
+    _add_display(menu_display(selected))
+    count = sum(len(rows) for _, rows in selected)
+    return f"Shown to the guest: {count} dishes in {', '.join(cat for cat, _ in selected)}."
+
+def search_menu(category: str = None, diet: str = None, query: str = None, max_price: float = None):
+    """
+    Finds dishes to answer questions about the menu (prices, what is vegetarian,
+    suggestions within a budget). Returns compact "name|price|diet" rows grouped by category.
+    Args:
+        category: Optional part of a category name (e.g., "Desserts", "Starter").
+        diet: Optional "veg", "egg" (vegetarian plus egg dishes) or "non-veg".
+        query: Optional word to look for in dish names and descriptions (e.g., "paneer").
+        max_price: Optional highest price in rupees.
+    """
+    diets, error = _menu_filters(diet)
+    if error:
+        return error
+    snapshot = menu_cache.snapshot()
+    selected = snapshot.select(category, diets, query, max_price)
+    if not selected:
+        return f"No dishes match. Categories: {', '.join(snapshot.categories)}."
+    lines, shown = ["name|price|diet"], 0
+    for cat, rows in selected:
+        if shown >= SEARCH_MENU_LIMIT:
+            break
+        lines.append(f"[{cat}]")
+        for item_id, name, price, _ in rows[:SEARCH_MENU_LIMIT - shown]:
+            lines.append(f"{name}|{price:g}|{snapshot.diets[item_id]}")
+            shown += 1
+    total = sum(len(rows) for _, rows in selected)
+    if total > shown:
+        lines.append(f"...{total - shown} more; narrow the search with category, diet, query or max_price.")
+    return "\n".join(lines)
 
 def place_restaurant_order(room_number: str, items_dict: dict):
     """
@@ -113,20 +227,32 @@ def place_restaurant_order(room_number: str, items_dict: dict):
         room_number: The guest's room number.
         items_dict: A dictionary of item names and quantities. e.g., {"Masala Dosa": 2, "Coffee": 1}
     """
+    # Resolve every item against the in-memory menu index in one pass.
+    snapshot = menu_cache.snapshot()
+    rows, unknown = snapshot.index.resolve(list(items_dict))
+    if unknown:
+        problems = []
+        for item_name, suggestions in unknown.items():
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            problems.append(f"'{item_name}' is not on the menu.{hint}")
+        return "Error: " + " ".join(problems)
+
+    total_cost = 0
+    valid_items = []
+    for item_name, quantity in items_dict.items():
+        _, name, price, _ = rows[item_name]
+        total_cost += price * quantity
+        valid_items.append({"name": name, "quantity": quantity, "price": price})
+
+    if WRITE_BEHIND_ENABLED:
+        # Journaled now, written to the database by the write-behind worker shortly after.
+        ticket = write_queue.submit("order", {
+            "room_number": room_number, "items": valid_items, "total_amount": total_cost, "status": "Pending"
+        })
+        return f"Order placed successfully! Order ID: {ticket}. Total Bill: ₹{total_cost}."
+
     db = get_db_session()
     try:
-        total_cost = 0
-        valid_items = []
-        
-        # Validate items and calculate cost
-        for item_name, quantity in items_dict.items():
-            menu_item = db.query(MenuItem).filter(MenuItem.name.ilike(item_name)).first()
-            if menu_item:
-                total_cost += menu_item.price * quantity
-                valid_items.append({"name": menu_item.name, "quantity": quantity, "price": menu_item.price})
-            else:
-                return f"Error: Item '{item_name}' is not on the menu."
-
         new_order = Order(
             room_number=room_number,
             items=valid_items,
@@ -134,6 +260,9 @@ def place_restaurant_order(room_number: str, items_dict: dict):
             status="Pending"
         )
         db.add(new_order)
+        db.flush()
+        record_order_lines(db, order_lines(new_order.id, room_number, new_order.created_at, valid_items,
+                                           snapshot.by_name))
         db.commit()
         db.refresh(new_order)
         return f"Order placed successfully! Order ID: {new_order.id}. Total Bill: ₹{total_cost}."
@@ -147,6 +276,12 @@ def create_room_service_request(room_number: str, request_type: str, details: st
     """
     Creates a service request (cleaning, laundry, amenities).
     """
+    if WRITE_BEHIND_ENABLED:
+        ticket = write_queue.submit("request", {
+            "room_number": room_number, "request_type": request_type, "details": details, "status": "Pending"
+        })
+        return f"Service request created. Request ID: {ticket}. We will attend to it shortly."
+
     db = get_db_session()
     try:
         new_request = ServiceRequest(
@@ -0,0 +1,166 @@
+import os
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from .changes import row_to_dict
+from .models import Order, ServiceRequest
+from .shared_state import take_lease
+
+# --- Work Queue ---
+# Orders (kitchen) and service requests (housekeeping) double as work queues. A job moves
+# Pending -> working -> done. Staff claim the next job with a single UPDATE that picks and
+# marks it together, so two clients can never get the same one, and the choice is one step down the
+# (status, priority DESC, created_at, id) index however long the table grows.
+# Claims lapse after a lease so a job held by a closed tablet goes back to Pending, and
+# jobs left waiting past their SLA are raised to at least SLA_PRIORITY.
+
+QUEUES = {
+    "orders": {"model": Order, "states": ("Pending", "Preparing", "Delivered"),
+               "sla_minutes": float(os.getenv("ORDER_SLA_MINUTES", "20"))},
+    "requests": {"model": ServiceRequest, "states": ("Pending", "In Progress", "Completed"),
+                 "sla_minutes": float(os.getenv("REQUEST_SLA_MINUTES", "30"))},
+}
+
+SLA_PRIORITY = 10
+LEASE_SECONDS = float(os.getenv("WORK_LEASE_SECONDS", "900"))
+SWEEP_INTERVAL = 5 # Seconds between lapsed-claim / SLA sweeps per queue, across all workers
+
+
+def get_queue(name):
+    queue = QUEUES.get(name)
+    if queue is None:
+        raise HTTPException(status_code=404, detail=f"Unknown queue '{name}'. Use 'orders' or 'requests'.")
+    return queue
+
+
+def allowed_transitions(queue, status):
+    """Statuses a job in `status` may move to: one step forward, or back to Pending while in progress."""
+    pending, working, done = queue["states"]
+    return {pending: {working}, working: {done, pending}, done: set()}.get(status, set())
+
+
+def sweep(db, name, force=False):
+    """
+    Returns lapsed claims to Pending and raises overdue Pending jobs to SLA_PRIORITY.
+    Runs at most every SWEEP_INTERVAL seconds per queue unless `force` is set; the
+    interval is a lease in the shared state, so only one worker sweeps each time.
+    """
+    if not force and not take_lease(f"sweep:{name}", SWEEP_INTERVAL):
+        return
+
+    queue = QUEUES[name]
+    model = queue["model"]
+    pending, working, _ = queue["states"]
+    utcnow = datetime.utcnow()
+    db.query(model).filter(
+        model.status == working, model.claimed_at < utcnow - timedelta(seconds=LEASE_SECONDS)
+    ).update({model.status: pending, model.claimed_by: None, model.claimed_at: None}, synchronize_session=False)
+    db.query(model).filter(
+        model.status == pending,
+        model.priority < SLA_PRIORITY,
+        model.created_at < utcnow - timedelta(minutes=queue["sla_minutes"]),
+    ).update({model.priority: SLA_PRIORITY}, synchronize_session=False)
+    db.commit()
+
+
+def claim_next(db, name, worker):
+    """Assigns the most urgent Pending job to `worker` and returns it (None when the queue is empty)."""
+    queue = get_queue(name)
+    model = queue["model"]
+    pending, working, _ = queue["states"]
+    sweep(db, name)
+
+    # Pick and claim in one UPDATE so concurrent staff never race for the same row:
+    # SQLite runs it under its write lock, Postgres skips rows another claim holds.
+    next_job = (
+        select(model.id)
+        .where(model.status == pending)
+        .order_by(model.priority.desc(), model.created_at, model.id)
+        .limit(1)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        next_job = next_job.with_for_update(skip_locked=True)
+    job_id = db.execute(
+        update(model)
+        .where(model.id == next_job.scalar_subquery(), model.status == pending)
+        .values(status=working, claimed_by=worker, claimed_at=datetime.utcnow())
+        .returning(model.id)
+    ).scalar()
+    db.commit()
+    if job_id is None:
+        return None
+    return row_to_dict(db.get(model, job_id))
+
+
+def _finish(db, name, job_id, worker, to_status, fields):
+    queue = get_queue(name)
+    model = queue["model"]
+    working = queue["states"][1]
+    values = {model.status: to_status}
+    values.update(fields)
+    updated = db.query(model).filter(
+        model.id == job_id, model.status == working, model.claimed_by == worker
+    ).update(values, synchronize_session=False)
+    db.commit()
+    if not updated:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is not claimed by '{worker}'.")
+    return row_to_dict(db.get(model, job_id))
+
+
+def ack(db, name, job_id, worker):
+    """Marks a claimed job done."""
+    return _finish(db, name, job_id, worker, get_queue(name)["states"][2], {})
+
+
+def release(db, name, job_id, worker):
+    """Hands a claimed job back to the queue."""
+    queue = get_queue(name)
+    model = queue["model"]
+    return _finish(db, name, job_id, worker, queue["states"][0], {model.claimed_by: None, model.claimed_at: None})
+
+
+def update_job(db, name, job_id, status=None, priority=None, expected_status=None):
+    """
+    Staff/dashboard edit of a job: move it along its workflow and/or change its priority.
+    `expected_status`, when given, makes the update fail with 409 if the job moved meanwhile.
+    """
+    queue = get_queue(name)
+    model = queue["model"]
+    job = db.get(model, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+    current = job.status
+    values = {}
+    if status is not None and status != current:
+        if status not in allowed_transitions(queue, current):
+            raise HTTPException(status_code=400, detail=f"Cannot move a '{current}' job to '{status}'.")
+        values[model.status] = status
+        if status == queue["states"][0]:
+            values.update({model.claimed_by: None, model.claimed_at: None})
+    if priority is not None:
+        values[model.priority] = priority
+    if not values:
+        return row_to_dict(job)
+
+    guard = expected_status if expected_status is not None else current
+    updated = db.query(model).filter(model.id == job_id, model.status == guard).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+    if not updated:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} changed status meanwhile; reload and retry.")
+    db.expire_all()
+    return row_to_dict(db.get(model, job_id))
+
+
+def queue_stats(db):
+    """Job counts per status for each queue."""
+    stats = {}
+    for name, queue in QUEUES.items():
+        model = queue["model"]
+        counts = dict(db.query(model.status, func.count()).group_by(model.status).all())
+        stats[name] = {status: counts.get(status, 0) for status in queue["states"]}
+    return stats
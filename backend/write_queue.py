@@ -0,0 +1,367 @@
+import contextlib
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .database import SessionLocal, dialect_insert
+from .menu_cache import menu_cache
+from .models import Order, ServiceRequest
+from .sales import order_lines, record_order_lines
+
+# --- Write-Behind Queue ---
+# With WRITE_BEHIND=1, new orders and service requests are appended to a local journal
+# (fsync'd) and the guest gets a ticket straight away. A background worker commits
+# them to the database in batches. Rows carry their ticket under a unique index and are
+# inserted with ON CONFLICT DO NOTHING, so replaying the journal after a crash cannot
+# create duplicates.
+#
+# A journal belongs to one process. Each process (e.g. each `uvicorn --workers` worker)
+# takes the first free slot `<WRITE_BEHIND_JOURNAL>.<n>` and holds an exclusive lock on
+# `<slot>.lock` while it runs. On start it also adopts the journals of slots nobody holds
+# any more (a worker that crashed, or fewer workers than last time): their uncommitted
+# entries are copied into its own journal and committed from there.
+
+KINDS = {"order": (Order, "ORD"), "request": (ServiceRequest, "REQ")}
+
+
+def _try_lock(path):
+    """
+    Opens `path` and takes an exclusive lock on it without waiting. Returns the open
+    file (closing it releases the lock), or None when another process holds it.
+    """
+    f = open(path, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def _read_journal(journal_path):
+    """
+    Entries after a journal's checkpoint, as (entry, journal offset just after it).
+    A torn final line (a crash mid-append; that guest never got a ticket) is cut off.
+    """
+    if not os.path.exists(journal_path):
+        return []
+    try:
+        with open(journal_path + ".checkpoint") as f:
+            offset = int(f.read().strip() or 0)
+    except FileNotFoundError:
+        offset = 0
+    # A journal shorter than the checkpoint was started over after a full commit.
+    offset = min(offset, os.path.getsize(journal_path))
+
+    entries = []
+    with open(journal_path, "rb") as f:
+        f.seek(offset)
+        for line in iter(f.readline, b""):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            offset += len(line)
+            entries.append((entry, offset))
+    if offset < os.path.getsize(journal_path):
+        os.truncate(journal_path, offset)
+    return entries
+
+
+class WriteBehindQueue:
+    """
+    Journal-backed queue of pending order/request inserts.
+    Args:
+        journal_path: Base path of the journals. This queue appends to the JSON Lines
+            journal `<journal_path>.<slot>`; `<journal>.checkpoint` holds the offset up
+            to which its entries are known to be committed.
+        batch_size: Most entries committed in one transaction.
+        flush_interval: Seconds the worker waits for a batch to fill up.
+        fsync: Whether each append is fsync'd before a ticket is returned.
+    """
+
+    def __init__(self, journal_path, batch_size=200, flush_interval=0.05, fsync=True):
+        self.base_path = journal_path
+        self.journal_path = None  # This process's slot, claimed on start
+        self.checkpoint_path = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._pending = queue.Queue()  # (entry, journal offset just after it)
+        self._append_lock = threading.Lock()
+        self._started_lock = threading.Lock()
+        self._committed = threading.Condition()
+        self._journal = None
+        self._slot_lock = None
+        self._worker = None
+        self._appended_offset = 0
+        self._enqueued = 0
+        self.submitted = 0
+        self.committed = 0
+        self.batches = 0
+        self.replayed = 0
+        self.adopted = 0
+        self.failures = 0
+        self.last_batch_ms = 0.0
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """
+        Claims a journal slot, replays the entries a previous run left in it and in any
+        orphaned slot, then starts the worker.
+        """
+        with self._started_lock:
+            if self._worker is not None:
+                return
+            self._claim_slot()
+            self._replay()
+            self._journal = open(self.journal_path, "ab")
+            self._appended_offset = self._journal.tell()
+            self._adopt_orphans()
+            self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout=10):
+        """Commits whatever is still queued and stops the worker."""
+        with self._started_lock:
+            if self._worker is None:
+                return
+            self.flush(timeout)
+            self._pending.put(None)
+            self._worker.join(timeout)
+            self._worker = None
+            self._journal.close()
+            self._journal = None
+            self._slot_lock.close()
+            self._slot_lock = None
+
+    def _claim_slot(self):
+        slot = 0
+        while True:
+            path = f"{self.base_path}.{slot}"
+            self._slot_lock = _try_lock(path + ".lock")
+            if self._slot_lock is not None:
+                self.journal_path = path
+                self.checkpoint_path = path + ".checkpoint"
+                return
+            slot += 1
+
+    def _orphans(self):
+        # Other slots, plus the single journal used before there were slots.
+        slots = [path for path in glob.glob(glob.escape(self.base_path) + ".*")
+                 if re.fullmatch(r"\.\d+", path[len(self.base_path):])]
+        return [path for path in [self.base_path] + slots if path != self.journal_path and os.path.exists(path)]
+
+    def _adopt_orphans(self):
+        """Moves uncommitted entries from journals no running process holds into this one."""
+        for path in self._orphans():
+            lock = _try_lock(path + ".lock")
+            if lock is None:
+                continue  # A live process owns it
+            try:
+                entries = _read_journal(path)
+                for entry, _ in entries:
+                    self._append(entry, adopted=True)
+                if entries:
+                    print(f"Write-behind: adopted {len(entries)} entries from {path}")
+                # Only once they are durable in this journal.
+                for leftover in (path, path + ".checkpoint"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(leftover)
+            finally:
+                lock.close()
+
+    def _replay(self):
+        replayed = _read_journal(self.journal_path)
+        for item in replayed:
+            self._pending.put(item)
+        self._enqueued += len(replayed)
+        self.replayed += len(replayed)
+        if replayed:
+            print(f"Write-behind: replaying {len(replayed)} journal entries")
+
+    # --- Producer side ---
+
+    def submit(self, kind, values):
+        """
+        Durably records a new order/request and returns its ticket. The row is written
+        to the database later by the worker.
+        """
+        if self._worker is None:
+            self.start()
+        _, prefix = KINDS[kind]
+        ticket = f"{prefix}-{uuid.uuid4().hex[:12].upper()}"
+        entry = {"kind": kind, "ticket": ticket, "created_at": datetime.utcnow().isoformat(), "values": values}
+        self._append(entry)
+        return ticket
+
+    def _append(self, entry, adopted=False):
+        line = (json.dumps(entry) + "\n").encode()
+        with self._append_lock:
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._appended_offset += len(line)
+            self._pending.put((entry, self._appended_offset))
+            self._enqueued += 1
+            if adopted:
+                self.adopted += 1
+            else:
+                self.submitted += 1
+
+    def flush(self, timeout=10):
+        """Blocks until everything submitted so far is committed. Returns False on timeout."""
+        target = self._enqueued
+        deadline = time.monotonic() + timeout
+        with self._committed:
+            while self.committed < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._committed.wait(remaining)
+        return True
+
+    # --- Worker side ---
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if batch:
+                self._commit_with_retry(batch)
+
+    def _next_batch(self):
+        try:
+            item = self._pending.get(timeout=1.0)
+        except queue.Empty:
+            return []
+        if item is None:
+            return None
+        batch = [item]
+        # Let a burst build up a little so it shares one commit.
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._pending.get(timeout=remaining) if remaining > 0 else self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._pending.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _commit_with_retry(self, batch):
+        delay = 0.1
+        while True:
+            try:
+                self._commit(batch)
+                return
+            except Exception as e:
+                self.failures += 1
+                print(f"Write-behind: batch of {len(batch)} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    def _commit(self, batch):
+        start = time.perf_counter()
+        insert = dialect_insert()
+        rows = {kind: [] for kind in KINDS}
+        for entry, _ in batch:
+            values = dict(entry["values"], ticket=entry["ticket"],
+                          created_at=datetime.fromisoformat(entry["created_at"]))
+            rows[entry["kind"]].append(values)
+
+        db = SessionLocal()
+        try:
+            for kind, values in rows.items():
+                if values:
+                    model = KINDS[kind][0]
+                    statement = insert(model.__table__).on_conflict_do_nothing(index_elements=["ticket"])
+                    if kind == "order":
+                        # Only orders actually inserted (not replays of committed ones) get order lines.
+                        inserted = db.execute(statement.returning(model.id, model.ticket), values).all()
+                        self._record_lines(db, values, inserted)
+                    else:
+                        db.execute(statement, values)
+            db.commit()
+        finally:
+            db.close()
+
+        self.last_batch_ms = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self._checkpoint(batch[-1][1])
+        with self._committed:
+            self.committed += len(batch)
+            self._committed.notify_all()
+
+    @staticmethod
+    def _record_lines(db, values, inserted):
+        by_ticket = {row["ticket"]: row for row in values}
+        menu = menu_cache.snapshot().by_name if inserted else {}
+        record_order_lines(db, [
+            line for order_id, ticket in inserted
+            for line in order_lines(order_id, by_ticket[ticket]["room_number"], by_ticket[ticket]["created_at"],
+                                    by_ticket[ticket]["items"], menu)
+        ])
+
+    def _checkpoint(self, offset):
+        with self._append_lock:
+            # Once everything in the journal is committed, start it over so it stays small.
+            if self._appended_offset == offset and self._pending.empty():
+                self._write_checkpoint(0)
+                self._journal.truncate(0)
+                self._appended_offset = 0
+            else:
+                self._write_checkpoint(offset)
+
+    def _write_checkpoint(self, offset):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def stats(self):
+        return {
+            "enabled": self._worker is not None,
+            "submitted": self.submitted,
+            "committed": self.committed,
+            "pending": self._pending.qsize(),
+            "batches": self.batches,
+            "avg_batch_size": round(self.committed / self.batches, 1) if self.batches else 0.0,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+            "replayed": self.replayed,
+            "adopted": self.adopted,
+            "failures": self.failures,
+            "journal": self.journal_path,
+        }
+
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND", "0") == "1"
+
+write_queue = WriteBehindQueue(
+    os.getenv("WRITE_BEHIND_JOURNAL", "./write_behind.journal"),
+    batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200")),
+    flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_MS", "50")) / 1000,
+    fsync=os.getenv("WRITE_BEHIND_FSYNC", "1") == "1",
+)
@@ -0,0 +1,21 @@
+import argparse
+
+from backend.database import engine, init_db
+from backend.sales import BACKFILL_BATCH, backfill_order_items
+
+# One-off after upgrading: writes `order_items` rows and sales rollups for orders placed
+# before they existed. Orders that already have lines are skipped, so it is safe to re-run.
+#   python backfill_sales.py
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill order lines and sales rollups for existing orders.")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    init_db()
+    with engine.begin() as conn:
+        done = backfill_order_items(conn, args.batch_size)
+    print(f"Backfilled order lines and sales rollups for {done} orders.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Structured requests ("order 2x Masala Dosa for room 204" from a button) sent through
+/chat, where the model picks the tool and then phrases the reply, versus calling the
+same tool directly through the /actions layer. The fake model takes `--latency`
+seconds per call, roughly what a hosted model does.
+
+Run from the project root:
+    python -m benchmarks.bench_actions [--requests N] [--latency SECONDS]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from benchmarks.common import report, use_temp_db
+
+use_temp_db()
+
+from backend.actions import run_action  # noqa: E402
+from backend.agents import AgentManager  # noqa: E402
+from backend.fake_model import FakeModel  # noqa: E402
+
+ORDER = {"room_number": "204", "items_dict": {"Masala Dosa": 2, "Masala Chai": 1}}
+
+
+async def via_chat(manager, count):
+    FakeModel.calls = 0
+    FakeModel.tool_call = ("place_restaurant_order", ORDER)
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            start = time.perf_counter()
+            await manager.chat_async([{"role": "user", "content": "Order 2 Masala Dosa and a Masala Chai for room 204"}],
+                                     f"chat-{i}")
+            samples.append(time.perf_counter() - start)
+    return samples, FakeModel.calls
+
+
+def via_actions(count):
+    FakeModel.calls = 0
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        result = run_action("place_restaurant_order", ORDER)
+        samples.append(time.perf_counter() - start)
+        assert result["ok"], result
+    return samples, FakeModel.calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per fake model call")
+    args = parser.parse_args()
+
+    import add_remaining_menu
+    import seed_data
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        add_remaining_menu.add_remaining_items()
+    FakeModel.latency = args.latency
+
+    samples, calls = asyncio.run(via_chat(AgentManager(model_factory=FakeModel), args.requests))
+    report("/chat (model + tool)", samples)
+    print(f"{'':<28} model calls={calls} ({calls / args.requests:.1f} per request)")
+
+    samples, calls = via_actions(args.requests)
+    report("/actions (tool only)", samples)
+    print(f"{'':<28} model calls={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Measures per-request agent setup cost with and without the session pool.
+No API calls are made: only model construction and `start_chat` are timed.
+
+Run from the project root:
+    python -m benchmarks.bench_agent_pool
+"""
+import time
+
+from backend.agents import AgentManager, AGENT_SPECS, ResortAgent
+from benchmarks.common import report
+
+REQUESTS = 2000
+CONVERSATIONS = 50
+
+
+def bench_fresh():
+    # The old behaviour: a new model and chat session for every message.
+    agent_types = list(AGENT_SPECS)
+    samples = []
+    for i in range(REQUESTS):
+        prompt, tools = AGENT_SPECS[agent_types[i % len(agent_types)]]
+        start = time.perf_counter()
+        ResortAgent(prompt, tools)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_pooled():
+    manager = AgentManager()
+    agent_types = list(AGENT_SPECS)
+    samples = []
+    for i in range(REQUESTS):
+        agent_type = agent_types[i % len(agent_types)]
+        start = time.perf_counter()
+        manager.get_agent(agent_type, f"conv-{i % CONVERSATIONS}")
+        samples.append(time.perf_counter() - start)
+    return samples, manager.stats()
+
+
+if __name__ == "__main__":
+    report("fresh agent per message", bench_fresh())
+    samples, stats = bench_pooled()
+    report("pooled sessions", samples)
+    print(f"pool stats: {stats}")
@@ -0,0 +1,72 @@
+"""
+Receptionist answer cache: latency and model calls for a stream of guest messages
+where most are repeated facility questions worded in different ways. The fake model
+calls `get_facility_info` before answering, like the real receptionist does.
+
+Run from the project root:
+    python -m benchmarks.bench_answer_cache
+"""
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import report, use_temp_db
+
+use_temp_db()
+
+from backend.agents import AgentManager  # noqa: E402
+from backend.answer_cache import AnswerCache  # noqa: E402
+from backend.fake_model import FakeModel  # noqa: E402
+
+FAQS = [
+    "What time is check-in?", "When is check in?", "check-in time please",
+    "What time is checkout?", "When do I need to check out?",
+    "What is the wifi password?", "wi-fi password?", "How do I get on the internet?",
+    "When is the gym open?", "What are the fitness center hours?",
+    "Is the pool open?", "What time does the swimming pool close?",
+    "When is breakfast served?", "What are the restaurant timings?",
+    "Is there parking?", "Do you have valet parking?",
+    "What are the spa hours?", "Can I book a massage at the spa?",
+]
+OTHER = ["Do you have a room available tomorrow?", "Can I extend my stay?", "Hello there"]
+MESSAGES = 300
+FAQ_SHARE = 0.8
+
+
+def workload():
+    rng = random.Random(7)
+    return [rng.choice(FAQS) if rng.random() < FAQ_SHARE else rng.choice(OTHER) for _ in range(MESSAGES)]
+
+
+async def run(manager, messages):
+    FakeModel.calls = 0
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text in messages:
+            start = time.perf_counter()
+            await manager.chat_async([{"role": "user", "content": text}])
+            samples.append(time.perf_counter() - start)
+    return samples, FakeModel.calls
+
+
+async def main():
+    FakeModel.latency = 0.02
+    FakeModel.tool_call = ("get_facility_info", {"facility_name": "gym"})
+    messages = workload()
+
+    uncached = AgentManager(model_factory=FakeModel)
+    uncached.answer_cache = AnswerCache(max_entries=0)
+    cached = AgentManager(model_factory=FakeModel)
+
+    print(f"{len(messages)} messages, {FAQ_SHARE:.0%} facility questions, {FakeModel.latency * 1000:.0f}ms per model turn")
+    for label, manager in [("no answer cache", uncached), ("answer cache", cached)]:
+        samples, calls = await run(manager, messages)
+        report(label, samples)
+        print(f"{'':<28} model calls={calls} ({calls / len(messages):.2f} per message)")
+    print("answer cache stats:", cached.answer_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
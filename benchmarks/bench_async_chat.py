@@ -0,0 +1,53 @@
+"""
+Concurrent-chat load test: the old blocking `manager.chat` call inside the event loop
+versus the async pipeline, with a fake model that takes 100ms per turn.
+
+Run from the project root:
+    python -m benchmarks.bench_async_chat
+"""
+import asyncio
+import contextlib
+import io
+import time
+
+from backend.agents import AgentManager
+from backend.fake_model import FakeModel
+
+# Routed through the LLM router (no confident local match), so each chat is two model turns.
+HISTORY = [{"role": "user", "content": "hello there"}]
+CONCURRENCY = [1, 4, 16, 32]
+ROUNDS = 2
+
+
+async def run_blocking(manager, concurrency):
+    # What the endpoint did before: a synchronous call made from inside a coroutine.
+    async def one():
+        return manager.chat(HISTORY)
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+
+
+async def run_async(manager, concurrency):
+    await asyncio.gather(*(manager.chat_async(HISTORY) for _ in range(concurrency)))
+
+
+async def measure(runner, manager, concurrency):
+    start = time.perf_counter()
+    # Silence the per-message routing log while timing.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ROUNDS):
+            await runner(manager, concurrency)
+    elapsed = time.perf_counter() - start
+    return concurrency * ROUNDS / elapsed
+
+
+async def main():
+    manager = AgentManager(model_factory=FakeModel)
+    print(f"{'concurrency':>11} {'blocking chats/s':>17} {'async chats/s':>14}")
+    for concurrency in CONCURRENCY:
+        blocking = await measure(run_blocking, manager, concurrency)
+        non_blocking = await measure(run_async, manager, concurrency)
+        print(f"{concurrency:>11} {blocking:>17.1f} {non_blocking:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+"""
+Room availability on a 500-room, 365-day calendar about 70% booked: "how many rooms of
+this type are free for this stay" from the bitmap index versus a SQL query, then
+concurrent bookings from several processes (each with its own index) racing for the
+same rooms, checked for overbooking.
+
+Run from the project root:
+    python -m benchmarks.bench_availability [--rooms N] [--queries N] [--processes N] [--threads N]
+"""
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import report, use_temp_db
+
+DAYS = 365
+ROOM_TYPES = [("Standard", 100, 0.5), ("Deluxe", 200, 0.3), ("Suite", 500, 0.15), ("Villa", 900, 0.05)]
+
+
+def seed(rooms, occupancy):
+    from sqlalchemy import insert
+    from backend.database import engine, init_db
+    from backend.models import Booking, Room, RoomNight
+
+    init_db()
+    rng = random.Random(7)
+    today = date.today()
+    room_rows, booking_rows, night_rows = [], [], []
+    number = 0
+    for room_type, base_rate, share in ROOM_TYPES:
+        for _ in range(int(rooms * share)):
+            number += 1
+            room_rows.append({"id": number, "number": f"R{number:04d}", "room_type": room_type, "base_rate": base_rate})
+    for room in room_rows:
+        day = 0
+        while day < DAYS:
+            nights = rng.randint(1, 7)
+            # Gaps sized so that about `occupancy` of all nights end up booked.
+            day += rng.randint(0, int(4 * 2 * (1 - occupancy) / occupancy))
+            if day + nights > DAYS:
+                break
+            booking_id = len(booking_rows) + 1
+            check_in = today + timedelta(days=day)
+            booking_rows.append({"id": booking_id, "room_id": room["id"], "guest_name": "seed", "status": "Confirmed",
+                                 "check_in": check_in, "check_out": check_in + timedelta(days=nights)})
+            night_rows += [{"room_id": room["id"], "night": check_in + timedelta(days=i), "booking_id": booking_id}
+                           for i in range(nights)]
+            day += nights
+    with engine.begin() as conn:
+        conn.execute(insert(Room.__table__), room_rows)
+        conn.execute(insert(Booking.__table__), booking_rows)
+        for i in range(0, len(night_rows), 20_000):
+            conn.execute(insert(RoomNight.__table__), night_rows[i:i + 20_000])
+    return len(night_rows) / (len(room_rows) * DAYS)
+
+
+def random_stays(count, seed=1):
+    rng = random.Random(seed)
+    today = date.today()
+    stays = []
+    for _ in range(count):
+        check_in = today + timedelta(days=rng.randrange(DAYS - 14))
+        stays.append((rng.choice(ROOM_TYPES)[0], check_in, check_in + timedelta(days=rng.randint(1, 7))))
+    return stays
+
+
+def sql_count_free(db, room_type, check_in, check_out):
+    from sqlalchemy import and_, exists, func
+    from backend.models import Room, RoomNight
+
+    booked = exists().where(and_(RoomNight.room_id == Room.id, RoomNight.night >= check_in, RoomNight.night < check_out))
+    return db.query(func.count(Room.id)).filter(Room.room_type == room_type, ~booked).scalar()
+
+
+def queries(count):
+    from backend.availability import availability
+    from backend.database import SessionLocal
+
+    stays = random_stays(count)
+    start = time.perf_counter()
+    availability.refresh()
+    print(f"index load: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    db = SessionLocal()
+    indexed, sql = [], []
+    try:
+        for room_type, check_in, check_out in stays:
+            t0 = time.perf_counter()
+            free = availability.count_free(room_type, check_in, check_out)
+            t1 = time.perf_counter()
+            expected = sql_count_free(db, room_type, check_in, check_out)
+            t2 = time.perf_counter()
+            assert free == expected, (room_type, check_in, check_out, free, expected)
+            indexed.append(t1 - t0)
+            sql.append(t2 - t1)
+    finally:
+        db.close()
+    report("count_free (bitmap index)", indexed, unit="us")
+    report("count_free (SQL NOT EXISTS)", sql, unit="us")
+
+
+def booking_process(seed, threads, bookings, results):
+    # Runs in its own process with its own index, like a second API worker.
+    from backend.availability import availability
+
+    stays = random_stays(bookings * threads, seed)
+    availability.refresh()  # Initial load, as at API startup
+    made, samples = [], []
+    lock = threading.Lock()
+
+    def worker(mine):
+        for room_type, check_in, check_out in mine:
+            start = time.perf_counter()
+            booking = availability.book(room_type, check_in, check_out, f"guest-{seed}")
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+                if booking:
+                    made.append(booking["id"])
+
+    workers = [threading.Thread(target=worker, args=(stays[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    results.put((len(made), availability.conflicts, samples, time.perf_counter() - start))
+
+
+def concurrent_bookings(processes, threads, bookings):
+    from sqlalchemy import text
+    from backend.database import engine
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=booking_process, args=(seed, threads, bookings, results))
+               for seed in range(100, 100 + processes)]
+    for p in workers:
+        p.start()
+    outcomes = [results.get() for _ in workers]
+    for p in workers:
+        p.join()
+    elapsed = max(outcome[3] for outcome in outcomes)
+
+    made = sum(outcome[0] for outcome in outcomes)
+    conflicts = sum(outcome[1] for outcome in outcomes)
+    samples = [sample for outcome in outcomes for sample in outcome[2]]
+    with engine.connect() as conn:
+        overlaps = conn.execute(text("""
+            SELECT COUNT(*) FROM bookings a JOIN bookings b
+              ON a.room_id = b.room_id AND a.id < b.id
+             AND a.check_in < b.check_out AND b.check_in < a.check_out
+             AND a.status = 'Confirmed' AND b.status = 'Confirmed'
+        """)).scalar()
+    print(f"\n{processes} processes x {threads} threads: {len(samples)} attempts, {made} booked, "
+          f"{len(samples) - made} sold out, {conflicts} lost races retried, {len(samples) / elapsed:.0f} attempts/s")
+    print(f"overlapping bookings: {overlaps}")
+    report("book latency", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--occupancy", type=float, default=0.7)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--bookings", type=int, default=100, help="Booking attempts per thread")
+    args = parser.parse_args()
+
+    use_temp_db()
+    booked = seed(args.rooms, args.occupancy)
+    print(f"{args.rooms} rooms x {DAYS} days, {booked:.0%} of nights booked")
+    queries(args.queries)
+    concurrent_bookings(args.processes, args.threads, args.bookings)
+
+
+if __name__ == "__main__":
+    main()
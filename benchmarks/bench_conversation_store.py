@@ -0,0 +1,113 @@
+"""
+Request size and /chat latency over a 100-turn conversation: the old client that
+re-sends the whole history every turn versus sending only the new message with a
+conversation id (in-memory and database conversation stores). Also prints the size
+of the context handed to the agent, and fails unless it stays flat once the store
+starts summarising.
+
+Run from the project root:
+    python -m benchmarks.bench_conversation_store
+"""
+import contextlib
+import io
+import json
+import os
+import statistics
+import threading
+import time
+
+import requests
+import uvicorn
+
+from benchmarks.common import use_temp_db
+
+use_temp_db()
+os.environ["CHAT_RATE_LIMIT"] = "0"  # One guest sends every turn, far more than the per-room limit allows
+
+import backend.agents  # noqa: E402
+import backend.main  # noqa: E402
+from backend.agents import AgentManager  # noqa: E402
+from backend.conversations import DatabaseConversationStore, MemoryConversationStore  # noqa: E402
+from backend.database import init_db  # noqa: E402
+from benchmarks.bench_stream_ttfb import free_port  # noqa: E402
+from backend.fake_model import FakeModel  # noqa: E402
+
+TURNS = 100
+CHECKPOINTS = [1, 25, 50, 75, 100]
+CONTEXT_GROWTH = 1.05 # Largest allowed agent context after turn 25, relative to turn 25
+
+
+def start_server(port):
+    config = uvicorn.Config(backend.main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def message(turn):
+    return f"Turn {turn}: could you help me plan the rest of my stay with my family?"
+
+
+def run(url, mode, manager):
+    rows = {}
+    samples = []
+    history = []
+    conversation_id = f"bench-{mode}"
+    session = requests.Session()
+    for turn in range(1, TURNS + 1):
+        text = message(turn)
+        if mode == "full history":
+            history.append({"role": "user", "content": text})
+            body = json.dumps({"history": history})
+        else:
+            body = json.dumps({"message": text, "conversation_id": conversation_id})
+        start = time.perf_counter()
+        response = session.post(url, data=body, headers={"Content-Type": "application/json"})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise SystemExit(f"{mode}: turn {turn} got HTTP {response.status_code}: {response.text[:200]}")
+        reply = response.json()["response"]
+        if mode == "full history":
+            history.append({"role": "assistant", "content": reply})
+        if turn in CHECKPOINTS:
+            agent = manager.pool.acquire("Receptionist", conversation_id) if mode != "full history" else None
+            context = agent.history_size() if agent else None
+            # Median over the turns since the previous checkpoint, to smooth out single slow requests
+            rows[turn] = (len(body), statistics.median(samples), context)
+            samples = []
+    return rows
+
+
+def main():
+    init_db()
+    FakeModel.latency = 0.002
+    FakeModel.reply = "Of course! " + "Here is a suggestion for your family's day at the resort. " * 6
+    port = free_port()
+    server = start_server(port)
+    url = f"http://127.0.0.1:{port}/chat"
+
+    stores = {
+        "full history": MemoryConversationStore(),
+        "message + id (memory)": MemoryConversationStore(),
+        "message + id (database)": DatabaseConversationStore(),
+    }
+    print(f"{'mode':<26} {'turn':>5} {'request bytes':>14} {'median latency':>15} {'agent context bytes':>20}")
+    for mode, store in stores.items():
+        manager = AgentManager(model_factory=FakeModel)
+        manager.conversations = store
+        backend.agents.manager = manager
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = run(url, mode, manager)
+        for turn, (size, elapsed, context) in rows.items():
+            context = "-" if context is None else str(context)
+            print(f"{mode:<26} {turn:>5} {size:>14} {elapsed * 1000:>13.1f}ms {context:>20}")
+        contexts = [context for turn, (_, _, context) in rows.items() if turn >= 25 and context is not None]
+        assert not contexts or max(contexts) <= contexts[0] * CONTEXT_GROWTH, \
+            f"{mode}: agent context grew from {contexts[0]} to {max(contexts)} bytes"
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Concurrent writers calling `place_restaurant_order` and `create_room_service_request`,
+reporting commits/sec and lock errors for the old engine (rollback journal,
+synchronous=FULL, no busy timeout, SQLAlchemy's default pool) and the tuned profile
+(WAL, synchronous=NORMAL, 5s busy timeout). Writers run as several processes, like
+several uvicorn workers, each with a few threads. Each profile runs `--runs` times,
+interleaved, and the median run is reported.
+
+Run from the project root:
+    python -m benchmarks.bench_db_writers [--runs N]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.common import seed_synthetic_menu, use_temp_db
+
+PROCESSES = 4
+THREADS_PER_PROCESS = 4
+DURATION = 5.0
+
+# The engine before tuning: SQLite's own defaults and SQLAlchemy's default QueuePool.
+LEGACY = {
+    "SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_BUSY_TIMEOUT_MS": "0",
+    "SQLITE_CACHE_SIZE_KB": "2000", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10",
+}
+PROFILES = {
+    # The original order tool read menu rows inside the write transaction before inserting.
+    "legacy, old tool": dict(LEGACY, READ_BEFORE_WRITE="1"),
+    "legacy defaults": LEGACY,
+    "tuned (WAL)": {
+        "SQLITE_JOURNAL_MODE": "WAL", "SQLITE_SYNCHRONOUS": "NORMAL", "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_CACHE_SIZE_KB": "20000", "DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "20",
+    },
+}
+
+
+def legacy_place_order(room_number, items_dict):
+    from backend.database import SessionLocal
+    from backend.models import MenuItem, Order
+
+    db = SessionLocal()
+    try:
+        valid_items = []
+        for item_name, quantity in items_dict.items():
+            item = db.query(MenuItem).filter(MenuItem.name.ilike(item_name)).first()
+            valid_items.append({"name": item.name, "quantity": quantity, "price": item.price})
+        db.add(Order(room_number=room_number, items=valid_items, total_amount=0, status="Pending"))
+        db.commit()
+        return "Order placed successfully!"
+    except Exception as e:
+        return f"Failed to place order: {str(e)}"
+    finally:
+        db.close()
+
+
+def writer_process(env, results):
+    os.environ.update(env)
+    from backend.tools import create_room_service_request, place_restaurant_order
+
+    if env.get("READ_BEFORE_WRITE"):
+        place_restaurant_order = legacy_place_order
+
+    counts = {"commits": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + DURATION
+
+    def run(worker):
+        i = 0
+        while time.monotonic() < deadline:
+            try:
+                if i % 2:
+                    reply = create_room_service_request(str(100 + worker), "Towel", "2 towels")
+                else:
+                    reply = place_restaurant_order(str(100 + worker), {"Spicy Paneer 0": 1, "Classic Paneer 1": 2})
+            except Exception as e:  # e.g. the menu snapshot read, outside the tools' own error handling
+                reply = f"Failed: {e}"
+            i += 1
+            key = "locked" if "locked" in reply else "errors" if ("Failed" in reply or "Error" in reply) else "commits"
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(THREADS_PER_PROCESS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put(counts)
+
+
+def run_profile(env):
+    use_temp_db()
+    env = dict(env, DATABASE_URL=os.environ["DATABASE_URL"])
+    os.environ.update(env)
+
+    ctx = multiprocessing.get_context("spawn")
+    # Seed in a child too, so this process never opens the database with other settings.
+    seeder = ctx.Process(target=seed_synthetic_menu, args=(50,))
+    seeder.start()
+    seeder.join()
+
+    results = ctx.Queue()
+    procs = [ctx.Process(target=writer_process, args=(env, results)) for _ in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    totals = {"commits": 0, "locked": 0, "errors": 0}
+    for _ in procs:
+        for key, value in results.get().items():
+            totals[key] += value
+    for p in procs:
+        p.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Runs per profile; the median is reported")
+    args = parser.parse_args()
+
+    runs = {name: [] for name in PROFILES}
+    for _ in range(args.runs):
+        for name, env in PROFILES.items():
+            runs[name].append(run_profile(env))
+
+    print(f"{PROCESSES} processes x {THREADS_PER_PROCESS} threads for {DURATION:.0f}s, median of {args.runs} runs")
+    print(f"{'profile':<18} {'commits/s':>10} {'(min-max)':>12} {'lock errors':>12} {'other errors':>13}")
+    for name, totals in runs.items():
+        rates = [t["commits"] / DURATION for t in totals]
+        locked = statistics.median(t["locked"] for t in totals)
+        errors = statistics.median(t["errors"] for t in totals)
+        print(f"{name:<18} {statistics.median(rates):>10.0f} {f'({min(rates):.0f}-{max(rates):.0f})':>12} "
+              f"{locked:>12.0f} {errors:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
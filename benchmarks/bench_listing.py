@@ -0,0 +1,90 @@
+"""
+Latency of GET /orders as the table grows: the old unbounded `.all()` versus
+keyset pages (first page, a page deep in the history, and filtered pages).
+
+Run from the project root (the 1M-row table takes a little while to generate):
+    python -m benchmarks.bench_listing
+"""
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_temp_db
+
+SIZES = [10_000, 100_000, 1_000_000]
+FULL_SCAN_LIMIT = 100_000  # .all() beyond this just takes too long to be worth timing
+REPEATS = 20
+STATUSES = ["Pending", "Preparing", "Delivered"]
+
+
+def grow_orders(path, start, count):
+    conn = sqlite3.connect(path)
+    base = datetime(2025, 1, 1)
+    rows = (
+        (
+            str(100 + i % 400),
+            '[{"name": "Masala Dosa", "quantity": 2, "price": 120.0}]',
+            240.0,
+            STATUSES[i % 3] if i < start + count - 500 else "Pending",
+            (base + timedelta(seconds=30 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        )
+        for i in range(start, start + count)
+    )
+    conn.executemany(
+        "INSERT INTO orders (room_number, items, total_amount, status, created_at) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+if __name__ == "__main__":
+    path = use_temp_db()
+
+    from backend.database import SessionLocal, init_db
+    from backend.listing import encode_cursor
+    from backend.main import get_orders
+    from backend.models import Order
+
+    init_db()
+    db = SessionLocal()
+
+    def page(**kwargs):
+        params = dict(status=None, room_number=None, created_from=None, created_to=None,
+                      cursor=None, limit=50, fields=None)
+        params.update(kwargs)
+        return get_orders(db=db, **params)
+
+    print(f"{'rows':>9} {'.all()':>10} {'first page':>11} {'deep page':>10} {'status+room':>12} {'date range':>11}")
+    total = 0
+    for size in SIZES:
+        grow_orders(path, total, size - total)
+        total = size
+        random.seed(size)
+
+        if size <= FULL_SCAN_LIMIT:
+            full = f"{timed(lambda: db.query(Order).all(), repeats=3):>8.1f}ms"
+        else:
+            full = f"{'skipped':>10}"
+
+        # A cursor half way back through the history.
+        middle = db.query(Order.created_at, Order.id).filter(Order.id == size // 2).one()
+        deep_cursor = encode_cursor(middle.created_at, middle.id)
+
+        first = timed(lambda: page())
+        deep = timed(lambda: page(cursor=deep_cursor))
+        filtered = timed(lambda: page(status="Delivered", room_number=str(100 + random.randrange(400))))
+        window_start = datetime(2025, 1, 1) + timedelta(seconds=30 * random.randrange(size))
+        ranged = timed(lambda: page(created_from=window_start, created_to=window_start + timedelta(hours=6)))
+        print(f"{size:>9} {full} {first:>9.2f}ms {deep:>8.2f}ms {filtered:>10.2f}ms {ranged:>9.2f}ms")
+
+    db.close()
@@ -0,0 +1,239 @@
+"""
+Offline load test of the API: starts uvicorn in a subprocess against a synthetic
+resort.db (large order and request history, full menu, room inventory) with the
+scripted fake model (MODEL_BACKEND=fake), then drives /chat, /orders and /requests
+one endpoint at a time at a fixed concurrency and reports throughput and latency
+percentiles per endpoint. No API key or network access is needed.
+
+For CI, save a run with `--json results.json` and compare later runs against it with
+`--baseline results.json`: the exit status is 1 when an endpoint's p95 grows, or its
+throughput drops, by more than `--tolerance` (default 50%, as shared CI
+runners are noisy).
+
+Run from the project root:
+    python -m benchmarks.bench_load [--concurrency N] [--requests N] [--orders N]
+        [--service-requests N] [--model-latency-ms MS] [--workers N] [--json PATH] [--baseline PATH]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from benchmarks.common import percentile, seed_synthetic_menu, use_temp_db
+
+ENDPOINTS = ["chat", "orders", "requests"]
+ORDER_STATUSES = ["Pending", "Preparing", "Delivered"]
+REQUEST_STATUSES = ["Pending", "In Progress", "Completed"]
+REQUEST_TYPES = ["Housekeeping", "Towels", "Repair", "Laundry"]
+# Guest messages for /chat; each one exercises a different agent and tool of the fake script.
+CHAT_MESSAGES = [
+    "I'd like to order a Masala Dosa to room {room}",
+    "What is the wifi password?",
+    "Please send fresh towels to room {room}",
+    "Can I see the menu?",
+    "Are any rooms available next month?",
+    "When does the pool open?",
+    "Hello!",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(path, orders, service_requests, extra_menu_items):
+    import add_remaining_menu
+    import seed_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        add_remaining_menu.add_remaining_items()
+        seed_data.seed_rooms()
+    if extra_menu_items:
+        seed_synthetic_menu(extra_menu_items)
+
+    conn = sqlite3.connect(path)
+    base = datetime.now() - timedelta(days=365)
+    step = 365 * 86400 / max(orders, service_requests, 1)
+    conn.executemany(
+        "INSERT INTO orders (room_number, items, total_amount, status, created_at, priority) VALUES (?, ?, ?, ?, ?, 0)",
+        (
+            (str(100 + i % 400), '[{"name": "Masala Dosa", "quantity": 2, "price": 120.0}]', 240.0,
+             ORDER_STATUSES[i % 3], (base + timedelta(seconds=step * i)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+            for i in range(orders)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO service_requests (room_number, request_type, details, status, created_at, priority) "
+        "VALUES (?, ?, ?, ?, ?, 0)",
+        (
+            (str(100 + i % 400), REQUEST_TYPES[i % 4], "Synthetic request", REQUEST_STATUSES[i % 3],
+             (base + timedelta(seconds=step * i)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+            for i in range(service_requests)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def start_server(port, workers, model_latency_ms, extra_env=None):
+    env = dict(os.environ, MODEL_BACKEND="fake", FAKE_MODEL_LATENCY_MS=str(model_latency_ms), PRELOAD_GENAI="0",
+               **(extra_env or {}))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        with contextlib.suppress(requests.ConnectionError):
+            if requests.get(f"http://127.0.0.1:{port}/stats", timeout=5).ok:
+                return server
+        if server.poll() is not None:
+            raise RuntimeError("The API server exited during startup.")
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("The API server did not start within 60s.")
+
+
+def make_call(endpoint, base_url, rng, counter):
+    """Returns a function that sends one request of `endpoint` and says whether it succeeded."""
+    if endpoint == "chat":
+        def call(session):
+            i = next(counter)
+            message = rng.choice(CHAT_MESSAGES).format(room=100 + i % 400)
+            response = session.post(f"{base_url}/chat", json={"message": message, "conversation_id": f"load-{i}"})
+            return response.ok and not response.json()["response"].startswith("I encountered an error")
+        return call
+
+    statuses = ORDER_STATUSES if endpoint == "orders" else REQUEST_STATUSES
+
+    def call(session):
+        # Mostly the dashboard's first page, plus filtered views.
+        params = rng.choice([{}, {}, {"status": rng.choice(statuses)}, {"room_number": str(100 + rng.randrange(400))}])
+        return session.get(f"{base_url}/{endpoint}", params=dict(params, limit=50)).ok
+    return call
+
+
+def drive(call, concurrency, count):
+    samples, errors = [], 0
+    lock = threading.Lock()
+    remaining = itertools.count()
+
+    def worker():
+        nonlocal errors
+        with requests.Session() as session:
+            while next(remaining) < count:
+                start = time.perf_counter()
+                try:
+                    ok = call(session)
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    samples.append(elapsed)
+                    errors += not ok
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput": round(len(samples) / wall, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    found = []
+    for endpoint, result in results.items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(f"{endpoint}: p95 {before['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            found.append(f"{endpoint}: throughput {before['throughput']:.1f}/s -> {result['throughput']:.1f}/s")
+        if result["errors"] > before["errors"]:
+            found.append(f"{endpoint}: errors {before['errors']} -> {result['errors']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--orders", type=int, default=200_000, help="Orders in the synthetic database")
+    parser.add_argument("--service-requests", type=int, default=100_000)
+    parser.add_argument("--menu-items", type=int, default=300, help="Generated dishes on top of the real menu")
+    parser.add_argument("--model-latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    path = use_temp_db()
+    start = time.perf_counter()
+    seed(path, args.orders, args.service_requests, args.menu_items)
+    print(f"seeded {args.orders} orders and {args.service_requests} requests in {time.perf_counter() - start:.1f}s")
+
+    port = free_port()
+    server = start_server(port, args.workers, args.model_latency_ms)
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        print(f"{args.requests} requests per endpoint, concurrency {args.concurrency}, "
+              f"fake model {args.model_latency_ms:.0f}ms per call, {args.workers} worker(s)")
+        print(f"{'endpoint':<10} {'req/s':>9} {'p50':>10} {'p95':>10} {'p99':>10} {'errors':>7}")
+        for endpoint in args.endpoints.split(","):
+            rng = random.Random(args.seed)
+            call = make_call(endpoint, base_url, rng, itertools.count())
+            drive(call, args.concurrency, args.concurrency)  # Warm-up: caches, pooled sessions, connections
+            result = results[endpoint] = drive(call, args.concurrency, args.requests)
+            print(f"/{endpoint:<9} {result['throughput']:>9.1f} {result['p50_ms']:>8.1f}ms "
+                  f"{result['p95_ms']:>8.1f}ms {result['p99_ms']:>8.1f}ms {result['errors']:>7}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {"config": {key: value for key, value in vars(args).items() if key not in ("json", "baseline")},
+              "endpoints": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Menu build time versus cache-hit latency for `get_menu_items` on a large menu.
+
+Run from the project root:
+    python -m benchmarks.bench_menu_cache
+"""
+import time
+
+from benchmarks.common import report, seed_synthetic_menu, use_temp_db
+
+MENU_SIZE = 3000
+CALLS = 2000
+
+if __name__ == "__main__":
+    use_temp_db()
+    seed_synthetic_menu(MENU_SIZE)
+
+    from backend.menu_cache import menu_cache
+    from backend.tools import get_menu_items
+
+    rebuilds = []
+    for _ in range(20):
+        menu_cache.invalidate()
+        start = time.perf_counter()
+        get_menu_items()
+        rebuilds.append(time.perf_counter() - start)
+
+    hits, filtered = [], []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        get_menu_items()
+        hits.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        get_menu_items("Desserts")
+        filtered.append(time.perf_counter() - start)
+
+    print(f"menu of {MENU_SIZE} items")
+    report("uncached build", rebuilds)
+    report("cache hit (full menu)", hits, unit="us")
+    report("cache hit (one category)", filtered, unit="us")
+    print(f"cache stats: {menu_cache.stats()}")
@@ -0,0 +1,81 @@
+"""
+Menu import throughput: the old per-row script (existence query + insert per item)
+versus the bulk upsert pipeline, on generated multi-outlet menus streamed from CSV.
+The second bulk run re-imports the same file, so every row is an update.
+
+Run from the project root:
+    python -m benchmarks.bench_menu_import
+"""
+import csv
+import os
+import tempfile
+import time
+
+from benchmarks.common import use_temp_db
+
+use_temp_db()
+
+from sqlalchemy import text  # noqa: E402
+
+from backend.database import SessionLocal, engine, init_db  # noqa: E402
+from backend.menu_cache import CATEGORY_ORDER  # noqa: E402
+from backend.menu_import import import_menu_files, read_menu_file  # noqa: E402
+from backend.models import MenuItem  # noqa: E402
+
+SIZES = [1000, 10000, 50000]
+LEGACY_MAX = 10000 # The per-row script gets slow enough that larger runs are skipped
+
+
+def write_menu(count):
+    path = os.path.join(tempfile.mkdtemp(), f"menu_{count}.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "description", "price", "category"])
+        for i in range(count):
+            writer.writerow([f"Outlet {i % 7} Dish {i}", "Chef's special preparation", 50 + (i * 7) % 400,
+                             CATEGORY_ORDER[i % len(CATEGORY_ORDER)]])
+    return path
+
+
+def clear_menu():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM menu_items"))
+
+
+def legacy_import(path):
+    # What add_menu_items.py did, fed from the same file.
+    db = SessionLocal()
+    try:
+        for item in read_menu_file(path):
+            exists = db.query(MenuItem).filter(MenuItem.name == item["name"]).first()
+            if not exists:
+                db.add(MenuItem(name=item["name"], description=item["description"],
+                                price=float(item["price"]), category=item["category"]))
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    init_db()
+    print(f"{'rows':>7} {'per-row rows/s':>15} {'bulk insert rows/s':>19} {'bulk re-import rows/s':>22}")
+    for count in SIZES:
+        path = write_menu(count)
+        legacy = "skipped"
+        if count <= LEGACY_MAX:
+            clear_menu()
+            legacy = f"{count / timed(legacy_import, path):.0f}"
+        clear_menu()
+        first = count / timed(import_menu_files, [path])
+        again = count / timed(import_menu_files, [path])
+        print(f"{count:>7} {legacy:>15} {first:>19.0f} {again:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
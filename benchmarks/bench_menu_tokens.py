@@ -0,0 +1,93 @@
+"""
+Model tokens and estimated latency of menu requests on a 300-item menu: the old flow,
+where the tool returned the full markdown menu and the model had to echo it, versus
+show_menu (the API renders the menu; the model gets a one-line summary) and
+search_menu (compact "name|price|diet" rows for questions about dishes).
+
+Tokens are estimated as characters / 4, with no tokenizer available offline. Latency is
+modelled for two model turns (tool call, then reply) as time to first token plus input
+tokens at `--input-tps` and output tokens at `--output-tps`; tool execution time is measured.
+
+Run from the project root:
+    python -m benchmarks.bench_menu_tokens [--items N] [--ttft S] [--input-tps N] [--output-tps N]
+"""
+import argparse
+import inspect
+import json
+import time
+
+from benchmarks.common import seed_synthetic_menu, use_temp_db
+
+use_temp_db()
+
+from backend.agents import RESTAURANT_PROMPT  # noqa: E402
+from backend.menu_cache import menu_cache  # noqa: E402
+from backend.tools import (  # noqa: E402
+    collect_displays, get_menu_items, place_restaurant_order, search_menu, show_menu,
+)
+
+CALL_TOKENS = 20 # A function call part: tool name and a few arguments
+SHORT_REPLY = "Here is our menu! Let me know what you'd like to order and your room number."
+ANSWER = "Our vegetarian mains under ₹300 are listed above; the Garden Paneer is a favourite. Shall I order one?"
+
+
+def tokens(text):
+    return len(text) // 4
+
+
+def declaration_tokens(tools):
+    return sum(tokens(tool.__name__ + (inspect.getdoc(tool) or "") + str(inspect.signature(tool))) for tool in tools)
+
+
+def timed(fn, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--ttft", type=float, default=0.35, help="Seconds to first token per model turn")
+    parser.add_argument("--input-tps", type=float, default=3000, help="Prompt tokens processed per second")
+    parser.add_argument("--output-tps", type=float, default=150, help="Tokens generated per second")
+    args = parser.parse_args()
+
+    seed_synthetic_menu(args.items)
+    menu_cache.snapshot()
+    user = "Can I see the menu?"
+
+    def scenario(name, tools, tool_output, reply):
+        # Turn 1: prompt + tools + message -> function call. Turn 2: the same plus the call and its result -> reply.
+        context = tokens(RESTAURANT_PROMPT) + declaration_tokens(tools) + tokens(user)
+        tokens_in = context + (context + CALL_TOKENS + tokens(tool_output))
+        tokens_out = CALL_TOKENS + tokens(reply)
+        seconds = 2 * args.ttft + tokens_in / args.input_tps + tokens_out / args.output_tps
+        print(f"{name:<34} {tokens_in:>9} {tokens_out:>10} {seconds:>11.2f}s")
+        return tokens_in, tokens_out, seconds
+
+    old_tools = [get_menu_items, place_restaurant_order]
+    new_tools = [show_menu, search_menu, place_restaurant_order]
+    print(f"{args.items}-item menu; {args.ttft}s to first token, {args.input_tps:.0f} tok/s in, "
+          f"{args.output_tps:.0f} tok/s out\n")
+    print(f"{'request':<34} {'tokens in':>9} {'tokens out':>10} {'est. latency':>12}")
+    full = get_menu_items()
+    before = scenario("full menu, echoed (before)", old_tools, full, full)
+    with collect_displays() as displays:
+        summary = show_menu()
+    after = scenario("full menu, show_menu (after)", new_tools, summary, SHORT_REPLY)
+    rows = search_menu(category="Main", diet="veg", max_price=300)
+    scenario("veg mains < 300, search_menu", new_tools, rows, ANSWER)
+    dessert = get_menu_items("Dessert")
+    scenario("desserts, echoed (before)", old_tools, dessert, dessert)
+
+    print(f"\nfull menu: {before[0] / after[0]:.1f}x fewer input tokens, {before[1] / after[1]:.0f}x fewer output "
+          f"tokens, {before[2] - after[2]:.1f}s faster")
+    print(f"menu sent to the browser instead: {len(json.dumps(displays)) / 1024:.1f} KiB of JSON")
+    print(f"tool time: get_menu_items {timed(get_menu_items) * 1e6:.1f}us, show_menu {timed(show_menu) * 1e6:.1f}us, "
+          f"search_menu {timed(lambda: search_menu(diet='veg', max_price=300)) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Where the time goes in a chat that places an order: per-stage breakdown (router, model
+build, model turns, tool, DB, ...) from the tracing spans, as `Server-Timing` and
+/metrics report it. Also measures what the instrumentation itself costs: one span, and
+a small query on an instrumented versus a plain engine.
+
+Run from the project root:
+    python -m benchmarks.bench_metrics [--requests N] [--latency SECONDS] [--queries N]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from benchmarks.common import report, use_temp_db
+
+use_temp_db()
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from backend.agents import AgentManager  # noqa: E402
+from backend.database import SQLALCHEMY_DATABASE_URL, engine  # noqa: E402
+from backend.metrics import _trace, span  # noqa: E402
+from backend.fake_model import FakeModel  # noqa: E402
+
+ORDER = {"room_number": "204", "items_dict": {"Masala Dosa": 2, "Masala Chai": 1}}
+
+
+async def traced_chats(manager, count):
+    # Each chat gets its own trace, like an HTTP request through TimingMiddleware.
+    totals = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            trace = {}
+            token = _trace.set(trace)
+            start = time.perf_counter()
+            try:
+                await manager.chat_async([{"role": "user", "content": "Order 2 Masala Dosa and a Masala Chai for room 204"}],
+                                         f"chat-{i}")
+            finally:
+                _trace.reset(token)
+            trace["total"] = time.perf_counter() - start
+            for stage, seconds in trace.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def query_samples(bind, count):
+    samples = []
+    with bind.connect() as conn:
+        for _ in range(count):
+            start = time.perf_counter()
+            conn.execute(text("SELECT 1")).scalar()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake model call")
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    import add_remaining_menu
+    import seed_data
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        add_remaining_menu.add_remaining_items()
+    FakeModel.latency = args.latency
+    FakeModel.tool_call = ("place_restaurant_order", ORDER)
+
+    totals = asyncio.run(traced_chats(AgentManager(model_factory=FakeModel), args.requests))
+    print(f"per-chat stage breakdown over {args.requests} chats (fake model: {args.latency * 1000:.0f}ms per call)")
+    for stage, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+        print(f"  {stage:<14} {seconds / args.requests * 1000:9.3f}ms")
+
+    samples = []
+    for _ in range(args.queries):
+        start = time.perf_counter()
+        with span("bench"):
+            pass
+        samples.append(time.perf_counter() - start)
+    report("empty span", samples, unit="us")
+
+    plain = create_engine(SQLALCHEMY_DATABASE_URL)
+    report("SELECT 1 (plain engine)", query_samples(plain, args.queries), unit="us")
+    report("SELECT 1 (instrumented)", query_samples(engine, args.queries), unit="us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Item resolution for `place_restaurant_order`: one `ilike` query per line item (old)
+versus the in-memory menu index, for orders of 1-50 items on a 5000-row menu.
+Also reports how many near-miss names the index resolves.
+
+Run from the project root:
+    python -m benchmarks.bench_order_resolution
+"""
+import random
+import time
+
+from benchmarks.common import report, seed_synthetic_menu, use_temp_db
+
+MENU_SIZE = 5000
+ORDER_SIZES = [1, 5, 10, 25, 50]
+ORDERS_PER_SIZE = 20
+
+
+def legacy_resolve(db, MenuItem, names):
+    return {name: db.query(MenuItem).filter(MenuItem.name.ilike(name)).first() for name in names}
+
+
+def near_miss(name):
+    # What the model tends to send: lower case, plural, an extra word or a dropped letter.
+    variants = [name.lower(), name + "s", name + " masala", name.replace("a", "", 1)]
+    return random.choice(variants)
+
+
+if __name__ == "__main__":
+    use_temp_db()
+    seed_synthetic_menu(MENU_SIZE)
+
+    from backend.database import SessionLocal
+    from backend.menu_cache import menu_cache
+    from backend.models import MenuItem
+
+    random.seed(7)
+    names = [row[1] for cat in menu_cache.snapshot().categories for row in menu_cache.snapshot().items[cat]]
+
+    print(f"menu of {MENU_SIZE} items")
+    for size in ORDER_SIZES:
+        orders = [random.sample(names, size) for _ in range(ORDERS_PER_SIZE)]
+        legacy, indexed = [], []
+        db = SessionLocal()
+        for order in orders:
+            start = time.perf_counter()
+            legacy_resolve(db, MenuItem, order)
+            legacy.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            menu_cache.snapshot().index.resolve(order)
+            indexed.append(time.perf_counter() - start)
+        db.close()
+        report(f"{size:>2} items, ilike per item", legacy)
+        report(f"{size:>2} items, menu index", indexed)
+
+    misses = [near_miss(name) for name in random.sample(names, 500)]
+    start = time.perf_counter()
+    rows, unknown = menu_cache.snapshot().index.resolve(misses)
+    elapsed = time.perf_counter() - start
+    print(f"near-miss names resolved: {len(rows)}/{len(misses)} in {elapsed * 1000:.1f}ms")
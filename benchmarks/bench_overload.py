@@ -0,0 +1,141 @@
+"""
+Check-out rush overload test: guests arrive at `--overload` times what the model can
+serve (open loop, Poisson arrivals), half of them asking the same few facility
+questions. Compares the old behaviour (every chat queues for a slot until the chat
+timeout, no coalescing) with admission control: identical in-flight questions, router
+calls and read-only tool calls coalesced, a bounded queue with a latency budget, canned
+facility answers or a fast "busy" reply for shed chats, and the per-room rate limit.
+
+Runs the agent manager in process with the scripted fake model; the HTTP status each
+guest would get is the one the /chat endpoint maps the outcome to.
+
+Run from the project root:
+    python -m benchmarks.bench_overload [--seconds S] [--overload X] [--slots N]
+        [--budget S] [--model-latency-ms MS]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import percentile, use_temp_db
+
+use_temp_db()
+
+from backend.admission import AdmissionQueue, Overloaded, rate_limit_wait  # noqa: E402
+from backend.agents import AgentManager  # noqa: E402
+from backend.answer_cache import facility_answer  # noqa: E402
+from backend.fake_model import FakeModel, ScriptedFakeModel  # noqa: E402
+
+FACILITY_QUESTIONS = ["What time is check-out?", "When is checkout?", "What's the wifi password?",
+                      "Is the pool open?", "When does the gym open?"]
+OTHER_MESSAGES = ["Please send fresh towels to room {room}", "I'd like to order a Masala Dosa to room {room}",
+                  "hello there"]
+NOISY_ROOM = "999" # Sends a tenth of all messages
+
+
+def guest_messages(rng, count):
+    messages = []
+    for _ in range(count):
+        room = NOISY_ROOM if rng.random() < 0.1 else str(rng.randrange(100, 500))
+        if rng.random() < 0.5:
+            messages.append((room, rng.choice(FACILITY_QUESTIONS)))
+        else:
+            messages.append((room, rng.choice(OTHER_MESSAGES).format(room=room)))
+    return messages
+
+
+async def one_guest(manager, room, message, i, limited):
+    """The status /chat would answer with and how long the guest waited."""
+    start = time.perf_counter()
+    history = [{"role": "user", "content": message}]
+    if limited and await asyncio.to_thread(rate_limit_wait, room):
+        status = "429 rate limited"
+    else:
+        try:
+            reply = await manager.chat_async(history, f"rush-{limited}-{i}")
+            status = "200 canned" if reply == facility_answer(message) else "200 answered"
+        except Overloaded:
+            status = "503 busy"
+        except asyncio.TimeoutError:
+            status = "504 timeout"
+    return status, time.perf_counter() - start
+
+
+async def rush(manager, messages, rate, limited):
+    rng = random.Random(7)
+    tasks = []
+    start = time.perf_counter()
+    arrival = 0.0
+    for i, (room, message) in enumerate(messages):
+        arrival += rng.expovariate(rate)
+        await asyncio.sleep(max(0.0, start + arrival - time.perf_counter()))
+        tasks.append(asyncio.create_task(one_guest(manager, room, message, i, limited)))
+    return await asyncio.gather(*tasks)
+
+
+def windows_p99(results, parts=5):
+    """p99 latency of the guests arriving in each successive fifth of the rush."""
+    size = max(1, len(results) // parts)
+    return " ".join(f"{percentile([elapsed for _, elapsed in results[i:i + size]], 99) * 1000:.0f}ms"
+                    for i in range(0, size * parts, size))
+
+
+def summarize(label, results, model_calls, seconds):
+    by_status = {}
+    for status, elapsed in results:
+        by_status.setdefault(status, []).append(elapsed)
+    everyone = [elapsed for _, elapsed in results]
+    served = [elapsed for status, elapsed in results if status.startswith("200")]
+    print(f"\n{label}: {len(served) / seconds:.1f} answers/s, {model_calls} model calls, "
+          f"p50 {percentile(everyone, 50) * 1000:.0f}ms, p99 {percentile(everyone, 99) * 1000:.0f}ms "
+          f"(answered/canned p99 {percentile(served, 99) * 1000:.0f}ms)")
+    print(f"  p99 by arrival time, first to last fifth of the rush: {windows_p99(results)}")
+    for status, samples in sorted(by_status.items()):
+        print(f"  {status:<17} {len(samples):>5}   p50 {percentile(samples, 50) * 1000:>7.0f}ms   "
+              f"p99 {percentile(samples, 99) * 1000:>7.0f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=15, help="Length of the rush")
+    parser.add_argument("--overload", type=float, default=3, help="Arrival rate as a multiple of capacity")
+    parser.add_argument("--slots", type=int, default=8, help="MAX_CONCURRENT_CHATS")
+    parser.add_argument("--budget", type=float, default=1.0, help="CHAT_QUEUE_BUDGET_SECONDS")
+    parser.add_argument("--model-latency-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    import seed_data
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        seed_data.seed_rooms()
+
+    class RushModel(ScriptedFakeModel):
+        latency = args.model_latency_ms / 1000
+
+    capacity = args.slots / (2 * RushModel.latency)  # Two model turns per chat (tool call, reply)
+    rate = capacity * args.overload
+    messages = guest_messages(random.Random(1), int(rate * args.seconds))
+    print(f"capacity ~{capacity:.0f} chats/s ({args.slots} slots, {args.model_latency_ms:.0f}ms per model call); "
+          f"{len(messages)} guests over {args.seconds:.0f}s = {rate:.0f}/s, half asking facility questions")
+
+    for label, controlled in (("queue until timeout (before)", False), ("admission control (after)", True)):
+        manager = AgentManager(model_factory=RushModel)
+        if controlled:
+            manager.admission = AdmissionQueue(args.slots, max_queue=4 * args.slots, budget=args.budget)
+        else:
+            manager.admission = AdmissionQueue(args.slots, max_queue=len(messages), budget=manager.chat_timeout)
+            manager.inflight = None
+        FakeModel.calls = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await rush(manager, messages, rate, controlled)
+        summarize(label, results, FakeModel.calls, time.perf_counter() - start)
+        if controlled:
+            print(f"  coalesced calls: {manager.inflight.stats()['coalesced']}, shed: {manager.admission.shed}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Dynamic room pricing on a 500-room, 365-day calendar: repricing every room type for
+every night with the vectorised engine versus a per-night Python loop, quoting stays
+from the cached rate table, and the incremental update after a booking.
+
+Run from the project root:
+    python -m benchmarks.bench_pricing [--rooms N] [--quotes N] [--repeat N]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_availability import DAYS, random_stays, seed
+from benchmarks.common import report, use_temp_db
+
+
+def scalar_reprice(availability, pricing):
+    """The same formula one (room type, night) at a time, as a plain loop would do it."""
+    from backend.pricing import DAY_OF_WEEK, LEAD_TIME_CURVE, OCCUPANCY_CURVE, SEASON
+
+    def interp(x, curve):
+        if x <= curve[0][0]:
+            return curve[0][1]
+        for (x0, y0), (x1, y1) in zip(curve, curve[1:]):
+            if x <= x1:
+                return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+        return curve[-1][1]
+
+    today = date.today()
+    rates = {}
+    for room_type in availability.room_types():
+        bitmaps = availability.bitmaps(room_type)
+        base = availability.base_rate(room_type)
+        row = []
+        for offset in range(pricing.horizon_days):
+            night = availability.origin + timedelta(days=offset)
+            occupancy = sum(1 for bitmap in bitmaps if bitmap >> offset & 1) / len(bitmaps)
+            rate = (base * SEASON[night.month] * DAY_OF_WEEK[night.weekday()]
+                    * interp((night - today).days, LEAD_TIME_CURVE) * interp(occupancy, OCCUPANCY_CURVE))
+            row.append(round(rate))
+        rates[room_type] = row
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--quotes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_db()
+    booked = seed(args.rooms, 0.7)
+    from backend.availability import availability
+    from backend.pricing import pricing
+
+    availability.refresh()
+    pricing.refresh()
+    cells = len(pricing.room_types) * pricing.horizon_days
+    print(f"{args.rooms} rooms x {DAYS} days, {booked:.0%} of nights booked, "
+          f"{len(pricing.room_types)} room types -> {cells} nightly rates")
+
+    vectorised = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        pricing.reprice()
+        vectorised.append(time.perf_counter() - start)
+    report("full reprice (NumPy)", vectorised)
+
+    start = time.perf_counter()
+    expected = scalar_reprice(availability, pricing)
+    print(f"{'full reprice (Python loop)':<28} {(time.perf_counter() - start) * 1000:.3f}ms")
+    mismatches = sum(
+        1 for row, room_type in enumerate(pricing.room_types)
+        for a, b in zip(pricing.rates[row].tolist(), expected[room_type]) if abs(a - b) > 1
+    )
+    print(f"rates differing by more than 1: {mismatches} of {cells}")
+
+    samples = []
+    for room_type, check_in, check_out in random_stays(args.quotes):
+        start = time.perf_counter()
+        pricing.quote(room_type, check_in, check_out)
+        samples.append(time.perf_counter() - start)
+    report("quote a stay (cached)", samples, unit="us")
+
+    incremental, booked_stays = [], 0
+    for room_type, check_in, check_out in random_stays(200, seed=5):
+        if availability.book(room_type, check_in, check_out, "bench") is None:
+            continue
+        booked_stays += 1
+        start = time.perf_counter()
+        pricing.refresh()
+        incremental.append(time.perf_counter() - start)
+    report(f"reprice after booking ({booked_stays})", incremental, unit="us")
+    print(f"pricing stats: {pricing.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Sales reports over a season of orders: "top dishes this week" and "revenue per category
+per day" computed by loading every order and parsing its JSON (what the dashboard does
+per row) versus reading the hourly/daily rollups. Also times the one-off backfill of
+order lines and rollups for existing orders, and placing an order with its rollups.
+
+Run from the project root:
+    python -m benchmarks.bench_sales [--orders N] [--days N] [--repeat N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import report, use_temp_db
+
+
+def grow_orders(path, count, days):
+    """Inserts `count` orders spread over the last `days` days, 1-4 random dishes each."""
+    conn = sqlite3.connect(path)
+    menu = conn.execute("SELECT name, price FROM menu_items").fetchall()
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        items = [{"name": name, "quantity": rng.randint(1, 3), "price": price}
+                 for name, price in rng.sample(menu, rng.randint(1, 4))]
+        created = now - timedelta(seconds=days * 86400 * (count - i) / count)
+        rows.append((str(100 + i % 400), json.dumps(items), sum(x["quantity"] * x["price"] for x in items),
+                     "Delivered", created.strftime("%Y-%m-%d %H:%M:%S.%f")))
+    conn.executemany(
+        "INSERT INTO orders (room_number, items, total_amount, status, created_at, priority) VALUES (?, ?, ?, ?, ?, 0)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def scan_report(db, start, by_category):
+    """The report the slow way: every order in range, JSON parsed and summed in Python."""
+    from backend.models import MenuItem, Order
+
+    categories = dict(db.query(MenuItem.name, MenuItem.category).all())
+    totals = {}
+    for created_at, items in db.query(Order.created_at, Order.items).filter(Order.created_at >= start):
+        for item in items:
+            if by_category:
+                key = (created_at.date(), categories.get(item["name"], "Others"))
+            else:
+                key = item["name"]
+            totals[key] = totals.get(key, 0.0) + item["quantity"] * item["price"]
+    return totals
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=120, help="Length of the season the orders span")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = use_temp_db()
+    import add_remaining_menu
+    import seed_data
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        add_remaining_menu.add_remaining_items()
+    grow_orders(path, args.orders, args.days)
+
+    from backend.database import SessionLocal, engine
+    from backend.sales import backfill_order_items, sales_report
+    from backend.tools import place_restaurant_order
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        backfill_order_items(conn)
+    print(f"{args.orders} orders over {args.days} days; backfilling lines and rollups took "
+          f"{time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        week, season = now - timedelta(days=7), now - timedelta(days=args.days)
+        report("top dishes/week (scan)", timed(lambda: scan_report(db, week, False), args.repeat))
+        report("top dishes/week (rollup)", timed(lambda: sales_report(db, "item", "day", week), args.repeat))
+        report("category/day (scan)", timed(lambda: scan_report(db, season, True), args.repeat))
+        report("category/day (rollup)",
+               timed(lambda: sales_report(db, "category", "day", season, limit=100), args.repeat))
+
+        scanned = scan_report(db, week, False)
+        rolled = {row["key"]: row["revenue"] for row in sales_report(db, "item", "day", week, limit=100)["totals"]}
+        # The rollup rounds the week's start down to midnight, so it may include a few more orders.
+        print(f"top dish by scan: {max(scanned, key=scanned.get)}, by rollup: {max(rolled, key=rolled.get)}")
+    finally:
+        db.close()
+
+    samples = timed(lambda: place_restaurant_order("204", {"Masala Dosa": 2, "Masala Chai": 1}), 200)
+    report("place order + rollups", samples)
+
+
+if __name__ == "__main__":
+    main()
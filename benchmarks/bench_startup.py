@@ -0,0 +1,86 @@
+"""
+Cold-start time of the API and the maintenance scripts, each in a fresh interpreter,
+with the slowest top-level imports reported from `python -X importtime`.
+"API, agents eager" loads the agent layer up front the way importing the backend used
+to, for comparison with the lazy default.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--runs N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "API (import backend.main)": ["-c", "import backend.main"],
+    "API, agents eager": ["-c", "import backend.main, backend.agents as a; a.get_manager(); a.load_genai()"],
+    "seed_data.py": ["seed_data.py"],
+    "add_menu_items.py": ["add_menu_items.py"],
+    "add_remaining_menu.py": ["add_remaining_menu.py"],
+    "test_menu.py": ["test_menu.py"],
+}
+
+
+def run_once(args):
+    # Each run gets its own empty database so scripts do the same work every time.
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'resort.db')}")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{args} failed:\n{result.stderr[-2000:]}")
+    return elapsed, parse_importtime(result.stderr)
+
+
+def parse_importtime(stderr, max_depth=2):
+    """
+    Cumulative import time in seconds per module, for modules imported at most
+    `max_depth` levels below the script (deeper ones are counted in their parents).
+    """
+    modules = {}
+    total = 0.0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1e6
+        if depth == 0:
+            total += seconds
+        if depth <= max_depth:
+            modules[name.strip()] = seconds
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'target':<28} {'median wall':>12} {'imports':>9}")
+    breakdowns = {}
+    for label, target in TARGETS.items():
+        runs = [run_once(target) for _ in range(args.runs)]
+        wall = statistics.median(elapsed for elapsed, _ in runs)
+        total, modules = runs[-1][1]
+        breakdowns[label] = modules
+        print(f"{label:<28} {wall * 1000:>10.0f}ms {total * 1000:>7.0f}ms")
+
+    for label, modules in breakdowns.items():
+        print(f"\n{label}: slowest imports (cumulative)")
+        for name, seconds in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {seconds * 1000:>8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
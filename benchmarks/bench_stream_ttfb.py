@@ -0,0 +1,77 @@
+"""
+Time-to-first-byte of POST /chat versus POST /chat/stream for a full-menu reply.
+Starts the API in-process on a spare port with a fake model that streams the
+menu word by word (200ms to first token, 5ms per word).
+
+Run from the project root:
+    python -m benchmarks.bench_stream_ttfb
+"""
+import contextlib
+import io
+import socket
+import statistics
+import threading
+import time
+
+import requests
+import uvicorn
+
+import backend.agents
+import backend.main
+from backend.agents import AgentManager
+from backend.fake_model import FakeModel
+from backend.tools import get_menu_items
+
+RUNS = 10
+HISTORY = [{"role": "user", "content": "Show me the menu"}]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    config = uvicorn.Config(backend.main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def measure(url):
+    ttfb, total = [], []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        with requests.post(url, json={"history": HISTORY}, stream=True) as response:
+            chunks = response.iter_content(chunk_size=None)
+            next(chunks)
+            ttfb.append(time.perf_counter() - start)
+            for _ in chunks:
+                pass
+        total.append(time.perf_counter() - start)
+    return statistics.median(ttfb), statistics.median(total)
+
+
+if __name__ == "__main__":
+    FakeModel.reply = get_menu_items()
+    FakeModel.latency = 0.2
+    FakeModel.chunk_latency = 0.005
+    backend.agents.manager = AgentManager(model_factory=FakeModel)
+
+    port = free_port()
+    server = start_server(port)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "/chat": measure(f"http://127.0.0.1:{port}/chat"),
+            "/chat/stream": measure(f"http://127.0.0.1:{port}/chat/stream"),
+        }
+    server.should_exit = True
+
+    print(f"reply: {len(FakeModel.reply)} chars, {len(FakeModel.reply.split(' '))} streamed pieces")
+    print(f"{'endpoint':<14} {'median TTFB':>12} {'median total':>13}")
+    for endpoint, (ttfb, total) in results.items():
+        print(f"{endpoint:<14} {ttfb * 1000:>10.0f}ms {total * 1000:>11.0f}ms")
@@ -0,0 +1,109 @@
+"""
+Staff work queue under load: many staff clients claiming and acknowledging kitchen
+jobs at once (every job must be handed out exactly once), then next-job claim latency
+as the table of finished orders grows.
+
+Run from the project root:
+    python -m benchmarks.bench_work_queue [--jobs N] [--workers N]
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, report, use_temp_db
+
+use_temp_db()
+
+from sqlalchemy import insert  # noqa: E402
+
+from backend import work_queue  # noqa: E402
+from backend.database import SessionLocal, engine, init_db  # noqa: E402
+from backend.models import Order  # noqa: E402
+
+HISTORY_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def add_orders(count, status="Pending", start=None):
+    rng = random.Random(count)
+    start = start or datetime.utcnow() - timedelta(minutes=10)
+    rows = [{
+        "room_number": str(100 + i % 300),
+        "items": [{"name": "Masala Dosa", "quantity": 1, "price": 120}],
+        "total_amount": 120.0,
+        "status": status,
+        "priority": rng.choice([0, 0, 0, 1, 5]),
+        "created_at": start + timedelta(milliseconds=i),
+    } for i in range(count)]
+    with engine.begin() as conn:
+        for i in range(0, count, 20_000):
+            conn.execute(insert(Order.__table__), rows[i:i + 20_000])
+
+
+def staff(name, claimed, samples):
+    db = SessionLocal()
+    try:
+        while True:
+            start = time.perf_counter()
+            job = work_queue.claim_next(db, "orders", name)
+            samples.append(time.perf_counter() - start)
+            if job is None:
+                return
+            claimed.append(job["id"])
+            work_queue.ack(db, "orders", job["id"], name)
+    finally:
+        db.close()
+
+
+def concurrent_run(jobs, workers):
+    add_orders(jobs)
+    claimed, samples = [], []
+    threads = [threading.Thread(target=staff, args=(f"staff-{i}", claimed, samples)) for i in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    doubles = sum(1 for count in Counter(claimed).values() if count > 1)
+    print(f"{jobs} jobs, {workers} staff clients: {len(claimed) / elapsed:.0f} claim+ack/s, "
+          f"{len(claimed)} claimed, {doubles} claimed twice")
+    report("claim latency", samples)
+
+
+def next_job_latency():
+    print(f"\n{'finished orders':>15} {'claim p50':>10} {'claim p99':>10}")
+    done = 0
+    for size in HISTORY_SIZES:
+        add_orders(size - done, status="Delivered", start=datetime.utcnow() - timedelta(days=30))
+        done = size
+        add_orders(200)
+        db = SessionLocal()
+        samples = []
+        try:
+            for _ in range(200):
+                start = time.perf_counter()
+                job = work_queue.claim_next(db, "orders", "bench")
+                samples.append(time.perf_counter() - start)
+                work_queue.ack(db, "orders", job["id"], "bench")
+        finally:
+            db.close()
+        print(f"{size:>15} {percentile(samples, 50) * 1000:>8.3f}ms {percentile(samples, 99) * 1000:>8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    concurrent_run(args.jobs, args.workers)
+    next_job_latency()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Multi-worker scaling with shared state: runs the API under uvicorn with 1..N worker
+processes (fake model, SHARED_STATE_URL pointing at a SQLite state file) and drives
+two-turn guest conversations. Each worker allows `--slots` model-bound chats at a time
+(MAX_CONCURRENT_CHATS), the way a per-process model quota does, so chat throughput
+should grow with the number of workers.
+
+Every request opens a new connection, so the turns of one conversation land on
+whichever worker accepts them. After both turns the conversation is read back from
+yet another connection: with shared state it always holds both turns. The last run
+repeats the largest worker count with in-process state to show what breaks without it.
+
+Run from the project root:
+    python -m benchmarks.bench_workers [--workers 1,2,4] [--slots N] [--conversations N]
+        [--model-latency-ms MS]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import threading
+import time
+
+import requests
+
+from benchmarks.bench_load import free_port, start_server
+from benchmarks.common import percentile, use_temp_db
+
+# Neither message is answered from the answer cache, so every turn needs the model.
+TURNS = ["Please send fresh towels to room {room}", "I'd like to order a Masala Dosa to room {room}"]
+
+
+def run_conversations(base_url, count, concurrency):
+    """Runs `count` two-turn conversations; returns latencies, failures, intact conversations and pids seen."""
+    samples, failures, intact, pids = [], 0, 0, set()
+    lock = threading.Lock()
+    counter = itertools.count()
+    run = f"{time.time():.0f}"
+
+    def worker():
+        nonlocal failures, intact
+        while True:
+            i = next(counter)
+            if i >= count:
+                return
+            conversation_id = f"scale-{run}-{i}"
+            ok = True
+            for turn in TURNS:
+                start = time.perf_counter()
+                try:
+                    response = requests.post(f"{base_url}/chat", timeout=60, json={
+                        "message": turn.format(room=100 + i % 400), "conversation_id": conversation_id,
+                    })
+                    ok = ok and response.ok
+                except requests.RequestException:
+                    ok = False
+                with lock:
+                    samples.append(time.perf_counter() - start)
+            context = requests.get(f"{base_url}/conversations/{conversation_id}", timeout=60).json()
+            pid = requests.get(f"{base_url}/stats", timeout=60).json()["worker"]["pid"]
+            with lock:
+                failures += not ok
+                intact += context["turns"] == len(TURNS)
+                pids.add(pid)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start, failures, intact, pids
+
+
+def measure(workers, args, extra_env):
+    port = free_port()
+    env = dict(extra_env, MAX_CONCURRENT_CHATS=str(args.slots))
+    server = start_server(port, workers, args.model_latency_ms, env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        concurrency = 2 * args.slots * workers  # Enough guests to keep every worker's slots busy
+        run_conversations(base_url, concurrency, concurrency)  # Warm-up: every worker builds its agents
+        return run_conversations(base_url, args.conversations * workers, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to measure")
+    parser.add_argument("--slots", type=int, default=4, help="MAX_CONCURRENT_CHATS per worker")
+    parser.add_argument("--conversations", type=int, default=60, help="Conversations per worker")
+    parser.add_argument("--model-latency-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    path = use_temp_db()
+    import seed_data
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        seed_data.seed_rooms()
+    state_path = os.path.join(os.path.dirname(path), "state.db")
+    shared = {"SHARED_STATE_URL": f"sqlite:///{state_path}"}
+
+    counts = [int(n) for n in args.workers.split(",")]
+    print(f"{os.cpu_count()} CPU(s); fake model {args.model_latency_ms:.0f}ms per call, "
+          f"{args.slots} chat slots per worker, 2 turns per conversation, new connection per request\n")
+    print(f"{'workers':<9} {'state':<8} {'chats/s':>8} {'scaling':>8} {'p50':>9} {'p99':>9} "
+          f"{'intact':>8} {'pids':>5} {'errors':>7}")
+    base = None
+    runs = [(n, "shared", shared) for n in counts] + [(counts[-1], "process", {})]
+    for workers, label, extra_env in runs:
+        samples, wall, failures, intact, pids = measure(workers, args, extra_env)
+        throughput = len(samples) / wall
+        base = base or throughput / workers
+        conversations = len(samples) // len(TURNS)
+        print(f"{workers:<9} {label:<8} {throughput:>8.1f} {throughput / (base * workers):>7.0%} "
+              f"{percentile(samples, 50) * 1000:>7.0f}ms {percentile(samples, 99) * 1000:>7.0f}ms "
+              f"{intact / conversations:>8.0%} {len(pids):>5} {failures:>7}")
+    print("\nscaling: chats/s relative to N x the 1-worker rate; intact: conversations whose context "
+          "held both turns when read back")
+
+
+if __name__ == "__main__":
+    main()
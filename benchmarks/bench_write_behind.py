@@ -0,0 +1,92 @@
+"""
+Dinner-rush burst: many threads placing orders through `place_restaurant_order` at once,
+with direct commits versus the write-behind queue (fsync'd journal + batched commits).
+Reports tool latency, how fast the burst is accepted, and when it is all in the database.
+
+Run from the project root:
+    python -m benchmarks.bench_write_behind [--orders N] [--threads N] [--synchronous FULL]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import report, use_temp_db
+
+
+def burst(place_order, orders, threads):
+    samples = []
+    lock = threading.Lock()
+
+    def worker(count):
+        mine = []
+        for i in range(count):
+            start = time.perf_counter()
+            result = place_order(str(100 + i % 50), {"Masala Dosa": 1, "Masala Chai": 2})
+            mine.append(time.perf_counter() - start)
+            assert result.startswith("Order placed"), result
+        with lock:
+            samples.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(orders // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite synchronous pragma for the run")
+    args = parser.parse_args()
+
+    os.environ["SQLITE_SYNCHRONOUS"] = args.synchronous
+    use_temp_db()
+    import backend.tools as tools
+    from backend.database import SessionLocal, init_db
+    from backend.models import Order
+    from backend.write_queue import WriteBehindQueue
+    import seed_data
+    import add_remaining_menu
+
+    init_db()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_data.seed_menu()
+        add_remaining_menu.add_remaining_items()
+    print(f"{args.orders} orders from {args.threads} threads, synchronous={args.synchronous}")
+
+    for label, write_behind in [("direct commit", False), ("write-behind", True)]:
+        tools.WRITE_BEHIND_ENABLED = write_behind
+        if write_behind:
+            tools.write_queue = WriteBehindQueue(os.path.join(tempfile.mkdtemp(), "orders.journal"))
+            tools.write_queue.start()
+        db = SessionLocal()
+        before = db.query(Order).count()
+        db.close()
+
+        start = time.perf_counter()
+        samples, accepted = burst(tools.place_restaurant_order, args.orders, args.threads)
+        if write_behind:
+            tools.write_queue.flush(timeout=120)
+        stored_after = time.perf_counter() - start
+        db = SessionLocal()
+        stored = db.query(Order).count() - before
+        db.close()
+
+        report(f"{label} tool latency", samples)
+        print(f"{'':<28} accepted {len(samples) / accepted:.0f} orders/s, "
+              f"all {stored} rows in the database after {stored_after:.2f}s")
+        if write_behind:
+            print(f"{'':<28} {tools.write_queue.stats()}")
+            tools.write_queue.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import statistics
+import tempfile
+
+
+def use_temp_db():
+    """
+    Points the backend at a fresh SQLite file in a temporary directory.
+    Must be called before anything from `backend` is imported.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="resort-bench-"), "resort.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def report(label, samples, unit="ms"):
+    scale = {"ms": 1000, "us": 1e6}[unit]
+    print(f"{label:<28} p50={percentile(samples, 50) * scale:.3f}{unit} "
+          f"p99={percentile(samples, 99) * scale:.3f}{unit} mean={statistics.mean(samples) * scale:.3f}{unit}")
+
+
+def seed_synthetic_menu(count):
+    """Fills menu_items with `count` generated dishes spread over the usual categories."""
+    from backend.database import SessionLocal, init_db
+    from backend.menu_cache import CATEGORY_ORDER
+    from backend.models import MenuItem
+
+    init_db()
+    adjectives = ["Spicy", "Classic", "Smoked", "Tandoori", "Crispy", "Royal", "Garden", "Coastal"]
+    dishes = ["Paneer", "Chicken", "Dal", "Biryani", "Kebab", "Curry", "Naan", "Kulfi", "Lassi", "Tikka"]
+    db = SessionLocal()
+    try:
+        db.bulk_save_objects([
+            MenuItem(
+                name=f"{adjectives[i % len(adjectives)]} {dishes[(i // len(adjectives)) % len(dishes)]} {i}",
+                description="Chef's special preparation",
+                price=float(50 + (i * 7) % 400),
+                category=CATEGORY_ORDER[i % len(CATEGORY_ORDER)],
+            )
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
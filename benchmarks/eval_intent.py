@@ -0,0 +1,85 @@
+"""
+Offline evaluation of the local intent classifier against LLM router labels.
+
+`data/intent_eval.jsonl` holds held-out guest messages with the label the LLM
+router gave them. Pass `--relabel` (needs an API key) to re-query the router
+and rewrite those labels before scoring.
+
+Run from the project root:
+    python -m benchmarks.eval_intent
+    python -m benchmarks.eval_intent --relabel
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+from backend.intent import IntentClassifier
+from backend.intent_examples import EXAMPLES
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_eval.jsonl")
+THRESHOLDS = [0.5, 0.6, 0.7, 0.75, 0.8, 0.9]
+
+
+def load_eval():
+    with open(EVAL_PATH) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def relabel(rows):
+    from backend.agents import get_manager
+
+    manager = get_manager()
+    for row in rows:
+        row["llm_label"] = manager.route_request(row["text"])
+    with open(EVAL_PATH, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def score(classifier, rows):
+    predictions = [classifier.predict(row["text"]) for row in rows]
+    print(f"{'threshold':>9} {'local %':>8} {'local acc':>10} {'end-to-end acc':>15}")
+    for threshold in THRESHOLDS:
+        local = [(p, row) for p, row in zip(predictions, rows) if p[1] >= threshold]
+        correct = sum(1 for (label, _), row in local if label == row["llm_label"])
+        # Messages below the threshold go to the LLM router, which agrees with itself.
+        end_to_end = correct + (len(rows) - len(local))
+        local_acc = correct / len(local) if local else 0.0
+        print(f"{threshold:>9.2f} {len(local) / len(rows):>8.1%} {local_acc:>10.1%} {end_to_end / len(rows):>15.1%}")
+
+    misses = Counter((row["llm_label"], label) for (label, _), row in zip(predictions, rows) if label != row["llm_label"])
+    if misses:
+        print("confusions (llm -> local):", dict(misses))
+
+
+def cross_validate(folds=5):
+    # Leave-fold-out accuracy on the training examples themselves.
+    correct = 0
+    for k in range(folds):
+        train = [e for i, e in enumerate(EXAMPLES) if i % folds != k]
+        test = [e for i, e in enumerate(EXAMPLES) if i % folds == k]
+        classifier = IntentClassifier(train)
+        correct += sum(1 for text, label in test if classifier.predict(text)[0] == label)
+    print(f"{folds}-fold accuracy on training examples: {correct / len(EXAMPLES):.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--relabel", action="store_true", help="refresh labels from the LLM router first")
+    args = parser.parse_args()
+
+    rows = load_eval()
+    if args.relabel:
+        relabel(rows)
+
+    classifier = IntentClassifier()
+    score(classifier, rows)
+    cross_validate()
+
+    start = time.perf_counter()
+    for row in rows * 100:
+        classifier.predict(row["text"])
+    per_call = (time.perf_counter() - start) / (len(rows) * 100)
+    print(f"local prediction latency: {per_call * 1e6:.1f}us per message")
@@ -8,57 +8,104 @@ st.set_page_config(page_title="Resort Operations", layout="wide")
 st.title("🏨 Resort Operations Dashboard")
 
 API_URL = "http://localhost:8000"
+PAGE_SIZE = 200 # Most recent rows shown per table
+REFRESH_SECONDS = 5
 
-def fetch_data(endpoint):
+ORDER_COLS = ["id", "room_number", "status", "total_amount", "items", "created_at"]
+REQUEST_COLS = ["id", "room_number", "status", "request_type", "details", "created_at"]
+
+def fetch_data(endpoint, **params):
     try:
-        response = requests.get(f"{API_URL}/{endpoint}")
+        response = requests.get(f"{API_URL}/{endpoint}", params=params)
         if response.status_code == 200:
             return response.json()
         else:
             st.error(f"Failed to fetch {endpoint}")
-            return []
+            return None
     except Exception as e:
         st.error(f"Connection error: {e}")
-        return []
+        return None
 
-# Auto-refresh logic
-if st.button("Refresh Data"):
-    st.rerun()
+def format_order(order):
+    # Done once when a row arrives rather than for the whole table on every rerun
+    items = order.get("items")
+    if isinstance(items, list):
+        order["items"] = ", ".join(f"{int(i['quantity'])}x {i['name']}" for i in items)
+    return order
+
+def keep_latest(rows):
+    # Only the newest PAGE_SIZE rows are kept locally
+    if len(rows) > PAGE_SIZE:
+        for row_id in sorted(rows)[:-PAGE_SIZE]:
+            del rows[row_id]
+
+def load_snapshot():
+    # Take the cursor first so nothing written while the lists load is missed
+    changes = fetch_data("changes")
+    orders = fetch_data("orders", limit=PAGE_SIZE)
+    service_requests = fetch_data("requests", limit=PAGE_SIZE)
+    if changes is None or orders is None or service_requests is None:
+        return
+    st.session_state.cursor = changes["cursor"]
+    st.session_state.orders = {o["id"]: format_order(o) for o in orders["items"]}
+    st.session_state.requests = {r["id"]: r for r in service_requests["items"]}
+
+def apply_changes():
+    # Fetch only what changed since the last cursor and merge it into local state
+    while True:
+        changes = fetch_data("changes", cursor=st.session_state.cursor)
+        if changes is None:
+            return
+        if changes["reset"]:
+            load_snapshot()
+            return
+        for order in changes["orders"]:
+            st.session_state.orders[order["id"]] = format_order(order)
+        for request in changes["requests"]:
+            st.session_state.requests[request["id"]] = request
+        st.session_state.cursor = changes["cursor"]
+        if not changes["has_more"]:
+            break
+    keep_latest(st.session_state.orders)
+    keep_latest(st.session_state.requests)
+
+def show_table(rows, cols):
+    df = pd.DataFrame(sorted(rows.values(), key=lambda r: r["id"], reverse=True))
+    cols = [c for c in cols if c in df.columns]
+    st.dataframe(df[cols], use_container_width=True)
+
+if "cursor" not in st.session_state:
+    load_snapshot()
+else:
+    apply_changes()
+
+# Refresh controls
+refresh_col, auto_col = st.columns([1, 4])
+with refresh_col:
+    if st.button("Refresh Data"):
+        st.rerun()
+with auto_col:
+    auto_refresh = st.checkbox(f"Auto-refresh every {REFRESH_SECONDS}s")
 
 col1, col2 = st.columns(2)
 
 with col1:
     st.header("🍽️ Restaurant Orders")
-    orders = fetch_data("orders")
-    if orders:
-        df_orders = pd.DataFrame(orders)
-        # Reorder columns for better visibility
-        if not df_orders.empty:
-            cols = ["id", "room_number", "status", "total_amount", "items", "created_at"]
-            # Filter cols that exist
-            cols = [c for c in cols if c in df_orders.columns]
-            
-            # Format items column
-            if "items" in df_orders.columns:
-                df_orders["items"] = df_orders["items"].apply(
-                    lambda x: ", ".join([f"{int(i['quantity'])}x {i['name']}" for i in x]) if isinstance(x, list) else str(x)
-                )
-
-            st.dataframe(df_orders[cols], use_container_width=True)
+    if st.session_state.get("orders"):
+        show_table(st.session_state.orders, ORDER_COLS)
     else:
         st.info("No orders found.")
 
 with col2:
     st.header("🧹 Service Requests")
-    requests_data = fetch_data("requests")
-    if requests_data:
-        df_requests = pd.DataFrame(requests_data)
-        if not df_requests.empty:
-            cols = ["id", "room_number", "status", "request_type", "details", "created_at"]
-            cols = [c for c in cols if c in df_requests.columns]
-            st.dataframe(df_requests[cols], use_container_width=True)
+    if st.session_state.get("requests"):
+        show_table(st.session_state.requests, REQUEST_COLS)
     else:
         st.info("No service requests found.")
 
 st.markdown("---")
-st.caption("Dashboard updates manually via Refresh button or you can enable auto-refresh in code.")
+st.caption("Only new and updated rows are fetched on each refresh.")
+
+if auto_refresh:
+    time.sleep(REFRESH_SECONDS)
+    st.rerun()
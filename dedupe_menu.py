@@ -0,0 +1,18 @@
+from backend import models  # noqa: F401 (registers the tables)
+from backend.database import Base, engine, init_db
+from backend.menu_import import remove_duplicate_menu_items
+
+# One-off for menus written before dish names were unique: deletes every menu item whose
+# normalised name ("Masala Dosa", "masala dosas") repeats an older item's, keeping the
+# oldest, so the unique index on `name_key` can be built. Safe to re-run.
+#   python dedupe_menu.py
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        removed = remove_duplicate_menu_items(conn)
+    init_db()
+    print(f"Removed {len(removed)} duplicate menu items" + (f": ids {removed}." if removed else "."))
+
+if __name__ == "__main__":
+    main()
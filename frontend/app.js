@@ -2,7 +2,8 @@ const chatMessages = document.getElementById('chat-messages');
 const userInput = document.getElementById('user-input');
 const sendBtn = document.getElementById('send-btn');
 
-let history = [];
+// The backend keeps the conversation under this id, so each request only carries the new message
+const conversationId = crypto.randomUUID();
 
 function addMessage(content, role) {
     const messageDiv = document.createElement('div');
@@ -10,6 +11,65 @@ function addMessage(content, role) {
     messageDiv.textContent = content;
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageDiv;
+}
+
+// Renders a {"type": "menu"} display: the dishes come straight from the API, not through the model.
+function renderMenu(display) {
+    const card = document.createElement('div');
+    card.classList.add('menu-card');
+    for (const category of display.categories) {
+        const heading = document.createElement('h4');
+        heading.textContent = category.name;
+        card.appendChild(heading);
+        const list = document.createElement('ul');
+        for (const item of category.items) {
+            const row = document.createElement('li');
+            row.classList.add(item.diet);
+            row.textContent = `${item.name} — ₹${item.price}`;
+            row.title = item.description || '';
+            list.appendChild(row);
+        }
+        card.appendChild(list);
+    }
+    return card;
+}
+
+function addDisplays(displays) {
+    for (const display of displays || []) {
+        if (display.type === 'menu') {
+            const messageDiv = document.createElement('div');
+            messageDiv.classList.add('message', 'bot');
+            messageDiv.appendChild(renderMenu(display));
+            chatMessages.appendChild(messageDiv);
+        }
+    }
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+}
+
+// Reads Server-Sent Events from a fetch() body and calls onEvent with each parsed payload.
+async function readEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const data = rawEvent
+                .split('\n')
+                .filter(line => line.startsWith('data: '))
+                .map(line => line.slice(6))
+                .join('\n');
+            if (data) onEvent(JSON.parse(data));
+        }
+    }
 }
 
 async function sendMessage() {
@@ -18,35 +78,89 @@ async function sendMessage() {
 
     addMessage(text, 'user');
     userInput.value = '';
-    
-    // Add to history
-    history.push({ role: "user", content: text });
+
+    // Reply text is streamed into this bubble as it arrives
+    const botDiv = addMessage('', 'bot');
+    let botResponse = '';
 
     try {
-        const response = await fetch('http://localhost:8000/chat', {
+        const response = await fetch('http://localhost:8000/chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ history: history })
+            body: JSON.stringify({ message: text, conversation_id: conversationId })
         });
 
+        if (response.status === 429) {
+            // Per-room rate limit; the server says how long to wait
+            botDiv.textContent = (await response.json()).detail;
+            return;
+        }
         if (!response.ok) {
             throw new Error('Network response was not ok');
         }
 
-        const data = await response.json();
-        const botResponse = data.response;
-        
-        addMessage(botResponse, 'bot');
-        history.push({ role: "assistant", content: botResponse });
+        await readEvents(response, (event) => {
+            if (event.type === 'delta') {
+                botResponse += event.text;
+            } else if (event.type === 'done') {
+                botResponse = event.response;
+                addDisplays(event.displays);
+            } else if (event.type === 'busy') {
+                botResponse = event.detail;
+            } else if (event.type === 'error') {
+                botResponse = `Sorry, something went wrong: ${event.detail}`;
+            }
+            botDiv.textContent = botResponse;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        });
+
+    } catch (error) {
+        console.error('Error:', error);
+        botDiv.textContent = "Sorry, I'm having trouble connecting to the server.";
+    }
+}
+
+// Quick-action buttons call the tool directly (POST /actions), skipping the model entirely.
+async function runAction(button) {
+    addMessage(button.dataset.label, 'user');
+    const botDiv = addMessage('', 'bot');
 
+    try {
+        const response = await fetch(`http://localhost:8000/actions/${button.dataset.action}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                arguments: JSON.parse(button.dataset.args || '{}'),
+                conversation_id: conversationId
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error('Network response was not ok');
+        }
+        const action = await response.json();
+        if (action.displays.length) {
+            // The display replaces the tool's text summary of it.
+            botDiv.remove();
+            addDisplays(action.displays);
+        } else {
+            botDiv.textContent = action.result;
+        }
     } catch (error) {
         console.error('Error:', error);
-        addMessage("Sorry, I'm having trouble connecting to the server.", 'bot');
+        botDiv.textContent = "Sorry, I'm having trouble connecting to the server.";
     }
+    chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
+document.querySelectorAll('.quick-actions button').forEach(button => {
+    button.addEventListener('click', () => runAction(button));
+});
+
 sendBtn.addEventListener('click', sendMessage);
 
 userInput.addEventListener('keypress', (e) => {
@@ -0,0 +1,22 @@
+import argparse
+
+from backend.database import init_db
+from backend.menu_import import import_menu_files
+
+# Bulk-load menu files (CSV, JSON or JSON Lines) into the menu. Safe to re-run:
+# items are matched on their normalised name and updated in place.
+#   python import_menu.py menus/restaurant.csv menus/bar.jsonl
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or update menu items from CSV/JSON files.")
+    parser.add_argument("paths", nargs="+", help="Menu files with name, description, price and category")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    init_db()
+    report = import_menu_files(args.paths, args.batch_size)
+    print(f"Imported {report['rows']} rows in {report['seconds']}s ({report['rows_per_sec']} rows/sec): "
+          f"{report['inserted']} new, {report['updated']} updated, {report['skipped']} skipped.")
+
+if __name__ == "__main__":
+    main()
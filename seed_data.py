@@ -1,18 +1,11 @@
-from backend.database import engine, SessionLocal, Base
-from backend.models import MenuItem
+from backend.database import engine, init_db, dialect_insert
+from backend.menu_import import upsert_menu
+from backend.models import Room
 
 # Create tables
-Base.metadata.create_all(bind=engine)
+init_db()
 
 def seed_menu():
-    db = SessionLocal()
-    
-    # Check if menu already exists
-    if db.query(MenuItem).count() > 0:
-        print("Menu already seeded.")
-        db.close()
-        return
-
     menu_data = [
         {"name": "Masala Dosa", "description": "Crispy dosa with spiced potato filling", "price": 120, "category": "Breakfast"},
         {"name": "Plain Idli", "description": "Steamed rice cakes with chutney", "price": 80, "category": "Breakfast"},
@@ -26,13 +19,29 @@ def seed_menu():
         {"name": "Boiled Eggs", "description": "Two boiled eggs", "price": 70, "category": "Breakfast"},
     ]
 
-    for item in menu_data:
-        db_item = MenuItem(**item)
-        db.add(db_item)
-    
-    db.commit()
-    print("Menu seeded successfully!")
-    db.close()
+    # Upsert, so running the seed again only refreshes these items
+    report = upsert_menu(menu_data)
+    print(f"Menu seeded successfully! ({report['inserted']} new, {report['updated']} updated)")
+
+# Room inventory: (room type, nightly base rate, floor, rooms on that floor)
+ROOM_INVENTORY = [
+    ("Standard", 100, 1, 10),
+    ("Deluxe", 200, 2, 5),
+    ("Suite", 500, 3, 2),
+]
+
+def seed_rooms():
+    rooms = [
+        {"number": f"{floor}{i:02d}", "room_type": room_type, "base_rate": base_rate}
+        for room_type, base_rate, floor, count in ROOM_INVENTORY
+        for i in range(1, count + 1)
+    ]
+    # Existing rooms are left as they are, so re-running never touches bookings
+    statement = dialect_insert()(Room.__table__).on_conflict_do_nothing(index_elements=["number"])
+    with engine.begin() as conn:
+        conn.execute(statement, rooms)
+    print(f"Rooms seeded successfully! ({len(rooms)} rooms)")
 
 if __name__ == "__main__":
     seed_menu()
+    seed_rooms()
@@ -1,5 +1,8 @@
+from backend.database import init_db
 from backend.tools import get_menu_items
 
+init_db()
+
 try:
     print("calling get_menu_items()...")
     menu = get_menu_items()